@@ -0,0 +1,327 @@
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Literal
+
+import pandas as pd
+import yaml
+from pydantic import BaseModel, Field, model_validator
+
+from algo.backtest.cache import (
+    backtest_cache_key,
+    evict_cache,
+    load_cached_result,
+    store_backtest,
+)
+from algo.backtest.catalog import find_run_by_cache_key, record_run
+from algo.backtest.runs import BacktestResult, execute_backtest
+from algo.backtest.stats import compute_stats
+from algo.config import settings
+from algo.data.cleaning import cleaned_dataset_version, load_cleaned_field
+from algo.data.returns import load_returns
+from algo.data.snapshots import current_snapshot
+from algo.data.universe import get_clean_universe
+
+Engine = Literal["fast", "real"]
+
+
+# ==========================
+# Config (YAML / JSON)
+# ==========================
+
+
+class UniverseFilter(BaseModel):
+    """
+    Which assets a job trades: an explicit list, or a get_clean_universe() filter.
+    """
+
+    assets: list[str] | None = None
+    kinds: set[str] | None = None
+    min_coverage: float = 0.5
+    max_extreme: int = 10
+
+
+class BatchJob(BaseModel):
+    name: str
+    strategy: str
+    params: dict[str, Any] = Field(default_factory=dict)
+    universe: UniverseFilter = Field(default_factory=UniverseFilter)
+    start: str | None = None
+    end: str | None = None
+    engines: list[Engine] = Field(default_factory=lambda: ["fast", "real"])
+    engine_config: dict[str, Any] = Field(default_factory=dict)
+    benchmark: str | None = "spy"
+    plot: bool = False
+
+
+class BatchFile(BaseModel):
+    name: str = "batch"
+    field: str = "adj_close"
+    use_cache: bool = True
+    max_workers: int | None = None
+    jobs: list[BatchJob]
+
+    @model_validator(mode="after")
+    def _unique_names(self) -> "BatchFile":
+        names = [j.name for j in self.jobs]
+        dupes = sorted({n for n in names if names.count(n) > 1})
+        if dupes:
+            raise ValueError(f"Duplicate job names: {dupes}")
+        return self
+
+
+def load_batch_file(path: Path) -> BatchFile:
+    """
+    Parse a batch file (.yaml/.yml or .json).
+    """
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".json":
+        data = json.loads(text)
+    else:
+        data = yaml.safe_load(text) or {}
+    return BatchFile.model_validate(data)
+
+
+# ==========================
+# Worker side
+# ==========================
+
+# Price/returns panel per worker process, loaded once by _init_worker
+_PANEL: dict[str, Any] = {}
+
+
+def _init_worker(field: str) -> None:
+    """
+    Load the cleaned panel (prices + returns) once per process. Under fork the
+    parent's panel is inherited and nothing is read.
+    """
+    if _PANEL.get("field") == field:
+        return
+
+    _PANEL.update(
+        field=field,
+        prices=load_cleaned_field(field),
+        returns=load_returns(field),
+        dataset_version=cleaned_dataset_version(),
+        snapshot_id=current_snapshot("cleaned"),
+    )
+
+
+@dataclass
+class JobResult:
+    name: str
+    strategy: str
+    assets: list[str] = field(default_factory=list)
+    result: BacktestResult | None = None
+    benchmark: pd.Series | None = None
+    cache_key: str | None = None
+    hit: bool = False
+    error: str | None = None
+
+    @property
+    def curves(self) -> dict[str, pd.Series]:
+        out: dict[str, pd.Series] = {}
+        if self.result is not None and self.result.fast_equity is not None:
+            out["fast"] = self.result.fast_equity
+        if self.result is not None and self.result.real_equity is not None:
+            out["real"] = self.result.real_equity
+        if self.benchmark is not None:
+            out["benchmark"] = self.benchmark
+        return out
+
+
+def _run_job(job: BatchJob, assets: list[str], use_cache: bool) -> JobResult:
+    """
+    Run one job against the worker's panel. Cache lookups happen here; storing
+    new results is left to the parent (one writer for the cache directory).
+    """
+    out = JobResult(name=job.name, strategy=job.strategy, assets=assets)
+    try:
+        px = _PANEL["prices"][assets].loc[job.start : job.end]
+        rets = _PANEL["returns"][assets].loc[job.start : job.end]
+        if px.empty:
+            raise ValueError("No prices for the job's universe/dates")
+
+        out.cache_key = backtest_cache_key(
+            dataset_version=_PANEL["dataset_version"],
+            field=_PANEL["field"],
+            assets=list(px.columns),
+            start=px.index.min(),
+            end=px.index.max(),
+            strategy=job.strategy,
+            params=job.params,
+            engines=job.engines,
+            engine_config=job.engine_config,
+        )
+
+        cached = load_cached_result(out.cache_key) if use_cache else None
+        if cached is not None:
+            out.result, out.hit = cached, True
+        else:
+            out.result = execute_backtest(
+                px,
+                job.strategy,
+                job.params,
+                engines=job.engines,
+                engine_config=job.engine_config,
+                returns=rets,
+            )
+
+        if job.benchmark is not None and job.benchmark in px.columns:
+            bench_px = px[job.benchmark].dropna()
+            out.benchmark = (1.0 + rets[job.benchmark].reindex(bench_px.index[1:])).cumprod()
+    except Exception:
+        out.error = traceback.format_exc()
+
+    return out
+
+
+# ==========================
+# Parent side
+# ==========================
+
+
+def resolve_universe(
+    universe: UniverseFilter, columns: pd.Index, benchmark: str | None
+) -> list[str]:
+    """
+    Assets for a job (restricted to the panel), with the benchmark appended.
+    """
+    if universe.assets is not None:
+        assets = list(universe.assets)
+    else:
+        assets = get_clean_universe(
+            kinds=universe.kinds,
+            min_coverage=universe.min_coverage,
+            max_extreme=universe.max_extreme,
+        )
+
+    if benchmark is not None and benchmark not in assets:
+        assets.append(benchmark)
+    return [a for a in assets if a in columns]
+
+
+def make_batch_dir(name: str) -> Path:
+    """
+    artifacts/batches/<timestamp>_<name>/ for the batch summary and plots.
+    """
+    ts = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    batch_dir = settings.artifacts_dir / "batches" / f"{ts}_{name}"
+    batch_dir.mkdir(parents=True, exist_ok=False)
+    return batch_dir
+
+
+def run_batch(
+    batch: BatchFile,
+    *,
+    max_workers: int | None = None,
+    plot: bool | None = None,
+) -> tuple[pd.DataFrame, Path]:
+    """
+    Run every job in `batch` and record them in the run catalog.
+
+    - the cleaned panel is loaded once (per worker process)
+    - jobs run concurrently in a process pool (max_workers=1 runs inline)
+    - new results go to the result cache, every job to the catalog
+    - plots are drawn afterwards, only for jobs with plot=True (or plot=True here)
+
+    Returns (summary, batch_dir); summary has one row per job and curve.
+    """
+    _init_worker(batch.field)
+    columns = _PANEL["prices"].columns
+    jobs = [(job, resolve_universe(job.universe, columns, job.benchmark)) for job in batch.jobs]
+
+    workers = max_workers or batch.max_workers or os.cpu_count() or 1
+    workers = min(workers, len(jobs)) or 1
+
+    if workers == 1:
+        results = [_run_job(job, assets, batch.use_cache) for job, assets in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(batch.field,)
+        ) as pool:
+            futures = [pool.submit(_run_job, job, assets, batch.use_cache) for job, assets in jobs]
+            results = [f.result() for f in futures]
+
+    batch_dir = make_batch_dir(batch.name)
+    rows: list[dict[str, Any]] = []
+
+    for (job, _), res in zip(jobs, results, strict=True):
+        if res.error is not None or res.result is None:
+            rows.append({"job": job.name, "strategy": job.strategy, "error": res.error})
+            continue
+
+        assert res.cache_key is not None
+        if batch.use_cache and not res.hit:
+            store_backtest(
+                res.cache_key,
+                res.result,
+                strategy=job.strategy,
+                params=job.params,
+                dataset_version=_PANEL["dataset_version"],
+                field=batch.field,
+                engines=job.engines,
+            )
+
+        stats = dict(res.result.stats)
+        if res.benchmark is not None:
+            stats["benchmark"] = compute_stats(res.benchmark)
+
+        run_id = find_run_by_cache_key(res.cache_key) if res.hit else None
+        if run_id is None:
+            run_id = record_run(
+                name=job.name,
+                strategy=job.strategy,
+                params=job.params,
+                config={
+                    "batch": batch.name,
+                    "start": job.start,
+                    "end": job.end,
+                    "field": batch.field,
+                    "universe": job.universe.model_dump(mode="json"),
+                    "assets": res.assets,
+                    "benchmark": job.benchmark,
+                    "engines": job.engines,
+                    "engine_config": job.engine_config,
+                },
+                stats=stats,
+                curves=res.curves,
+                dataset_version=_PANEL["dataset_version"],
+                cache_key=res.cache_key,
+                snapshot_id=_PANEL["snapshot_id"],
+            )
+
+        for curve, curve_stats in stats.items():
+            rows.append(
+                {
+                    "job": job.name,
+                    "strategy": job.strategy,
+                    "run_id": run_id,
+                    "cache_hit": res.hit,
+                    "curve": curve,
+                    **curve_stats,
+                }
+            )
+
+        if plot or (plot is None and job.plot):
+            from algo.backtest.plotting import plot_equity_curves
+
+            try:
+                plot_equity_curves(
+                    res.curves,
+                    title=f"{job.name} ({job.strategy})",
+                    path=batch_dir / f"{job.name}.png",
+                )
+            except RuntimeError as e:
+                print(f"Skipping plot for '{job.name}': {e}")
+
+    if batch.use_cache:
+        evict_cache()
+
+    summary = pd.DataFrame(rows)
+    summary.to_csv(batch_dir / "summary.csv", index=False)
+    return summary, batch_dir
@@ -0,0 +1,243 @@
+import json
+import shutil
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from algo.backtest.runs import DEFAULT_ENGINE_CONFIG, BacktestResult, execute_backtest
+from algo.config import settings
+from algo.data.fingerprint import hash_payload
+
+# Bump when the stored layout or the meaning of a cached result changes
+CACHE_SCHEMA = 1
+
+
+def cache_dir() -> Path:
+    base = settings.artifacts_dir / "cache" / "backtests"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def backtest_cache_key(
+    *,
+    dataset_version: str,
+    field: str,
+    assets: Sequence[str],
+    start: str | pd.Timestamp | None,
+    end: str | pd.Timestamp | None,
+    strategy: str,
+    params: dict[str, Any] | None,
+    engines: Sequence[str],
+    engine_config: dict[str, Any] | None,
+) -> str:
+    """
+    Content address of a backtest: hash of everything that determines its output.
+    Asset order is kept, since it is the column order the engines see.
+    """
+    payload = {
+        "schema": CACHE_SCHEMA,
+        "dataset_version": dataset_version,
+        "field": field,
+        "assets": list(assets),
+        "start": None if start is None else str(pd.Timestamp(start).date()),
+        "end": None if end is None else str(pd.Timestamp(end).date()),
+        "strategy": strategy,
+        "params": params or {},
+        "engines": sorted(engines),
+        "engine_config": {**DEFAULT_ENGINE_CONFIG, **(engine_config or {})},
+    }
+    return hash_payload(payload)[:24]
+
+
+def _entry_dir(key: str) -> Path:
+    return cache_dir() / key
+
+
+def _touch(entry: Path) -> None:
+    meta_path = entry / "meta.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["last_access"] = time.time()
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+def load_cached_result(key: str) -> BacktestResult | None:
+    """
+    Return the stored result for `key`, or None on a miss.
+    A hit refreshes the entry's last-access time (for LRU eviction).
+    """
+    entry = _entry_dir(key)
+    if not (entry / "meta.json").exists():
+        return None
+
+    result = BacktestResult()
+    fast_path = entry / "fast_equity.parquet"
+    real_path = entry / "real_results.parquet"
+
+    if fast_path.exists():
+        result.fast_equity = pd.read_parquet(fast_path)["equity"]
+    if real_path.exists():
+        result.real_results = pd.read_parquet(real_path)
+
+    result.stats = json.loads((entry / "stats.json").read_text(encoding="utf-8"))
+
+    _touch(entry)
+    return result
+
+
+def store_result(key: str, result: BacktestResult, *, meta: dict[str, Any] | None = None) -> Path:
+    """
+    Write `result` under artifacts/cache/backtests/<key>/ and return the entry dir.
+    meta.json is written last, so a half-written entry is never treated as a hit.
+    """
+    entry = _entry_dir(key)
+    entry.mkdir(parents=True, exist_ok=True)
+
+    if result.fast_equity is not None:
+        result.fast_equity.to_frame("equity").to_parquet(entry / "fast_equity.parquet")
+    if result.real_results is not None:
+        result.real_results.to_parquet(entry / "real_results.parquet")
+
+    (entry / "stats.json").write_text(json.dumps(result.stats, indent=2), encoding="utf-8")
+
+    now = time.time()
+    full_meta = {"key": key, "created": now, "last_access": now, **(meta or {})}
+    (entry / "meta.json").write_text(json.dumps(full_meta, indent=2, default=str), encoding="utf-8")
+    return entry
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(p.stat().st_size for p in entry.iterdir() if p.is_file())
+
+
+def evict_cache(
+    *,
+    max_bytes: int | None = None,
+    max_entries: int | None = None,
+) -> list[str]:
+    """
+    Drop least-recently-used entries until the cache fits within max_bytes and
+    max_entries (defaults from settings). Incomplete entries are always removed.
+    Returns the evicted keys.
+    """
+    max_bytes = settings.backtest_cache_max_bytes if max_bytes is None else max_bytes
+    max_entries = settings.backtest_cache_max_entries if max_entries is None else max_entries
+
+    entries: list[tuple[float, int, Path]] = []
+    evicted: list[str] = []
+
+    for entry in cache_dir().iterdir():
+        if not entry.is_dir():
+            continue
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+            evicted.append(entry.name)
+            continue
+        last_access = json.loads(meta_path.read_text(encoding="utf-8")).get("last_access", 0.0)
+        entries.append((last_access, _entry_size(entry), entry))
+
+    # oldest first
+    entries.sort(key=lambda e: e[0])
+    total = sum(size for _, size, _ in entries)
+
+    while entries and (total > max_bytes or len(entries) > max_entries):
+        _, size, entry = entries.pop(0)
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        evicted.append(entry.name)
+
+    return evicted
+
+
+def cached_backtest(
+    px: pd.DataFrame,
+    strategy: str,
+    params: dict[str, Any] | None = None,
+    *,
+    dataset_version: str,
+    field: str,
+    engines: Sequence[str] = ("fast", "real"),
+    engine_config: dict[str, Any] | None = None,
+    use_cache: bool = True,
+    returns: pd.DataFrame | None = None,
+) -> tuple[BacktestResult, str, bool]:
+    """
+    execute_backtest() behind the result cache.
+
+    px must be the exact slice that is backtested; its columns and first/last date
+    are part of the key together with dataset_version and field.
+    use_cache=False bypasses both lookup and store.
+    returns (precomputed returns of px) only speeds up the run; it is not part of the key.
+
+    Returns (result, key, hit).
+    """
+    key = backtest_cache_key(
+        dataset_version=dataset_version,
+        field=field,
+        assets=list(px.columns),
+        start=px.index.min() if len(px) else None,
+        end=px.index.max() if len(px) else None,
+        strategy=strategy,
+        params=params,
+        engines=engines,
+        engine_config=engine_config,
+    )
+
+    if use_cache:
+        hit = load_cached_result(key)
+        if hit is not None:
+            return hit, key, True
+
+    result = execute_backtest(
+        px, strategy, params, engines=engines, engine_config=engine_config, returns=returns
+    )
+
+    if use_cache:
+        store_backtest(
+            key,
+            result,
+            strategy=strategy,
+            params=params,
+            dataset_version=dataset_version,
+            field=field,
+            engines=engines,
+        )
+        evict_cache()
+
+    return result, key, False
+
+
+def store_backtest(
+    key: str,
+    result: BacktestResult,
+    *,
+    strategy: str,
+    params: dict[str, Any] | None,
+    dataset_version: str,
+    field: str,
+    engines: Sequence[str],
+) -> Path:
+    """
+    store_result() with the standard meta for a backtest computed under `key`.
+    """
+    return store_result(
+        key,
+        result,
+        meta={
+            "strategy": strategy,
+            "params": params or {},
+            "dataset_version": dataset_version,
+            "field": field,
+            "engines": list(engines),
+        },
+    )
+
+
+def cache_entry_dir(key: str) -> Path:
+    """
+    Directory of a stored entry (for attaching plots etc. to a cached run).
+    """
+    return _entry_dir(key)
@@ -0,0 +1,263 @@
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import pandas as pd
+
+from algo.config import settings
+
+# ==========================
+# Schema
+# ==========================
+
+# run_stats is wide: one DOUBLE column per metric, added on first use
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id VARCHAR PRIMARY KEY,
+        created_at TIMESTAMP,
+        name VARCHAR,
+        strategy VARCHAR,
+        params VARCHAR,
+        config VARCHAR,
+        dataset_version VARCHAR,
+        cache_key VARCHAR
+    )
+    """,
+    # catalogs created before snapshots (algo.data.snapshots) existed
+    "ALTER TABLE runs ADD COLUMN IF NOT EXISTS snapshot_id VARCHAR",
+    """
+    CREATE TABLE IF NOT EXISTS run_stats (
+        run_id VARCHAR,
+        curve VARCHAR
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS run_curves (
+        run_id VARCHAR,
+        curve VARCHAR,
+        date TIMESTAMP,
+        value DOUBLE
+    )
+    """,
+    # curves are fetched per run; DuckDB only takes the index for = / IN filters
+    # matching few rows, so large catalogs are where it pays off
+    "CREATE INDEX IF NOT EXISTS run_curves_run_id ON run_curves (run_id)",
+]
+
+
+def catalog_path() -> Path:
+    base = settings.artifacts_dir
+    base.mkdir(parents=True, exist_ok=True)
+    return base / "catalog.duckdb"
+
+
+def _connect(path: Path | None = None) -> duckdb.DuckDBPyConnection:
+    con = duckdb.connect(str(path or catalog_path()))
+    for stmt in _SCHEMA:
+        con.execute(stmt)
+    return con
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _metric_columns(con: duckdb.DuckDBPyConnection) -> list[str]:
+    cols = con.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = 'run_stats'"
+    ).fetchall()
+    return [c[0] for c in cols if c[0] not in ("run_id", "curve")]
+
+
+# ==========================
+# Write
+# ==========================
+
+
+def record_run(
+    *,
+    name: str,
+    strategy: str,
+    params: dict[str, Any] | None,
+    config: dict[str, Any] | None,
+    stats: dict[str, dict[str, float]],
+    curves: dict[str, pd.Series],
+    dataset_version: str | None = None,
+    cache_key: str | None = None,
+    snapshot_id: str | None = None,
+    path: Path | None = None,
+) -> str:
+    """
+    Record one run (config, stats per curve and the equity curves) in the catalog.
+    stats/curves are keyed by curve name, e.g. "fast", "real", "benchmark".
+    snapshot_id: the dataset snapshot the run used, so it can be reproduced
+    with load_cleaned_field(..., version=snapshot_id).
+    Returns the new run_id.
+    """
+    ts = datetime.now()
+    run_id = f"{ts.strftime('%Y-%m-%d_%H%M%S')}_{name}_{uuid.uuid4().hex[:8]}"
+
+    with _connect(path) as con:
+        con.execute("BEGIN TRANSACTION")
+        con.execute(
+            "INSERT INTO runs (run_id, created_at, name, strategy, params, config, "
+            "dataset_version, cache_key, snapshot_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                run_id,
+                ts,
+                name,
+                strategy,
+                json.dumps(params or {}, sort_keys=True, default=str),
+                json.dumps(config or {}, sort_keys=True, default=str),
+                dataset_version,
+                cache_key,
+                snapshot_id,
+            ],
+        )
+
+        existing = set(_metric_columns(con))
+        for metrics in stats.values():
+            for metric in metrics:
+                if metric not in existing:
+                    con.execute(f"ALTER TABLE run_stats ADD COLUMN {_quote(metric)} DOUBLE")
+                    existing.add(metric)
+
+        for curve, metrics in stats.items():
+            cols = ["run_id", "curve", *metrics]
+            placeholders = ", ".join("?" for _ in cols)
+            con.execute(
+                f"INSERT INTO run_stats ({', '.join(_quote(c) for c in cols)}) "
+                f"VALUES ({placeholders})",
+                [run_id, curve, *(float(v) for v in metrics.values())],
+            )
+
+        frames = [
+            pd.DataFrame(
+                {
+                    "run_id": run_id,
+                    "curve": curve,
+                    "date": pd.to_datetime(s.index),
+                    "value": s.to_numpy(dtype=float),
+                }
+            )
+            for curve, s in curves.items()
+        ]
+        if frames:
+            con.register("curves_df", pd.concat(frames, ignore_index=True))
+            con.execute("INSERT INTO run_curves SELECT * FROM curves_df")
+            con.unregister("curves_df")
+
+        con.execute("COMMIT")
+
+    return run_id
+
+
+def _in_list(run_ids: Sequence[str]) -> str:
+    # an IN list of parameters (unlike list_contains) can use the run_id index
+    return f"run_id IN ({', '.join('?' for _ in run_ids)})"
+
+
+def delete_runs(run_ids: Sequence[str], *, path: Path | None = None) -> None:
+    if not run_ids:
+        return
+    with _connect(path) as con:
+        for table in ("runs", "run_stats", "run_curves"):
+            con.execute(f"DELETE FROM {table} WHERE {_in_list(run_ids)}", list(run_ids))
+
+
+# ==========================
+# Query
+# ==========================
+
+
+def find_run_by_cache_key(cache_key: str, *, path: Path | None = None) -> str | None:
+    with _connect(path) as con:
+        row = con.execute(
+            "SELECT run_id FROM runs WHERE cache_key = ? ORDER BY created_at DESC LIMIT 1",
+            [cache_key],
+        ).fetchone()
+    return row[0] if row else None
+
+
+def list_runs(*, strategy: str | None = None, path: Path | None = None) -> pd.DataFrame:
+    """
+    All recorded runs (newest first), optionally filtered on strategy.
+    """
+    sql = "SELECT * FROM runs"
+    args: list[Any] = []
+    if strategy is not None:
+        sql += " WHERE strategy = ?"
+        args.append(strategy)
+    sql += " ORDER BY created_at DESC"
+
+    with _connect(path) as con:
+        return con.execute(sql, args).df().set_index("run_id")
+
+
+def leaderboard(
+    metric: str = "Sharpe",
+    *,
+    curve: str = "real",
+    strategy: str | None = None,
+    top: int = 20,
+    ascending: bool = False,
+    path: Path | None = None,
+) -> pd.DataFrame:
+    """
+    Rank runs by `metric` for one curve ("fast", "real", ...).
+    Returns run info + all metrics for that curve, best first.
+    """
+    with _connect(path) as con:
+        metrics = _metric_columns(con)
+        if metric not in metrics:
+            raise KeyError(f"Unknown metric '{metric}'. Available: {sorted(metrics)}")
+
+        sql = """
+            SELECT r.run_id, r.created_at, r.name, r.strategy, r.params,
+                   s.* EXCLUDE (run_id, curve)
+            FROM run_stats AS s
+            JOIN runs AS r USING (run_id)
+            WHERE s.curve = ?
+        """
+        args: list[Any] = [curve]
+        if strategy is not None:
+            sql += " AND r.strategy = ?"
+            args.append(strategy)
+        sql += f" ORDER BY {_quote(metric)} {'ASC' if ascending else 'DESC'} NULLS LAST LIMIT ?"
+        args.append(top)
+
+        return con.execute(sql, args).df().set_index("run_id")
+
+
+def load_curves(
+    run_ids: Sequence[str],
+    *,
+    curve: str = "real",
+    path: Path | None = None,
+) -> pd.DataFrame:
+    """
+    Equity curves for the given runs as a wide DataFrame (date × run_id).
+    """
+    if not run_ids:
+        return pd.DataFrame()
+    with _connect(path) as con:
+        long = con.execute(
+            f"SELECT run_id, date, value FROM run_curves WHERE curve = ? AND {_in_list(run_ids)}",
+            [curve, *run_ids],
+        ).df()
+
+    wide = long.pivot(index="date", columns="run_id", values="value").sort_index()
+    return wide.reindex(columns=[r for r in run_ids if r in wide.columns])
+
+
+def query(sql: str, *, path: Path | None = None) -> pd.DataFrame:
+    """
+    Run raw SQL against the catalog (tables: runs, run_stats, run_curves).
+    """
+    with _connect(path) as con:
+        return con.execute(sql).df()
@@ -0,0 +1,252 @@
+"""
+Out-of-core (chunked) execution of the backtest engines.
+
+Prices arrive as an iterator of date blocks (wide date × asset frames, in date
+order), e.g. read lazily from the cleaned dataset with iter_field_blocks(). The
+engines keep only the state that crosses a block boundary:
+
+- fast engine: last price row, last weight row and last equity value
+- realistic engine: cash, holdings and last weight row
+
+and yield their output per block, so peak memory is bounded by the chunk size.
+write_blocks() streams the output to parquet as it is produced. Results are
+identical (bit for bit) to run_backtest_fast_daily / run_backtest_realistic on
+the whole panel.
+
+Weights are given either as one frame (reindexed to each block) or as an
+iterable of blocks aligned with the price blocks.
+"""
+
+import ast
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from algo.backtest.engine_fast import portfolio_returns
+from algo.backtest.engine_realistic import RealisticState, simulate_block
+from algo.backtest.runs import DEFAULT_ENGINE_CONFIG
+from algo.profiling import span
+
+DEFAULT_CHUNK_ROWS = 2520  # ~10 years of daily bars
+
+Weights = pd.DataFrame | Iterable[pd.DataFrame]
+
+
+# ==========================
+# Block sources
+# ==========================
+
+
+def iter_field_blocks(
+    field: str,
+    *,
+    path: Path | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    assets: list[str] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Wide (date × asset) blocks of one field from a wide OHLCV parquet file
+    (default: the cleaned dataset), read chunk_rows rows at a time. Only the
+    field's columns are read.
+    """
+    if path is None:
+        from algo.data.cleaning import cleaned_path
+
+        path = cleaned_path()
+    if not path.exists():
+        raise FileNotFoundError(f"No dataset at {path}")
+
+    f = pq.ParquetFile(path)
+    meta = json.loads(f.schema_arrow.metadata[b"pandas"])
+    index_col = meta["index_columns"][0]
+
+    columns: dict[str, str] = {}
+    for name in f.schema_arrow.names:
+        if name == index_col:
+            continue
+        asset, fld = ast.literal_eval(name)
+        if fld == field and (assets is None or asset in assets):
+            columns[name] = asset
+    if not columns:
+        raise KeyError(f"Field '{field}' not found in {path}")
+
+    for batch in f.iter_batches(batch_size=chunk_rows, columns=[*columns, index_col]):
+        block = batch.to_pandas(ignore_metadata=True).set_index(index_col)
+        block = block.rename(columns=columns)
+        block.index = pd.DatetimeIndex(block.index, name="date")
+        block.columns.name = "asset"
+        yield block
+
+
+def iter_frame_blocks(
+    df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    An in-memory frame as date blocks (for tests, or to bound intermediate memory).
+    """
+    for i in range(0, len(df), chunk_rows):
+        yield df.iloc[i : i + chunk_rows]
+
+
+def _weight_blocks(weights: Weights, price_blocks: Iterable[pd.DataFrame]):
+    if isinstance(weights, pd.DataFrame):
+        for block in price_blocks:
+            yield block, weights.reindex(index=block.index)
+    else:
+        yield from zip(price_blocks, weights, strict=True)
+
+
+def _checked(blocks: Iterable[tuple[pd.DataFrame, pd.DataFrame]], start_date: str | None):
+    """
+    Sorted, start-clipped blocks; raises if blocks overlap or go back in time.
+    """
+    start = pd.to_datetime(start_date) if start_date is not None else None
+    last: pd.Timestamp | None = None
+    for px, w in blocks:
+        px = px.sort_index()
+        if start is not None:
+            px = px.loc[start:]
+        if px.empty:
+            continue
+        if last is not None and px.index[0] <= last:
+            raise ValueError(
+                f"Price blocks out of order at {px.index[0]} (previous block ended {last})"
+            )
+        last = px.index[-1]
+        yield px, w
+
+
+# ==========================
+# Engines
+# ==========================
+
+
+def iter_backtest_fast(
+    price_blocks: Iterable[pd.DataFrame],
+    weights_by_day: Weights,
+    *,
+    start_date: str | None = None,
+) -> Iterator[pd.Series]:
+    """
+    Chunked run_backtest_fast_daily: yields the equity curve block by block.
+    """
+    prev_px: pd.DataFrame | None = None
+    prev_w: pd.DataFrame | None = None
+    equity = 1.0
+
+    for px, w in _checked(_weight_blocks(weights_by_day, price_blocks), start_date):
+        with span("chunk.fast"):
+            w = w.reindex(index=px.index, columns=px.columns).fillna(0.0)
+
+            # one carried row in front of the block: returns and the weight
+            # shift see the previous day exactly as in the in-memory run
+            if prev_px is None:
+                rets = px.pct_change()
+                w_lag = w.shift(1).fillna(0.0)
+            else:
+                rets = pd.concat([prev_px, px]).pct_change().iloc[1:]
+                w_lag = pd.concat([prev_w, w]).shift(1).fillna(0.0).iloc[1:]
+            prev_px, prev_w = px.iloc[-1:], w.iloc[-1:]
+
+            port_rets = portfolio_returns(rets, w_lag)
+            # cumprod seeded with the carried value keeps the multiplication order
+            curve = np.cumprod(np.concatenate([[equity], 1.0 + port_rets.to_numpy()]))[1:]
+            if len(curve):
+                equity = curve[-1]
+
+        yield pd.Series(curve, index=port_rets.index, name="equity")
+
+
+def iter_backtest_realistic(
+    price_blocks: Iterable[pd.DataFrame],
+    weights_by_day: Weights,
+    *,
+    initial_capital: float = DEFAULT_ENGINE_CONFIG["initial_capital"],
+    commission_pct: float = DEFAULT_ENGINE_CONFIG["commission_pct"],
+    allow_fractional: bool = DEFAULT_ENGINE_CONFIG["allow_fractional"],
+    drift_tolerance: float = DEFAULT_ENGINE_CONFIG["drift_tolerance"],
+) -> Iterator[pd.DataFrame]:
+    """
+    Chunked run_backtest_realistic: yields (total_value, cash, equity) block by block.
+    """
+    state: RealisticState | None = None
+    prev_w: pd.DataFrame | None = None
+
+    for px, w in _checked(_weight_blocks(weights_by_day, price_blocks), None):
+        with span("chunk.realistic"):
+            if state is None:
+                state = RealisticState(cash=initial_capital, holdings={a: 0.0 for a in px.columns})
+            elif list(px.columns) != list(state.holdings):
+                raise ValueError("All price blocks must have the same columns")
+
+            w = w.reindex(index=px.index, columns=px.columns).fillna(0.0)
+            if prev_w is None:
+                w_lag = w.shift(1).fillna(0.0)
+            else:
+                w_lag = pd.concat([prev_w, w]).shift(1).fillna(0.0).iloc[1:]
+            prev_w = w.iloc[-1:]
+
+            history = simulate_block(
+                px, w_lag, state, commission_pct, allow_fractional, drift_tolerance
+            )
+            result = pd.DataFrame(history).set_index("date")
+            result["equity"] = result["total_value"] / initial_capital
+
+        yield result
+
+
+# ==========================
+# Output
+# ==========================
+
+
+def write_blocks(blocks: Iterable[pd.Series | pd.DataFrame], path: Path) -> Path:
+    """
+    Stream engine output blocks to one parquet file (a row group per block).
+    """
+    writer: pq.ParquetWriter | None = None
+    try:
+        for block in blocks:
+            frame = block.to_frame() if isinstance(block, pd.Series) else block
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            if writer is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("No blocks to write (empty price source?)")
+    return path
+
+
+def run_backtest_chunked(
+    engine: str,
+    price_blocks: Iterable[pd.DataFrame],
+    weights_by_day: Weights,
+    *,
+    out_path: Path | None = None,
+    **engine_kwargs: Any,
+) -> pd.Series | pd.DataFrame | Path:
+    """
+    Run an engine ("fast" or "realistic") over date blocks. With out_path the
+    output is streamed to parquet and the path returned; otherwise the blocks
+    are concatenated (the same result as the in-memory engine).
+    """
+    if engine == "fast":
+        blocks: Iterator[Any] = iter_backtest_fast(price_blocks, weights_by_day, **engine_kwargs)
+    elif engine == "realistic":
+        blocks = iter_backtest_realistic(price_blocks, weights_by_day, **engine_kwargs)
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+
+    if out_path is not None:
+        return write_blocks(blocks, out_path)
+    return pd.concat(list(blocks))
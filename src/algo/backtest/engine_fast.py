@@ -1,17 +1,25 @@
+import numpy as np
 import pandas as pd
 
+from algo.data.returns import adjacent_returns
+from algo.profiling import profiled
 
+
+@profiled
 def run_backtest_fast_daily(
     prices: pd.DataFrame,
     weights_by_day: pd.DataFrame,
     *,
     start_date: str | None = None,
+    returns: pd.DataFrame | None = None,
 ) -> pd.Series:
     """
     Research backtest with time-varying target weights.
 
     - prices: wide DataFrame (date × asset)
     - weights_by_day: wide DataFrame (date × asset). Rows may sum <= 1.0.
+    - returns: optional precomputed simple returns (algo.data.returns.load_returns);
+      restricted to adjacent rows, so the result equals prices.pct_change().
 
     Convention:
     weights at date t are applied to returns from t -> t+1 (close-to-close).
@@ -25,7 +33,10 @@ def run_backtest_fast_daily(
     if start_date is not None:
         prices = prices.loc[pd.to_datetime(start_date) :]
 
-    rets = prices.pct_change()
+    if returns is None:
+        rets = prices.pct_change()
+    else:
+        rets = adjacent_returns(returns, prices)
 
     # align weights to prices
     w = weights_by_day.reindex(index=prices.index).fillna(0.0)
@@ -34,9 +45,24 @@ def run_backtest_fast_daily(
     # avoid lookahead: use weights decided on day t for return t->t+1
     w = w.shift(1).fillna(0.0)
 
-    port_rets = (rets * w).sum(axis=1)
-    port_rets = port_rets.dropna()
+    port_rets = portfolio_returns(rets, w)
 
     equity = (1.0 + port_rets).cumprod()
     equity.name = "equity"
     return equity
+
+
+def portfolio_returns(rets: pd.DataFrame, w: pd.DataFrame) -> pd.Series:
+    """
+    Daily portfolio return sum(w * r) per row, NaN returns counting as 0.
+
+    Summed column by column in a fixed order, so the result does not depend
+    on the frame's memory layout or on how many rows are processed at once
+    (the chunked engine in algo.backtest.chunked gives identical curves).
+    """
+    contrib = rets.to_numpy(dtype=float) * w.to_numpy(dtype=float)
+    contrib[np.isnan(contrib)] = 0.0
+    total = np.zeros(len(contrib))
+    for j in range(contrib.shape[1]):
+        total += contrib[:, j]
+    return pd.Series(total, index=rets.index)
@@ -1,6 +1,21 @@
+from dataclasses import dataclass
+
 import pandas as pd
 
+from algo.profiling import profiled
+
+
+@dataclass
+class RealisticState:
+    """
+    Portefølje-tilstand mellem to blokke af datoer (bruges af chunked-kørsler).
+    """
+
+    cash: float
+    holdings: dict[str, float]
 
+
+@profiled
 def run_backtest_realistic(
         prices: pd.DataFrame,
         weights_by_day: pd.DataFrame,
@@ -13,8 +28,28 @@ def run_backtest_realistic(
     w = weights_by_day.reindex(index=prices.index, columns=prices.columns).fillna(0.0)
     w = w.shift(1).fillna(0.0)
 
-    cash = initial_capital
-    holdings = {asset: 0.0 for asset in prices.columns}
+    state = RealisticState(cash=initial_capital, holdings={asset: 0.0 for asset in prices.columns})
+    history = simulate_block(prices, w, state, commission_pct, allow_fractional, drift_tolerance)
+
+    result = pd.DataFrame(history).set_index("date")
+    result["equity"] = result["total_value"] / initial_capital
+    return result
+
+
+def simulate_block(
+        prices: pd.DataFrame,
+        w: pd.DataFrame,
+        state: RealisticState,
+        commission_pct: float,
+        allow_fractional: float,
+        drift_tolerance: float,
+) -> list[dict]:
+    """
+    Kør handelsløkken over en blok af datoer. w er allerede forskudt én dag.
+    state (cash, holdings) opdateres, så næste blok fortsætter hvor denne slap.
+    """
+    cash = state.cash
+    holdings = state.holdings
     history = []
 
     for dt in prices.index:
@@ -66,6 +101,5 @@ def run_backtest_realistic(
                 cash -= (trade_value + fee)
                 holdings[asset] += delta_shares
 
-    result = pd.DataFrame(history).set_index("date")
-    result["equity"] = result["total_value"] / initial_capital
-    return result
\ No newline at end of file
+    state.cash = cash
+    return history
@@ -0,0 +1,178 @@
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from algo.backtest.stats import STAT_COLUMNS, compute_stats_batch
+
+Method = Literal["stationary", "block", "subsample"]
+
+
+# ==========================
+# Index generators
+# ==========================
+
+
+def stationary_bootstrap_indices(
+    n_obs: int,
+    horizon: int,
+    n_paths: int,
+    *,
+    mean_block: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Politis-Romano stationary bootstrap.
+
+    Block lengths are geometric with mean `mean_block`; blocks wrap around the
+    end of the sample. Returns an int array (horizon × n_paths) of row positions.
+    """
+    if mean_block < 1:
+        raise ValueError("mean_block must be >= 1")
+
+    starts = rng.integers(0, n_obs, size=(horizon, n_paths))
+    new_block = rng.random((horizon, n_paths)) < 1.0 / mean_block
+    new_block[0] = True
+
+    # step at which the current block started (per path)
+    steps = np.arange(horizon)[:, None]
+    block_step = np.maximum.accumulate(np.where(new_block, steps, 0), axis=0)
+
+    block_start = np.take_along_axis(starts, block_step, axis=0)
+    return (block_start + (steps - block_step)) % n_obs
+
+
+def block_bootstrap_indices(
+    n_obs: int,
+    horizon: int,
+    n_paths: int,
+    *,
+    block_size: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Moving block bootstrap with fixed block length (no wrap-around).
+    Returns an int array (horizon × n_paths).
+    """
+    block_size = min(block_size, n_obs)
+    if block_size < 1:
+        raise ValueError("block_size must be >= 1")
+
+    n_blocks = -(-horizon // block_size)
+    starts = rng.integers(0, n_obs - block_size + 1, size=(n_blocks, n_paths))
+
+    offsets = np.arange(block_size)[None, :, None]
+    idx = (starts[:, None, :] + offsets).reshape(n_blocks * block_size, n_paths)
+    return idx[:horizon]
+
+
+def subsample_indices(
+    n_obs: int,
+    horizon: int,
+    n_paths: int,
+    *,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Random start-date subsampling: each path is a contiguous slice of the
+    original history of length `horizon`. Returns an int array (horizon × n_paths).
+    """
+    if horizon > n_obs:
+        raise ValueError(f"horizon ({horizon}) is longer than the history ({n_obs})")
+
+    starts = rng.integers(0, n_obs - horizon + 1, size=n_paths)
+    return starts[None, :] + np.arange(horizon)[:, None]
+
+
+def _resample_indices(
+    method: Method,
+    n_obs: int,
+    horizon: int,
+    n_paths: int,
+    *,
+    block_size: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    if method == "stationary":
+        return stationary_bootstrap_indices(n_obs, horizon, n_paths, mean_block=block_size, rng=rng)
+    if method == "block":
+        return block_bootstrap_indices(n_obs, horizon, n_paths, block_size=block_size, rng=rng)
+    if method == "subsample":
+        return subsample_indices(n_obs, horizon, n_paths, rng=rng)
+    raise ValueError(f"Unknown method: {method}")
+
+
+# ==========================
+# Public API
+# ==========================
+
+
+def simulate_return_paths(
+    rets: np.ndarray,
+    n_paths: int,
+    *,
+    method: Method = "stationary",
+    block_size: int = 20,
+    horizon: int | None = None,
+    seed: int | None = None,
+) -> np.ndarray:
+    """
+    Resample a 1-D array of daily returns into a (horizon × n_paths) matrix.
+    """
+    rets = np.asarray(rets, dtype=float)
+    rng = np.random.default_rng(seed)
+    horizon = horizon or len(rets)
+
+    idx = _resample_indices(method, len(rets), horizon, n_paths, block_size=block_size, rng=rng)
+    return rets[idx]
+
+
+def monte_carlo_stats(
+    equity_curve: pd.Series,
+    *,
+    n_paths: int = 10_000,
+    method: Method = "stationary",
+    block_size: int = 20,
+    horizon: int | None = None,
+    seed: int | None = None,
+    chunk_size: int = 1_000,
+    trading_days: int = 252,
+) -> pd.DataFrame:
+    """
+    Resample the daily returns of an equity curve into `n_paths` synthetic
+    paths and compute the compute_stats_batch() metrics for every path.
+
+    Each path is an equity curve starting at 1.0 followed by cumprod(1 + r).
+
+    Paths are generated and evaluated `chunk_size` at a time, so peak memory is
+    roughly chunk_size × horizon × 8 bytes × a few temporaries.
+    Returns a DataFrame (n_paths × stats).
+    """
+    rets = equity_curve.pct_change().dropna().to_numpy(dtype=float)
+    if len(rets) < 2:
+        raise ValueError("equity_curve needs at least 3 points for Monte Carlo")
+
+    horizon = horizon or len(rets)
+    rng = np.random.default_rng(seed)
+
+    out = np.empty((n_paths, len(STAT_COLUMNS)))
+    for lo in range(0, n_paths, chunk_size):
+        hi = min(lo + chunk_size, n_paths)
+        idx = _resample_indices(method, len(rets), horizon, hi - lo, block_size=block_size, rng=rng)
+        paths = np.empty((horizon + 1, hi - lo))
+        paths[0] = 1.0
+        np.cumprod(1.0 + rets[idx], axis=0, out=paths[1:])
+        out[lo:hi] = compute_stats_batch(paths, trading_days).to_numpy()
+
+    return pd.DataFrame(out, columns=STAT_COLUMNS)
+
+
+def summarize_distribution(
+    dist: pd.DataFrame,
+    percentiles: tuple[float, ...] = (5, 25, 50, 75, 95),
+) -> pd.DataFrame:
+    """
+    Percentile table (stat × percentile) for the output of monte_carlo_stats().
+    """
+    q = np.nanpercentile(dist.to_numpy(), percentiles, axis=0)
+    return pd.DataFrame(q.T, index=dist.columns, columns=[f"p{p:g}" for p in percentiles])
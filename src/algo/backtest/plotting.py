@@ -0,0 +1,56 @@
+from collections.abc import Mapping
+from pathlib import Path
+
+import pandas as pd
+
+# Styling per curve name (same look as run_backtest.py has always used)
+_CURVE_STYLE: dict[str, dict] = {
+    "fast": {"alpha": 0.5, "linestyle": "--"},
+    "real": {"color": "cyan", "linewidth": 2},
+    "benchmark": {"color": "gray", "alpha": 0.7},
+}
+
+
+def plot_equity_curves(
+    curves: Mapping[str, pd.Series],
+    *,
+    title: str,
+    path: Path | None = None,
+    labels: Mapping[str, str] | None = None,
+    show: bool = False,
+) -> Path | None:
+    """
+    Equity curves on a log scale, saved to `path` (and shown if show=True).
+
+    matplotlib is imported here and not at module level, so headless runs that
+    never plot do not pay for (or need) it.
+    """
+    try:
+        import matplotlib
+    except ImportError as e:
+        raise RuntimeError("Plotting needs matplotlib (pip install matplotlib)") from e
+
+    if not show:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    labels = labels or {}
+
+    plt.style.use("dark_background")
+    fig = plt.figure(figsize=(12, 6))
+
+    for name, curve in curves.items():
+        plt.plot(curve, label=labels.get(name, name), **_CURVE_STYLE.get(name, {}))
+
+    plt.title(title, fontsize=14)
+    plt.ylabel("Equity Multiple (Log Scale)")
+    plt.yscale("log")
+    plt.grid(True, alpha=0.2)
+    plt.legend()
+
+    if path is not None:
+        fig.savefig(path)
+    if show:
+        plt.show()
+    plt.close(fig)
+    return path
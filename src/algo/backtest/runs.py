@@ -1,7 +1,38 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
+from typing import Any
+
+import pandas as pd
 
 from algo.config import settings
+from algo.profiling import span
+
+# Default settings for run_backtest_realistic (same as run_backtest.py has always used)
+DEFAULT_ENGINE_CONFIG: dict[str, Any] = {
+    "initial_capital": 100_000.0,
+    "commission_pct": 0.0015,
+    "allow_fractional": False,
+    "drift_tolerance": 0.05,
+}
+
+
+@dataclass
+class BacktestResult:
+    """
+    Output of one strategy run: equity curve(s) per engine + stats per curve.
+    """
+
+    fast_equity: pd.Series | None = None
+    real_results: pd.DataFrame | None = None
+    stats: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def real_equity(self) -> pd.Series | None:
+        if self.real_results is None:
+            return None
+        return self.real_results["equity"]
 
 
 def make_run_dir(prefix: str) -> Path:
@@ -13,3 +44,70 @@ def make_run_dir(prefix: str) -> Path:
     run_dir = settings.artifacts_dir / "backtests" / f"{ts}_{prefix}"
     run_dir.mkdir(parents=True, exist_ok=False)
     return run_dir
+
+
+def build_weights(strategy_name: str, px: pd.DataFrame, **params: Any) -> pd.DataFrame:
+    """
+    Dispatcher: Sender dataen til den rigtige strategi-funktion.
+    Strategierne importeres først her, så kun den valgte bliver loadet.
+    """
+    if strategy_name == "sma_trend":
+        from algo.strategies.sma_trend import sma_trend_weights_by_day
+
+        return sma_trend_weights_by_day(px, **params)
+
+    elif strategy_name == "dip_buyer":
+        from algo.strategies.dip_buyer import dip_buyer_weights_by_day
+
+        return dip_buyer_weights_by_day(px, **params)
+
+    elif strategy_name == "momentum":
+        from algo.strategies.momentum import momentum_weights_by_day
+
+        return momentum_weights_by_day(px, **params)
+
+    elif strategy_name == "risk_parity":
+        from algo.strategies.risk_parity import risk_parity_weights_by_day
+
+        return risk_parity_weights_by_day(px, **params)
+
+    else:
+        raise ValueError(f"Ukendt strategi: '{strategy_name}'")
+
+
+def execute_backtest(
+    px: pd.DataFrame,
+    strategy: str,
+    params: dict[str, Any] | None = None,
+    *,
+    engines: Sequence[str] = ("fast", "real"),
+    engine_config: dict[str, Any] | None = None,
+    returns: pd.DataFrame | None = None,
+) -> BacktestResult:
+    """
+    Compute weights for `strategy`, run the requested engines and their stats.
+    engines: any of "fast" (run_backtest_fast_daily) and "real" (run_backtest_realistic).
+    returns: optional precomputed returns of px (passed to the fast engine).
+    """
+    from algo.backtest.engine_fast import run_backtest_fast_daily
+    from algo.backtest.engine_realistic import run_backtest_realistic
+    from algo.backtest.stats import compute_stats
+
+    unknown = set(engines) - {"fast", "real"}
+    if unknown:
+        raise ValueError(f"Unknown engines: {sorted(unknown)}")
+
+    with span(f"strategy.{strategy}"):
+        wmat = build_weights(strategy, px, **(params or {}))
+    result = BacktestResult()
+
+    if "fast" in engines:
+        result.fast_equity = run_backtest_fast_daily(px, wmat, returns=returns)
+        result.stats["fast"] = compute_stats(result.fast_equity)
+
+    if "real" in engines:
+        cfg = {**DEFAULT_ENGINE_CONFIG, **(engine_config or {})}
+        result.real_results = run_backtest_realistic(px, wmat, **cfg)
+        result.stats["real"] = compute_stats(result.real_results["equity"])
+
+    return result
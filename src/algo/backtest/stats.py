@@ -1,35 +1,172 @@
-import pandas as pd
 import numpy as np
+import pandas as pd
 
+STAT_COLUMNS = ["CAGR", "Vol", "Sharpe", "MaxDD", "Sortino", "Calmar"]
 
-def compute_stats(equity_curve: pd.Series, trading_days: int = 252) -> dict[str, float]:
+
+def _as_curve_matrix(curves: pd.DataFrame | pd.Series | np.ndarray) -> tuple[np.ndarray, pd.Index]:
     """
-    Beregner de vigtigste nøgletal for en equity curve (der starter på 1.0).
+    Normaliser input til (curves × dates) float-matrix + kurve-navne.
+    Rækkerne er contiguous, så reduktioner pr. kurve giver samme tal som pandas på én Series.
     """
-    if equity_curve.empty:
-        return {}
+    if isinstance(curves, pd.Series):
+        curves = curves.to_frame(name=curves.name if curves.name is not None else 0)
+
+    if isinstance(curves, pd.DataFrame):
+        names = curves.columns
+        values = curves.to_numpy(dtype=float)
+    else:
+        values = np.asarray(curves, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        names = pd.RangeIndex(values.shape[1])
+
+    return np.ascontiguousarray(values.T), names
+
+
+def _last_valid(values: np.ndarray) -> np.ndarray:
+    """Sidste ikke-NaN værdi pr. række (NaN hvis rækken er tom)."""
+    valid = ~np.isnan(values)
+    last_pos = values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    out = values[np.arange(values.shape[0]), last_pos]
+    return np.where(valid.any(axis=1), out, np.nan)
+
+
+def _nanstd(rets: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Std (ddof=1) pr. række. Rækker uden NaN går gennem np.std direkte, så
+    summationsrækkefølgen er den samme som pandas' Series.std().
+    """
+    out = np.full(rets.shape[0], np.nan)
+    full = valid.all(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if full.any() and rets.shape[1] > 1:
+            out[full] = rets[full].std(axis=1, ddof=1)
+        if (~full).any():
+            out[~full] = np.nanstd(rets[~full], axis=1, ddof=1)
+    return out
+
+
+def compute_stats_batch(
+    curves: pd.DataFrame | pd.Series | np.ndarray,
+    trading_days: int = 252,
+    *,
+    turnover: pd.DataFrame | np.ndarray | None = None,
+    cost_per_turnover: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Nøgletal for mange equity curves i ét vektoriseret pass.
+
+    - curves: dates × curves (DataFrame, Series eller ndarray). Kurver må starte/slutte
+      på forskellige datoer (NaN før/efter).
+    - turnover: valgfri dates × curves matrix med daglig turnover (sum af |Δvægt|).
+      Giver kolonnerne "Turnover" (årlig) og "CAGR_net" (efter cost_per_turnover).
+
+    Returnerer en DataFrame (curve × stat).
+    """
+    values, names = _as_curve_matrix(curves)
+
+    if values.shape[1] == 0:
+        return pd.DataFrame(index=names, columns=STAT_COLUMNS, dtype=float)
+
+    # Daglige afkast (samme formel som pct_change)
+    rets = values[:, 1:] / values[:, :-1] - 1
+    valid = ~np.isnan(rets)
+    n_rets = valid.sum(axis=1)
 
-    # Daglige afkast
-    rets = equity_curve.pct_change().dropna()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # CAGR
+        years = n_rets / trading_days
+        last = _last_valid(values)
+        cagr = np.where(years > 0, last ** (1 / years) - 1, 0.0)
 
-    # CAGR (Årligt gennemsnitligt afkast)
-    years = len(rets) / trading_days
-    cagr = (equity_curve.iloc[-1] ** (1 / years)) - 1 if years > 0 else 0.0
+        # Årlig volatilitet og Sharpe (0% risikofri rente)
+        vol = _nanstd(rets, valid) * np.sqrt(trading_days)
+        sharpe = np.where(vol > 0, cagr / vol, 0.0)
 
-    # Årlig Volatilitet (Risiko)
-    vol = rets.std() * np.sqrt(trading_days)
+        # Sortino: kun nedsiderisiko
+        downside = np.where(valid, np.minimum(rets, 0.0), 0.0)
+        down_dev = np.sqrt((downside**2).sum(axis=1) / n_rets) * np.sqrt(trading_days)
+        sortino = np.where(down_dev > 0, cagr / down_dev, 0.0)
 
-    # Sharpe Ratio (Antager 0% risikofri rente for simpelhedens skyld)
-    sharpe = cagr / vol if vol > 0 else 0.0
+        # Maximum Drawdown
+        roll_max = np.fmax.accumulate(values, axis=1)
+        max_dd = np.nanmin((values - roll_max) / roll_max, axis=1)
 
-    # Maximum Drawdown (Hvor stort var det største dyk fra toppen?)
-    roll_max = equity_curve.cummax()
-    drawdown = (equity_curve - roll_max) / roll_max
-    max_dd = drawdown.min()
+        calmar = np.where(max_dd < 0, cagr / np.abs(max_dd), 0.0)
+
+    out = pd.DataFrame(
+        {
+            "CAGR": cagr,
+            "Vol": vol,
+            "Sharpe": sharpe,
+            "MaxDD": max_dd,
+            "Sortino": sortino,
+            "Calmar": calmar,
+        },
+        index=names,
+    )
+
+    if turnover is not None:
+        to, _ = _as_curve_matrix(turnover)
+        if to.shape != values.shape:
+            raise ValueError(f"turnover shape {to.T.shape} does not match curves {values.T.shape}")
+        to = np.nan_to_num(to[:, 1:])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            net = np.where(valid, rets - to * cost_per_turnover, 0.0)
+            net_growth = np.prod(1.0 + net, axis=1)
+            out["Turnover"] = np.where(valid, to, 0.0).sum(axis=1) / years
+            out["CAGR_net"] = np.where(years > 0, net_growth ** (1 / years) - 1, 0.0)
+
+    return out
+
+
+def compute_turnover(weights_by_day: pd.DataFrame) -> pd.Series:
+    """
+    Daglig turnover for en vægtmatrix: sum af |w_t - w_{t-1}| over assets.
+    """
+    w = weights_by_day.fillna(0.0)
+    turnover = w.diff().abs().sum(axis=1)
+    turnover.iloc[:1] = w.iloc[:1].abs().sum(axis=1)
+    turnover.name = "turnover"
+    return turnover
+
+
+def compute_rolling_stats(
+    curves: pd.DataFrame | pd.Series,
+    window: int = 252,
+    trading_days: int = 252,
+) -> pd.DataFrame:
+    """
+    Rullende nøgletal for alle kurver på én gang.
+    Returnerer en DataFrame med MultiIndex-kolonner (stat, curve).
+    """
+    if isinstance(curves, pd.Series):
+        curves = curves.to_frame()
+
+    rets = curves.pct_change()
+
+    ann_ret = (curves / curves.shift(window)) ** (trading_days / window) - 1
+    vol = rets.rolling(window, min_periods=window).std() * np.sqrt(trading_days)
+    sharpe = (ann_ret / vol).where(vol > 0)
+    peak = curves.rolling(window, min_periods=1).max()
+    drawdown = curves / peak - 1
+
+    return pd.concat(
+        {"CAGR": ann_ret, "Vol": vol, "Sharpe": sharpe, "Drawdown": drawdown},
+        axis=1,
+        names=["stat", "curve"],
+    )
+
+
+def compute_stats(equity_curve: pd.Series, trading_days: int = 252) -> dict[str, float]:
+    """
+    Beregner de vigtigste nøgletal for en equity curve (der starter på 1.0).
+    Tynd wrapper om compute_stats_batch().
+    """
+    if equity_curve.empty:
+        return {}
 
-    return {
-        "CAGR": cagr,
-        "Vol": vol,
-        "Sharpe": sharpe,
-        "MaxDD": max_dd
-    }
\ No newline at end of file
+    row = compute_stats_batch(equity_curve, trading_days=trading_days).iloc[0]
+    return {k: float(v) for k, v in row.items()}
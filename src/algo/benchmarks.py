@@ -0,0 +1,356 @@
+"""
+Benchmarks for the data, strategy and engine hot paths.
+
+Every case runs on synthetic panels (algo.data.synthetic) of several sizes
+(assets × years) and records wall time (best and median of `repeats` runs) and
+peak Python memory (tracemalloc, one separate warm-up run). Results are written as JSON
+to artifacts/benchmarks/; compare_results() flags regressions against a stored
+baseline (artifacts/benchmarks/baseline.json by default).
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from algo.config import settings
+
+DEFAULT_SIZES: list[tuple[int, int]] = [(100, 10), (500, 20)]
+QUICK_SIZES: list[tuple[int, int]] = [(30, 6)]
+
+
+@dataclass
+class Panel:
+    """
+    Inputs shared by the cases of one size (built once, outside the timings).
+    """
+
+    assets: int
+    years: int
+    canonical: pd.DataFrame
+    prices: pd.DataFrame
+    weights: pd.DataFrame
+    equity: pd.Series
+
+
+@dataclass
+class BenchCase:
+    name: str
+    # setup(panel, max_assets) -> the zero-argument callable that is timed
+    setup: Callable[[Panel, int | None], Callable[[], Any]]
+    repeats: int = 3
+    # cap on assets for slow per-asset code (None = the whole panel)
+    max_assets: int | None = None
+
+
+@dataclass
+class BenchResult:
+    case: str
+    assets: int
+    years: int
+    rows: int
+    repeats: int
+    seconds_min: float
+    seconds_median: float
+    peak_mb: float
+
+
+# ==========================
+# Cases
+# ==========================
+
+
+def _ffill_case(panel: Panel, max_assets: int | None) -> Callable[[], Any]:
+    from algo.data.cleaning import FFILL_LIMIT, ffill_small_gaps_only
+
+    px = panel.canonical.xs("adj_close", axis=1, level="field").iloc[:, :max_assets]
+    return lambda: [ffill_small_gaps_only(px[c], max_gap=FFILL_LIMIT) for c in px.columns]
+
+
+def _auto_start_case(panel: Panel, max_assets: int | None) -> Callable[[], Any]:
+    from algo.data.cleaning import _find_auto_start
+
+    px = panel.canonical.xs("adj_close", axis=1, level="field").iloc[:, :max_assets]
+    return lambda: [_find_auto_start(px[c]) for c in px.columns]
+
+
+def _build_cleaned_case(panel: Panel, max_assets: int | None) -> Callable[[], Any]:
+    from algo.data.cleaning import build_cleaned_ohlcv
+
+    return build_cleaned_ohlcv
+
+
+def _load_cleaned_case(panel: Panel, max_assets: int | None) -> Callable[[], Any]:
+    from algo.data.cleaning import load_cleaned_field
+
+    return lambda: load_cleaned_field("adj_close")
+
+
+def _strategy_case(name: str) -> Callable[[Panel, int | None], Callable[[], Any]]:
+    def setup(panel: Panel, max_assets: int | None) -> Callable[[], Any]:
+        from algo.backtest.runs import build_weights
+        from algo.indicators import IndicatorCache
+
+        px = panel.prices.iloc[:, :max_assets]
+        # a fresh indicator cache per call: the indicators are part of the work
+        return lambda: build_weights(name, px, cache=IndicatorCache())
+
+    return setup
+
+
+def _fast_engine_case(panel: Panel, max_assets: int | None) -> Callable[[], Any]:
+    from algo.backtest.engine_fast import run_backtest_fast_daily
+
+    px, w = panel.prices.iloc[:, :max_assets], panel.weights.iloc[:, :max_assets]
+    return lambda: run_backtest_fast_daily(px, w)
+
+
+def _real_engine_case(panel: Panel, max_assets: int | None) -> Callable[[], Any]:
+    from algo.backtest.engine_realistic import run_backtest_realistic
+    from algo.backtest.runs import DEFAULT_ENGINE_CONFIG
+
+    px, w = panel.prices.iloc[:, :max_assets], panel.weights.iloc[:, :max_assets]
+    return lambda: run_backtest_realistic(px, w, **DEFAULT_ENGINE_CONFIG)
+
+
+def _stats_case(panel: Panel, max_assets: int | None) -> Callable[[], Any]:
+    from algo.backtest.stats import compute_stats
+
+    return lambda: compute_stats(panel.equity)
+
+
+CASES: list[BenchCase] = [
+    BenchCase("ffill_small_gaps_only", _ffill_case),
+    BenchCase("find_auto_start", _auto_start_case, repeats=1, max_assets=50),
+    BenchCase("build_cleaned_ohlcv", _build_cleaned_case, repeats=1),
+    BenchCase("load_cleaned_field", _load_cleaned_case),
+    BenchCase("strategy_sma_trend", _strategy_case("sma_trend")),
+    BenchCase("strategy_dip_buyer", _strategy_case("dip_buyer")),
+    BenchCase("engine_fast", _fast_engine_case),
+    BenchCase("engine_real", _real_engine_case, repeats=1, max_assets=50),
+    BenchCase("compute_stats", _stats_case, repeats=5),
+]
+CASES_BY_NAME: dict[str, BenchCase] = {c.name: c for c in CASES}
+
+
+# ==========================
+# Runner
+# ==========================
+
+
+@contextmanager
+def _synthetic_data(assets: int, years: int, *, seed: int) -> Iterator[Panel]:
+    """
+    Synthetic dataset in a temp dir, with settings pointed at it (restored after).
+    """
+    from algo.data.cleaning import build_cleaned_ohlcv, load_cleaned_field
+    from algo.data.prices import load_canonical_ohlcv
+    from algo.data.synthetic import SyntheticSpec, write_synthetic_dataset
+
+    old = settings.data_dir, settings.registry_path
+    with tempfile.TemporaryDirectory(prefix="algo_bench_") as tmp:
+        data_dir = Path(tmp)
+        # all history after cleaning.GLOBAL_FLOOR, so `years` is what gets cleaned
+        spec = SyntheticSpec(n_assets=assets, years=years, start="2005-01-03", seed=seed)
+        try:
+            settings.registry_path = write_synthetic_dataset(spec, data_dir)
+            settings.data_dir = data_dir
+
+            build_cleaned_ohlcv()
+            prices = load_cleaned_field("adj_close")
+            # equal weight over the assets trading that day
+            active = prices.notna().astype(float)
+            weights = active.div(active.sum(axis=1).replace(0.0, np.nan), axis=0).fillna(0.0)
+            rng = np.random.default_rng(seed)
+            equity = pd.Series(
+                np.cumprod(1 + rng.normal(0.0003, 0.01, len(prices))), index=prices.index
+            )
+
+            yield Panel(assets, years, load_canonical_ohlcv(), prices, weights, equity)
+        finally:
+            settings.data_dir, settings.registry_path = old
+
+
+def _measure(fn: Callable[[], Any], repeats: int) -> tuple[list[float], float]:
+    # separate run for memory (tracemalloc slows the code down); doubles as warm-up
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times, peak / 1024**2
+
+
+def run_benchmarks(
+    *,
+    sizes: Sequence[tuple[int, int]] = DEFAULT_SIZES,
+    cases: Sequence[str] | None = None,
+    repeats: int | None = None,
+    seed: int = 0,
+    verbose: bool = True,
+) -> list[BenchResult]:
+    """
+    Run the selected cases (default: all) for each (assets, years) size.
+    repeats overrides the per-case number of timed runs.
+    """
+    unknown = set(cases or []) - set(CASES_BY_NAME)
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {sorted(unknown)}")
+    selected = [c for c in CASES if cases is None or c.name in cases]
+
+    results: list[BenchResult] = []
+    for assets, years in sizes:
+        with _synthetic_data(assets, years, seed=seed) as panel:
+            for case in selected:
+                fn = case.setup(panel, case.max_assets)
+                n = repeats or case.repeats
+                times, peak_mb = _measure(fn, n)
+                res = BenchResult(
+                    case=case.name,
+                    assets=min(assets, case.max_assets or assets),
+                    years=years,
+                    rows=len(panel.prices),
+                    repeats=n,
+                    seconds_min=min(times),
+                    seconds_median=statistics.median(times),
+                    peak_mb=peak_mb,
+                )
+                results.append(res)
+                if verbose:
+                    print(
+                        f"  {res.case:24} {res.assets:>6}x{res.years:<3} "
+                        f"{res.seconds_min:9.4f}s  {res.peak_mb:9.1f} MB"
+                    )
+    return results
+
+
+# ==========================
+# Storage + compare
+# ==========================
+
+
+def benchmarks_dir() -> Path:
+    base = settings.artifacts_dir / "benchmarks"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def baseline_path() -> Path:
+    return benchmarks_dir() / "baseline.json"
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.project_root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def write_results(results: Sequence[BenchResult], path: Path | None = None) -> Path:
+    """
+    Write results (+ environment metadata) to JSON; default
+    artifacts/benchmarks/<timestamp>.json.
+    """
+    ts = datetime.now()
+    path = path or benchmarks_dir() / f"{ts.strftime('%Y-%m-%d_%H%M%S')}.json"
+    payload = {
+        "meta": {
+            "timestamp": ts.isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": [asdict(r) for r in results],
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
+def load_results(path: Path) -> list[BenchResult]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [BenchResult(**r) for r in data["results"]]
+
+
+def compare_results(
+    current: Sequence[BenchResult],
+    baseline: Sequence[BenchResult],
+    *,
+    threshold: float = 0.20,
+    min_seconds: float = 0.005,
+    min_mb: float = 1.0,
+) -> pd.DataFrame:
+    """
+    One row per (case, assets, years) with time/memory ratios against baseline.
+
+    status is "regression" when the best time or peak memory grew by more than
+    `threshold` (relative), "improvement" when the time shrank by more than that,
+    else "ok"; "new" for cases the baseline lacks. Times below min_seconds and
+    peaks below min_mb (tracemalloc) are noise and never count as a regression.
+    """
+    base = {(r.case, r.assets, r.years): r for r in baseline}
+    rows = []
+    for r in current:
+        b = base.get((r.case, r.assets, r.years))
+        row: dict[str, Any] = {
+            "case": r.case,
+            "assets": r.assets,
+            "years": r.years,
+            "seconds": r.seconds_min,
+            "peak_mb": r.peak_mb,
+        }
+        if b is None:
+            rows.append({**row, "status": "new"})
+            continue
+
+        time_ratio = r.seconds_min / b.seconds_min if b.seconds_min > 0 else float("nan")
+        mem_ratio = r.peak_mb / b.peak_mb if b.peak_mb > 0 else float("nan")
+        timed = max(r.seconds_min, b.seconds_min) >= min_seconds
+        sized = max(r.peak_mb, b.peak_mb) >= min_mb
+
+        if (timed and time_ratio > 1 + threshold) or (sized and mem_ratio > 1 + threshold):
+            status = "regression"
+        elif timed and time_ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+
+        rows.append(
+            {
+                **row,
+                "baseline_seconds": b.seconds_min,
+                "time_ratio": time_ratio,
+                "baseline_peak_mb": b.peak_mb,
+                "mem_ratio": mem_ratio,
+                "status": status,
+            }
+        )
+    return pd.DataFrame(rows)
@@ -11,5 +11,43 @@ class Settings(BaseSettings):
     data_dir: Path = project_root / "data"
     artifacts_dir: Path = project_root / "artifacts"
 
+    # price downloads: retries of transient errors (backoff doubles per retry)
+    fetch_retries: int = 2
+    fetch_retry_backoff: float = 1.0
+
+    # provider circuit breaker: skip a provider for `cooldown` seconds after
+    # `threshold` consecutive failures within `window` seconds
+    provider_failure_threshold: int = 5
+    provider_failure_window: float = 300.0
+    provider_cooldown: float = 600.0
+    provider_health_persist: bool = False
+
+    # ingest metrics as a Prometheus textfile (node_exporter textfile collector dir)
+    prometheus_textfile_dir: Path | None = None
+
+    # opt-in timing/counter profile per run (artifacts/profiles), see algo.profiling
+    profile: bool = False
+
+    # also write float32 / dictionary-encoded copies of the datasets, see algo.data.compact
+    compact_datasets: bool = False
+
+    # content-addressed snapshot of canonical/cleaned after each rebuild, see algo.data.snapshots
+    snapshot_datasets: bool = True
+
+    # local panel server socket (algo.data.panel_server); load_cleaned_field asks it first
+    panel_socket: Path | None = None
+
+    # asset registry (default: src/algo/symbols/assets.yaml)
+    registry_path: Path | None = None
+
+    # backtest result cache (artifacts/cache/backtests)
+    backtest_cache_max_bytes: int = 2 * 1024**3
+    backtest_cache_max_entries: int = 500
+
+    # shared indicator cache (memory LRU + optional parquet tier)
+    indicator_cache_max_bytes: int = 1024**3
+    indicator_cache_dir: Path | None = None
+    indicator_cache_disk_max_bytes: int = 4 * 1024**3
+
 
 settings = Settings()
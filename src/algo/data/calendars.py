@@ -0,0 +1,335 @@
+"""
+Trading calendars: which calendar an asset trades on, and per-calendar panels.
+
+The canonical and cleaned datasets put every asset on one union date index, so
+an FX pair (weekdays) or a Copenhagen equity (Danish holidays) next to US
+assets gets a NaN row on every day only the other calendars trade. Next to
+each dataset file the same data is stored split by calendar, each panel on its
+own trading days only:
+
+    data/cleaned/ohlcv.parquet            all assets, union index
+    data/cleaned/calendars/us.parquet     US equities/ETFs
+    data/cleaned/calendars/fx.parquet     FX pairs
+    data/cleaned/calendars/dk.parquet     Copenhagen equities ...
+
+An asset's calendar comes from the registry (an explicit `calendar`, else the
+exchange suffix of its provider symbols, else its kind); assets the registry
+cannot place get one inferred from the dates they have data on. The shipped
+registry is not single-calendar: novo-b-co (.CO) is on "dk", the rest on "us".
+
+Cleaning runs per calendar, so an asset's coverage and gap fills count only
+its own calendar's days. Compared with cleaning on the union index, the
+cleaned rows of assets on a minority calendar (novo-b-co) can differ.
+
+Storage: the union file is still written and stays the default view. The
+returns panels, the panel server and the chunked engines read it, so its
+in-memory NaN padding is only avoided by readers that ask for calendar
+panels. Every build therefore stores the data twice: the calendar panels
+take about as much disk as the union file (parquet compresses the padding,
+so the union file is barely larger), roughly doubling data/canonical/ and
+data/cleaned/. A single-calendar universe gets one panel
+that duplicates the union file.
+
+Loaders return one calendar (load_calendar_field) or one frame per calendar
+(load_calendar_fields); align_calendars() puts several on a common index only
+when asked: the union of days, one calendar's days (e.g. FX seen on US trading
+days) or a coarser frequency ("W-FRI", "ME").
+"""
+
+from functools import reduce
+from pathlib import Path
+from typing import Literal
+
+import pandas as pd
+from pandas.tseries.holiday import USFederalHolidayCalendar
+from pandas.tseries.offsets import CustomBusinessDay
+
+from algo.data.fingerprint import file_fingerprint
+from algo.symbols.registry import get_asset
+
+Dataset = Literal["canonical", "cleaned"]
+
+DEFAULT_CALENDAR = "us"
+
+KIND_CALENDAR: dict[str, str] = {"equity": "us", "etf": "us", "fx": "fx", "crypto": "crypto"}
+
+# provider symbol suffix (yahoo / stooq conventions) -> calendar
+SUFFIX_CALENDAR: dict[str, str] = {
+    "=x": "fx",
+    "-usd": "crypto",
+    ".us": "us",
+    ".co": "dk",
+    ".st": "se",
+    ".ol": "no",
+    ".he": "fi",
+    ".de": "de",
+    ".l": "uk",
+    ".uk": "uk",
+}
+
+WEEKEND_SHARE = 0.1  # share of weekend rows above which data is taken as crypto (7/7)
+FX_WEEKDAY_SHARE = 0.99  # share of weekdays with data above which data is taken as FX
+
+
+def calendar_days(calendar: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
+    """
+    Trading days of a generated calendar ("us", "fx", "crypto") between start and end.
+    """
+    if calendar == "crypto":
+        return pd.date_range(start, end, freq="D")
+    if calendar == "fx":
+        return pd.bdate_range(start, end)
+    if calendar == "us":
+        return pd.date_range(
+            start, end, freq=CustomBusinessDay(calendar=USFederalHolidayCalendar())
+        )
+    raise ValueError(f"Unknown calendar: {calendar}")
+
+
+# ==========================
+# Assignment
+# ==========================
+
+
+def _registry_calendar(asset_key: str) -> str | None:
+    try:
+        asset = get_asset(asset_key)
+    except KeyError:
+        return None
+
+    if asset.calendar is not None:
+        return asset.calendar
+    for symbol in asset.identifiers.values():
+        for suffix, calendar in SUFFIX_CALENDAR.items():
+            if symbol.lower().endswith(suffix):
+                return calendar
+    return KIND_CALENDAR.get(asset.kind)
+
+
+def infer_calendar(dates: pd.DatetimeIndex) -> str:
+    """
+    Calendar from the dates an asset has data on: weekend rows -> "crypto",
+    (nearly) every weekday -> "fx", otherwise DEFAULT_CALENDAR.
+    """
+    if len(dates) == 0:
+        return DEFAULT_CALENDAR
+    if (dates.dayofweek >= 5).mean() > WEEKEND_SHARE:
+        return "crypto"
+    weekdays = pd.bdate_range(dates.min(), dates.max())
+    if weekdays.isin(dates).mean() >= FX_WEEKDAY_SHARE:
+        return "fx"
+    return DEFAULT_CALENDAR
+
+
+def asset_calendar(asset_key: str, dates: pd.DatetimeIndex | None = None) -> str:
+    """
+    Calendar of one asset: from the registry, else inferred from `dates` (the
+    rows it has data on), else DEFAULT_CALENDAR.
+    """
+    calendar = _registry_calendar(asset_key)
+    if calendar is not None:
+        return calendar
+    if dates is not None:
+        return infer_calendar(dates)
+    return DEFAULT_CALENDAR
+
+
+def asset_calendars(wide: pd.DataFrame) -> dict[str, str]:
+    """
+    asset -> calendar for a wide (asset, field) frame, in column order. The data
+    is only looked at for assets the registry cannot place.
+    """
+    out: dict[str, str] = {}
+    for asset in wide.columns.get_level_values("asset").unique():
+        calendar = _registry_calendar(asset)
+        if calendar is None:
+            calendar = infer_calendar(wide[asset].dropna(how="all").index)
+        out[asset] = calendar
+    return out
+
+
+def split_by_calendar(
+    wide: pd.DataFrame, calendars: dict[str, str] | None = None
+) -> dict[str, pd.DataFrame]:
+    """
+    Wide (asset, field) frame -> one frame per calendar, each without the rows
+    where none of its assets has data. calendars: asset -> calendar (default:
+    asset_calendars(wide)).
+    """
+    calendars = calendars or asset_calendars(wide)
+    level = wide.columns.get_level_values("asset")
+
+    out: dict[str, pd.DataFrame] = {}
+    for calendar in sorted(set(calendars.values())):
+        members = [a for a, c in calendars.items() if c == calendar]
+        out[calendar] = wide.loc[:, level.isin(members)].dropna(how="all")
+    return out
+
+
+# ==========================
+# Storage
+# ==========================
+
+
+def _dataset_path(dataset: Dataset) -> Path:
+    from algo.data.cleaning import cleaned_path
+    from algo.data.prices import canonical_ohlcv_path
+
+    if dataset == "cleaned":
+        return cleaned_path()
+    if dataset == "canonical":
+        return canonical_ohlcv_path()
+    raise ValueError(f"Unknown dataset: {dataset}")
+
+
+def calendar_dir(dataset: Dataset = "cleaned", *, path: Path | None = None) -> Path:
+    """
+    Directory of the per-calendar panels of a dataset file (default: the dataset's).
+    """
+    return (path or _dataset_path(dataset)).parent / "calendars"
+
+
+def calendar_path(calendar: str, *, dataset: Dataset = "cleaned", path: Path | None = None) -> Path:
+    return calendar_dir(dataset, path=path) / f"{calendar}.parquet"
+
+
+def write_calendar_panels(
+    wide: pd.DataFrame,
+    path: Path,
+    *,
+    calendars: dict[str, str] | None = None,
+) -> dict[str, Path]:
+    """
+    Write the per-calendar panels of the dataset written to `path`; panels of
+    calendars no longer present are removed. Returns calendar -> path.
+    Together the panels take about the disk space of the file at `path`.
+    """
+    base = path.parent / "calendars"
+    base.mkdir(parents=True, exist_ok=True)
+
+    written: dict[str, Path] = {}
+    for calendar, panel in split_by_calendar(wide, calendars).items():
+        written[calendar] = base / f"{calendar}.parquet"
+        panel.to_parquet(written[calendar])
+
+    for stale in base.glob("*.parquet"):
+        if stale.stem not in written:
+            stale.unlink()
+    return written
+
+
+def list_calendars(*, dataset: Dataset = "cleaned", path: Path | None = None) -> list[str]:
+    base = calendar_dir(dataset, path=path)
+    return sorted(p.stem for p in base.glob("*.parquet"))
+
+
+def load_calendar_ohlcv(
+    calendar: str, *, dataset: Dataset = "cleaned", path: Path | None = None
+) -> pd.DataFrame:
+    """
+    One calendar's panel (MultiIndex columns: asset, field) on its own trading days.
+    """
+    file = calendar_path(calendar, dataset=dataset, path=path)
+    if not file.exists():
+        available = list_calendars(dataset=dataset, path=path)
+        raise FileNotFoundError(
+            f"No {dataset} panel for calendar '{calendar}' at {file}. Available: {available}"
+        )
+    df = pd.read_parquet(file)
+    df.index = pd.to_datetime(df.index)
+    return df.sort_index()
+
+
+def load_calendar_field(
+    field: str,
+    calendar: str,
+    *,
+    dataset: Dataset = "cleaned",
+    path: Path | None = None,
+) -> pd.DataFrame:
+    """
+    Wide (date × asset) frame for one field of one calendar. attrs carry the
+    panel's version, the field and the calendar (like load_cleaned_field).
+    """
+    df = load_calendar_ohlcv(calendar, dataset=dataset, path=path)
+    if field not in df.columns.get_level_values("field"):
+        available = sorted(set(df.columns.get_level_values("field")))
+        raise KeyError(f"Field '{field}' not found. Available fields: {available}")
+
+    out = df.xs(field, axis=1, level="field")
+    out.attrs["dataset_version"] = file_fingerprint(
+        calendar_path(calendar, dataset=dataset, path=path)
+    )
+    out.attrs["field"] = field
+    out.attrs["calendar"] = calendar
+    return out
+
+
+def load_calendar_fields(
+    field: str,
+    *,
+    calendars: list[str] | None = None,
+    dataset: Dataset = "cleaned",
+    path: Path | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    calendar -> wide frame for one field, each on its own trading days.
+    """
+    calendars = calendars or list_calendars(dataset=dataset, path=path)
+    return {c: load_calendar_field(field, c, dataset=dataset, path=path) for c in calendars}
+
+
+# ==========================
+# Alignment
+# ==========================
+
+
+def align_calendars(
+    panels: dict[str, pd.DataFrame],
+    *,
+    to: str | pd.DatetimeIndex = "union",
+    freq: str | None = None,
+    ffill_limit: int | None = None,
+) -> pd.DataFrame:
+    """
+    One wide frame from per-calendar frames (e.g. load_calendar_fields()).
+
+    to: "union" (every day any calendar trades), "intersection" (days all of
+        them trade), a calendar in panels (its trading days) or a DatetimeIndex.
+    freq: resample each calendar first (last value per period, e.g. "W-FRI",
+        "ME"), so calendars meet on period ends instead of days.
+    ffill_limit: carry a calendar's last row into at most this many rows of
+        the target index on which that calendar does not trade (None: leave
+        them NaN). Missing data on a calendar's own trading days is not filled.
+    """
+    if not panels:
+        raise ValueError("No panels to align")
+
+    if freq is not None:
+        panels = {c: p.resample(freq).last().dropna(how="all") for c, p in panels.items()}
+
+    if isinstance(to, pd.DatetimeIndex):
+        target = to
+    elif to == "union":
+        target = reduce(pd.Index.union, [p.index for p in panels.values()])
+    elif to == "intersection":
+        target = reduce(pd.Index.intersection, [p.index for p in panels.values()])
+    elif to in panels:
+        target = panels[to].index
+    else:
+        raise ValueError(f"Unknown alignment target: {to}. Calendars: {sorted(panels)}")
+
+    frames: list[pd.DataFrame] = []
+    for panel in panels.values():
+        if ffill_limit is None:
+            frames.append(panel.reindex(target))
+            continue
+        full = panel.reindex(panel.index.union(target))
+        off_calendar = ~full.index.isin(panel.index)
+        full.loc[off_calendar] = full.ffill(limit=ffill_limit).loc[off_calendar]
+        frames.append(full.reindex(target))
+
+    out = pd.concat(frames, axis=1)
+    out.index.name = "date"
+    out.attrs["calendars"] = list(panels)
+    return out
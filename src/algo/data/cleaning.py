@@ -3,7 +3,18 @@ from pathlib import Path
 import pandas as pd
 
 from algo.config import settings
+from algo.data.calendars import (
+    asset_calendars,
+    load_calendar_field,
+    split_by_calendar,
+    write_calendar_panels,
+)
+from algo.data.compact import compact_field, compact_path, read_compact, write_compact_ohlcv
+from algo.data.fingerprint import file_fingerprint
 from algo.data.prices import load_canonical_ohlcv
+from algo.data.returns import build_returns, compute_returns, load_returns
+from algo.data.snapshots import load_snapshot
+from algo.profiling import profiled, span
 
 # ==========================
 # Default parameters
@@ -49,18 +60,31 @@ def ffill_small_gaps_only(s: pd.Series, *, max_gap: int) -> pd.Series:
     return s
 
 
-def _find_auto_start(series: pd.Series) -> pd.Timestamp | None:
+def _gap_filled_returns(series: pd.Series, rets: pd.Series | None) -> pd.Series:
+    """
+    Returns of ffill_small_gaps_only(series) (as pct_change() on it would give),
+    taken from the precomputed gap-bridged returns of the raw series: a return
+    counts where the previous row has a (possibly filled) price.
+    """
+    if rets is None:
+        rets = compute_returns(series.to_frame(), kind="simple").iloc[:, 0]
+    filled = ffill_small_gaps_only(series, max_gap=FFILL_LIMIT)
+    return rets.reindex(series.index).where(filled.shift().notna())
+
+
+@profiled
+def _find_auto_start(series: pd.Series, rets: pd.Series | None = None) -> pd.Timestamp | None:
     """
     Find first stable start date.
     Stable = next STABLE_WINDOW days:
         - high coverage
         - no extreme returns
+    rets: gap-bridged returns of series (see algo.data.returns); computed if None.
     """
     if series.dropna().empty:
         return None
 
-    series_for_rets = ffill_small_gaps_only(series, max_gap=FFILL_LIMIT)
-    rets = series_for_rets.pct_change()
+    rets = _gap_filled_returns(series, rets)
 
     dates = series.index
 
@@ -77,9 +101,11 @@ def _find_auto_start(series: pd.Series) -> pd.Timestamp | None:
     return None
 
 
-def _clean_single_asset(df: pd.DataFrame, asset: str):
+@profiled
+def _clean_single_asset(df: pd.DataFrame, asset: str, rets: pd.Series | None = None):
     """
     Clean OHLCV data for single asset.
+    rets: gap-bridged returns of the price series used (adj_close, else close).
     """
     asset_df = df[asset].copy()
 
@@ -89,7 +115,10 @@ def _clean_single_asset(df: pd.DataFrame, asset: str):
     else:
         price_series = asset_df["close"]
 
-    auto_start = _find_auto_start(price_series)
+    if rets is None:
+        rets = compute_returns(price_series.to_frame(), kind="simple").iloc[:, 0]
+
+    auto_start = _find_auto_start(price_series, rets)
 
     if auto_start is None:
         return None, None
@@ -110,8 +139,8 @@ def _clean_single_asset(df: pd.DataFrame, asset: str):
         cleaned["adj_close"] if "adj_close" in cleaned.columns else cleaned["close"]
     )
 
-    # compute stats
-    rets = price_series_clean.pct_change()
+    # compute stats (first row has no previous row inside the cleaned slice)
+    rets = rets.loc[start:].where(price_series_clean.shift().notna())
     extreme_mask = rets.abs() > EXTREME_THRESHOLD
 
     info = {
@@ -143,20 +172,32 @@ def eligibility_path() -> Path:
     return base / "eligibility.parquet"
 
 
+@profiled
 def build_cleaned_ohlcv() -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Build cleaned OHLCV dataset from canonical.
     """
     canonical = load_canonical_ohlcv()
+    canonical_rets = load_returns("adj_close", dataset="canonical")
+
+    # each asset is cleaned on its own calendar's trading days, so coverage and
+    # gap lengths are not diluted by days only other calendars trade
+    calendars = asset_calendars(canonical)
+    panels = split_by_calendar(canonical, calendars)
 
     cleaned_frames = []
     eligibility = []
 
-    for asset in canonical.columns.get_level_values("asset").unique():
-        cleaned_asset, info = _clean_single_asset(canonical, asset)
+    for asset, calendar in calendars.items():
+        panel = panels[calendar]
+        rets = canonical_rets.get(asset)
+        if rets is not None:
+            rets = rets.reindex(panel.index)
+        cleaned_asset, info = _clean_single_asset(panel, asset, rets)
 
         if cleaned_asset is None:
             continue
+        info["calendar"] = calendar
 
         cleaned_asset.columns = pd.MultiIndex.from_product(
             [[asset], cleaned_asset.columns],
@@ -166,10 +207,23 @@ def build_cleaned_ohlcv() -> tuple[pd.DataFrame, pd.DataFrame]:
         cleaned_frames.append(cleaned_asset)
         eligibility.append(info)
 
+    return write_cleaned_ohlcv(cleaned_frames, eligibility)
+
+
+@profiled
+def write_cleaned_ohlcv(
+    cleaned_frames: list[pd.DataFrame],
+    eligibility: list[dict],
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Assemble per-asset cleaned frames (MultiIndex columns) and eligibility rows,
+    write the cleaned dataset + eligibility file and the cleaned returns panels.
+    """
     if not cleaned_frames:
         raise ValueError("No assets survived cleaning.")
 
-    cleaned = pd.concat(cleaned_frames, axis=1).sort_index()
+    with span("concat"):
+        cleaned = pd.concat(cleaned_frames, axis=1, sort=True)
     eligibility_df = pd.DataFrame(eligibility).set_index("asset")
 
     # ensure datetime columns are proper dtype
@@ -179,24 +233,113 @@ def build_cleaned_ohlcv() -> tuple[pd.DataFrame, pd.DataFrame]:
                 "%Y-%m-%d"
             )
 
-    cleaned.to_parquet(cleaned_path())
-    eligibility_df.to_parquet(eligibility_path())
+    with span("to_parquet"):
+        cleaned.to_parquet(cleaned_path())
+        eligibility_df.to_parquet(eligibility_path())
+    with span("calendars"):
+        calendars = eligibility_df["calendar"].to_dict() if "calendar" in eligibility_df else None
+        write_calendar_panels(cleaned, cleaned_path(), calendars=calendars)
+    if settings.compact_datasets:
+        with span("compact"):
+            write_compact_ohlcv(cleaned, "cleaned")
+
+    # returns panels for the new dataset version, next to the prices
+    for field in ["close", "adj_close"]:
+        prices = cleaned.xs(field, axis=1, level="field")
+        build_returns(field, dataset="cleaned", prices=prices)
 
     return cleaned, eligibility_df
 
 
-def load_cleaned_ohlcv(*, path: Path | None = None) -> pd.DataFrame:
+def _served_field(field: str) -> pd.DataFrame | None:
+    """
+    The field from the panel server, or None when no server is listening.
+    """
+    from algo.data.panel_server import ServerUnavailable, served_field
+
+    try:
+        return served_field(field, socket_path=settings.panel_socket)
+    except ServerUnavailable:
+        return None
+
+
+def cleaned_dataset_version(*, path: Path | None = None) -> str:
+    """
+    Version token for the cleaned dataset. Changes whenever the file is rewritten.
+    """
+    return file_fingerprint(path or cleaned_path())
+
+
+@profiled
+def load_cleaned_ohlcv(
+    *,
+    path: Path | None = None,
+    compact: bool = False,
+    version: str | None = None,
+) -> pd.DataFrame:
+    """
+    version=: the dataset as of a snapshot id or "latest" (algo.data.snapshots).
+    """
+    if version is not None:
+        return load_snapshot(version, dataset="cleaned")
+    if compact:
+        return read_compact("cleaned", path=path)
     path = path or cleaned_path()
     df = pd.read_parquet(path)
     df.index = pd.to_datetime(df.index)
     return df.sort_index()
 
 
-def load_cleaned_field(field: str, *, path: Path | None = None) -> pd.DataFrame:
+def load_cleaned_field(
+    field: str,
+    *,
+    path: Path | None = None,
+    compact: bool = False,
+    calendar: str | None = None,
+    version: str | None = None,
+) -> pd.DataFrame:
+    """
+    Wide (date × asset) frame for one field. attrs carry the dataset version and
+    field, so downstream caches (indicators) can key on them. compact=True reads
+    the float32 copy (its own version, so cached indicators are not shared).
+    calendar= reads only that calendar's panel, on its own trading days
+    (algo.data.calendars; align several with align_calendars()). version=
+    reads a snapshot (id or "latest"); its dataset_version is the snapshot id.
+    Snapshots hold the full-precision union panel, so version= cannot be
+    combined with calendar= or compact=.
+    With settings.panel_socket the panel server is asked first (algo.data.panel_server).
+    """
+    if version is not None:
+        if calendar is not None or compact:
+            raise ValueError("version= cannot be combined with calendar= or compact=")
+        df = load_cleaned_ohlcv(version=version)
+        out = df.xs(field, axis=1, level="field")
+        out.attrs["dataset_version"] = df.attrs["snapshot"]
+        out.attrs["field"] = field
+        return out
+
+    if calendar is not None:
+        return load_calendar_field(field, calendar, dataset="cleaned", path=path)
+
+    if path is None and not compact and settings.panel_socket is not None:
+        served = _served_field(field)
+        if served is not None:
+            return served
+
+    if compact:
+        path = path or compact_path("cleaned")
+        out = compact_field("cleaned", field, path=path).sort_index()
+        out.attrs["dataset_version"] = cleaned_dataset_version(path=path)
+        out.attrs["field"] = field
+        return out
+
     df = load_cleaned_ohlcv(path=path)
     if not isinstance(df.columns, pd.MultiIndex):
         raise ValueError("Expected MultiIndex columns (asset, field)")
     out = df.xs(field, axis=1, level="field")
     if isinstance(out, pd.Series):
         raise TypeError("Expected DataFrame, got Series")
-    return out.sort_index()
+    out = out.sort_index()
+    out.attrs["dataset_version"] = cleaned_dataset_version(path=path)
+    out.attrs["field"] = field
+    return out
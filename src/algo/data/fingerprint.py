@@ -0,0 +1,35 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+
+def hash_payload(payload: Any) -> str:
+    """
+    Stable sha256 of a JSON-serializable payload (dict keys are sorted).
+    Non-JSON values (Path, Timestamp, ...) are hashed via str().
+    """
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    Cheap fingerprint of a file based on (name, size, mtime_ns).
+    Returns "missing" if the file does not exist.
+    """
+    if not path.exists():
+        return "missing"
+    st = path.stat()
+    return hash_payload([path.name, st.st_size, st.st_mtime_ns])[:16]
+
+
+def file_sha256(path: Path, *, chunk_size: int = 1 << 20) -> str:
+    """
+    Content hash of a file (streamed in chunks).
+    """
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
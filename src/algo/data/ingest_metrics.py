@@ -0,0 +1,198 @@
+"""
+Per-asset / per-provider metrics of price ingestion.
+
+Every provider attempt made by _choose_provider_and_update() becomes one
+IngestRecord: latency, payload size, rows fetched/added, retries, raw-cache
+hit/miss, and why an earlier provider was skipped (fallback reason).
+
+Each ingest run is written as one parquet file under
+artifacts/metrics/ingest/ (read the whole log with load_ingest_metrics()), and,
+when settings.prometheus_textfile_dir is set, summarized as a Prometheus
+textfile (node_exporter textfile collector) algo_ingest.prom.
+"""
+
+import os
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+import pandas as pd
+
+from algo.config import settings
+
+Status = Literal["ok", "error"]
+
+
+@dataclass
+class IngestRecord:
+    run_id: str
+    ts: float
+    asset: str
+    provider: str
+    status: Status
+    fetch_s: float | None = None  # last (successful) request
+    total_s: float = 0.0  # read cache + requests + retries/backoff + merge + write
+    payload_bytes: int | None = None  # HTTP body (stooq) / fetched frame size (yahoo)
+    rows_fetched: int | None = None
+    rows_added: int | None = None
+    rows_total: int | None = None
+    retries: int = 0
+    cache_hit: bool | None = None  # raw cache existed before the update
+    fallback_reason: str | None = None  # error of the provider tried before this one
+    error: str | None = None
+
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y-%m-%d_%H%M%S_%f")
+
+
+# ==========================
+# Parquet log
+# ==========================
+
+
+def ingest_metrics_dir() -> Path:
+    base = settings.artifacts_dir / "metrics" / "ingest"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def records_frame(records: Sequence[IngestRecord]) -> pd.DataFrame:
+    df = pd.DataFrame([asdict(r) for r in records], columns=list(IngestRecord.__dataclass_fields__))
+    df["ts"] = pd.to_datetime(df["ts"], unit="s")
+    return df
+
+
+def write_ingest_metrics(records: Sequence[IngestRecord]) -> Path | None:
+    """
+    Write one run's records (parquet, plus the Prometheus textfile if configured).
+    Returns the parquet path, or None when there is nothing to write.
+    """
+    if not records:
+        return None
+
+    df = records_frame(records)
+    path = ingest_metrics_dir() / f"{records[0].run_id}.parquet"
+    df.to_parquet(path, index=False)
+
+    if settings.prometheus_textfile_dir is not None:
+        write_prometheus_textfile(df, settings.prometheus_textfile_dir)
+    return path
+
+
+def load_ingest_metrics(*, since: str | pd.Timestamp | None = None) -> pd.DataFrame:
+    """
+    All recorded ingest attempts (optionally from `since` on), oldest first.
+    """
+    files = sorted(ingest_metrics_dir().glob("*.parquet"))
+    if not files:
+        return records_frame([])
+
+    df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+    if since is not None:
+        df = df[df["ts"] >= pd.Timestamp(since)]
+    return df.sort_values("ts", ignore_index=True)
+
+
+def summarize_ingest(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-provider summary: attempts, errors, latency quantiles, bytes, retries.
+    """
+    g = df.groupby("provider")
+    return pd.DataFrame(
+        {
+            "attempts": g.size(),
+            "errors": g["status"].apply(lambda s: int((s == "error").sum())),
+            "fetch_p50_s": g["fetch_s"].median(),
+            "fetch_p95_s": g["fetch_s"].quantile(0.95),
+            "bytes": g["payload_bytes"].sum(),
+            "rows_added": g["rows_added"].sum(),
+            "retries": g["retries"].sum(),
+            "fallbacks": _fallbacks(df),
+        }
+    )
+
+
+def _fallbacks(df: pd.DataFrame) -> pd.Series:
+    """
+    Per provider: assets it served after an earlier provider failed (or was
+    skipped). Failed attempts carry a fallback_reason too, but served nothing.
+    """
+    served = (df["status"] == "ok") & df["fallback_reason"].notna()
+    return served.groupby(df["provider"]).sum().astype(int)
+
+
+# ==========================
+# Prometheus textfile
+# ==========================
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: object) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def write_prometheus_textfile(df: pd.DataFrame, directory: Path) -> Path:
+    """
+    Metrics of one ingest run in the Prometheus text format. Written to a temp
+    file and renamed, so the collector never reads a partial file.
+    """
+    lines: list[str] = []
+
+    def metric(name: str, kind: str, help_: str, samples: list[tuple[str, float]]) -> None:
+        lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} {kind}")
+        # full precision: :g would round timestamps to ~3 hours and large byte counts
+        lines.extend(f"{name}{labels} {float(value)!r}" for labels, value in samples)
+
+    by_status = df.groupby(["provider", "status"]).size()
+    metric(
+        "algo_ingest_attempts",
+        "gauge",
+        "Provider attempts in the last ingest run.",
+        [(_labels(provider=p, status=s), n) for (p, s), n in by_status.items()],
+    )
+
+    g = df.groupby("provider")
+    for name, col, help_ in [
+        ("algo_ingest_fetch_seconds_sum", "fetch_s", "Summed request latency."),
+        ("algo_ingest_payload_bytes", "payload_bytes", "Bytes fetched."),
+        ("algo_ingest_rows_added", "rows_added", "New rows written to the raw cache."),
+        ("algo_ingest_retries", "retries", "Request retries."),
+    ]:
+        metric(name, "gauge", help_, [(_labels(provider=p), v) for p, v in g[col].sum().items()])
+
+    fallbacks = _fallbacks(df)
+    metric(
+        "algo_ingest_fallbacks",
+        "gauge",
+        "Assets served by this provider after an earlier provider failed.",
+        [(_labels(provider=p), n) for p, n in fallbacks.items()],
+    )
+
+    ok = df[df["status"] == "ok"]
+    metric(
+        "algo_ingest_asset_fetch_seconds",
+        "gauge",
+        "Request latency per asset (successful attempt).",
+        [(_labels(asset=r.asset, provider=r.provider), r.fetch_s) for r in ok.itertuples()],
+    )
+    metric(
+        "algo_ingest_last_run_timestamp_seconds",
+        "gauge",
+        "Unix time the last ingest run finished.",
+        [("", time.time())],
+    )
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "algo_ingest.prom"
+    tmp = path.with_suffix(f".prom.{os.getpid()}.tmp")
+    tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return path
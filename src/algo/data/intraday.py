@@ -0,0 +1,468 @@
+"""
+Intraday (minute to hourly) bars.
+
+Minute data is ~400× the size of daily data, so nothing here is held as one
+file or one frame:
+
+- raw caches:  data/raw_intraday/<provider>/<interval>/<asset>/month=YYYY-MM.parquet
+- canonical:   data/intraday/<interval>/<asset>/month=YYYY-MM.parquet
+
+Writes merge new bars into the affected month partitions only, so memory is
+bounded by one asset-month (~8k one-minute bars) whatever the history length.
+Partitions are per month rather than per day: a file per trading day would
+mean ~250 tiny files per asset and year.
+
+Timestamps are the bar start in the exchange's local time, tz-naive like the
+daily data. Loaders read only the partitions overlapping [start, end] and can
+resample to coarser bars on read; resample="1D" gives midnight-stamped daily
+bars that plug into the daily strategies unchanged.
+"""
+
+import io
+from pathlib import Path
+from typing import Literal, get_args
+
+import pandas as pd
+import requests
+import yfinance as yf
+
+from algo.config import settings
+from algo.data.fingerprint import file_fingerprint, hash_payload
+from algo.data.ingest_metrics import IngestRecord, new_run_id, write_ingest_metrics
+from algo.data.prices import (
+    Provider,
+    _asset_key_to_filename,
+    _canonicalize_ohlcv,
+    _choose_provider_and_update,
+    _fetch_with_retries,
+    _is_transient,
+    merge_prices,
+)
+from algo.data.provider_health import (
+    ProviderHealth,
+    close_provider_health,
+    open_provider_health,
+)
+from algo.profiling import count, profiled, span
+from algo.symbols.registry import get_identifier, has_identifier, list_asset_keys
+
+Interval = Literal["1m", "2m", "5m", "15m", "30m", "60m"]
+
+# stooq's CSV endpoint takes the bar length in minutes as "i"
+STOOQ_INTERVALS: dict[str, str] = {"5m": "5", "60m": "60"}
+# yfinance only serves recent intraday history: longest period per interval
+YAHOO_PERIODS: dict[str, str] = {
+    "1m": "7d",
+    "2m": "60d",
+    "5m": "60d",
+    "15m": "60d",
+    "30m": "60d",
+    "60m": "730d",
+}
+
+BAR_AGG = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+    "adj_close": "last",
+}
+
+
+def _check_interval(interval: str) -> None:
+    if interval not in get_args(Interval):
+        raise ValueError(f"Unknown intraday interval: {interval}. Use one of {get_args(Interval)}")
+
+
+def _local_naive(index: pd.Index) -> pd.DatetimeIndex:
+    idx = pd.DatetimeIndex(index)
+    # keep the exchange's wall-clock time, drop the zone
+    return idx.tz_localize(None) if idx.tz is not None else idx
+
+
+# ==========================
+# Fetchers
+# ==========================
+
+
+@profiled
+def fetch_stooq_intraday(asset_key: str, interval: Interval) -> pd.DataFrame:
+    _check_interval(interval)
+    if interval not in STOOQ_INTERVALS:
+        raise ValueError(f"stooq has no {interval} bars (available: {list(STOOQ_INTERVALS)})")
+    stooq_symbol = get_identifier(asset_key, "stooq")
+
+    url = "https://stooq.com/q/d/l/"
+    params = {"s": stooq_symbol, "i": STOOQ_INTERVALS[interval]}
+    r = requests.get(url, params=params, timeout=30)
+    r.raise_for_status()
+
+    df = pd.read_csv(io.StringIO(r.text))
+    if "Time" not in df.columns:
+        raise ValueError(f"No stooq {interval} bars for {asset_key} ({stooq_symbol})")
+    index = pd.to_datetime(df["Date"].astype(str) + " " + df["Time"].astype(str))
+
+    out = pd.DataFrame(
+        {
+            "open": pd.to_numeric(df["Open"], errors="coerce").to_numpy(),
+            "high": pd.to_numeric(df["High"], errors="coerce").to_numpy(),
+            "low": pd.to_numeric(df["Low"], errors="coerce").to_numpy(),
+            "close": pd.to_numeric(df["Close"], errors="coerce").to_numpy(),
+            "volume": pd.to_numeric(df["Volume"], errors="coerce").to_numpy(),
+        },
+        index=pd.DatetimeIndex(index, name="date"),
+    )
+
+    out = out.sort_index().dropna(subset=["close"])
+    out.attrs["payload_bytes"] = len(r.content)
+    count("fetch.stooq.intraday_rows", len(out))
+    return out
+
+
+@profiled
+def fetch_yahoo_intraday(asset_key: str, interval: Interval) -> pd.DataFrame:
+    _check_interval(interval)
+    yahoo_symbol = get_identifier(asset_key, "yahoo")
+
+    df = yf.download(
+        tickers=yahoo_symbol,
+        period=YAHOO_PERIODS[interval],
+        interval=interval,
+        auto_adjust=False,
+        progress=False,
+    )
+
+    if df is None or df.empty:
+        raise ValueError(f"No Yahoo {interval} data for {asset_key} ({yahoo_symbol})")
+
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.xs(yahoo_symbol, axis=1, level="Ticker")
+
+    out = pd.DataFrame(
+        {
+            "open": pd.to_numeric(df["Open"], errors="coerce").to_numpy(),
+            "high": pd.to_numeric(df["High"], errors="coerce").to_numpy(),
+            "low": pd.to_numeric(df["Low"], errors="coerce").to_numpy(),
+            "close": pd.to_numeric(df["Close"], errors="coerce").to_numpy(),
+            "volume": pd.to_numeric(df["Volume"], errors="coerce").to_numpy(),
+        },
+        index=_local_naive(df.index).rename("date"),
+    )
+
+    if "Adj Close" in df.columns:
+        out["adj_close"] = pd.to_numeric(df["Adj Close"], errors="coerce").to_numpy()
+
+    out = out.sort_index().dropna(subset=["close"])
+    out.attrs["payload_bytes"] = int(df.memory_usage(deep=True).sum())
+    count("fetch.yahoo.intraday_rows", len(out))
+    return out
+
+
+def fetch_intraday(provider: Provider, asset_key: str, interval: Interval) -> pd.DataFrame:
+    if provider == "stooq":
+        return fetch_stooq_intraday(asset_key, interval)
+    if provider == "yahoo":
+        return fetch_yahoo_intraday(asset_key, interval)
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+# ==========================
+# Month partitions
+# ==========================
+
+
+def raw_intraday_dir(provider: Provider, interval: Interval, asset_key: str) -> Path:
+    base = (
+        settings.data_dir / "raw_intraday" / provider / interval / _asset_key_to_filename(asset_key)
+    )
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def intraday_dir(interval: Interval, asset_key: str) -> Path:
+    base = settings.data_dir / "intraday" / interval / _asset_key_to_filename(asset_key)
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def _partition_path(base: Path, month: str) -> Path:
+    return base / f"month={month}.parquet"
+
+
+def _partition_month(path: Path) -> str:
+    return path.stem.removeprefix("month=")
+
+
+def list_partitions(
+    base: Path,
+    *,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+) -> list[Path]:
+    """
+    Month partitions under base overlapping [start, end], oldest first.
+    """
+    lo = None if start is None else pd.Timestamp(start).strftime("%Y-%m")
+    hi = None if end is None else pd.Timestamp(end).strftime("%Y-%m")
+    return [
+        p
+        for p in sorted(base.glob("month=*.parquet"))
+        if (lo is None or _partition_month(p) >= lo) and (hi is None or _partition_month(p) <= hi)
+    ]
+
+
+def _read_partition(path: Path) -> pd.DataFrame:
+    df = pd.read_parquet(path)
+    df.index = pd.DatetimeIndex(df.index, name="date")
+    return df
+
+
+@profiled
+def write_partitioned(base: Path, bars: pd.DataFrame) -> int:
+    """
+    Merge bars into the month partitions they fall in (newer bars win).
+    Returns the number of bars that were not stored yet.
+    """
+    if bars.empty:
+        return 0
+    bars = bars.copy()
+    bars.index = pd.DatetimeIndex(bars.index, name="date")
+
+    added = 0
+    for month, chunk in bars.groupby(bars.index.strftime("%Y-%m")):
+        path = _partition_path(base, str(month))
+        existing = _read_partition(path) if path.exists() else None
+        merged = merge_prices(existing, chunk)
+        merged.index.name = "date"
+        merged.to_parquet(path)
+        added += len(merged) - (0 if existing is None else len(existing))
+    return added
+
+
+def read_partitioned(
+    base: Path,
+    *,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+) -> pd.DataFrame | None:
+    """
+    Bars in [start, end] from the month partitions under base (None if there are none).
+    """
+    parts = list_partitions(base, start=start, end=end)
+    if not parts:
+        return None
+    df = pd.concat([_read_partition(p) for p in parts]).sort_index()
+    return df.loc[start:end]  # type: ignore[misc]
+
+
+# ==========================
+# Raw cache update
+# ==========================
+
+
+def update_intraday_cache(
+    provider: Provider,
+    asset_key: str,
+    interval: Interval,
+    *,
+    stats: dict | None = None,
+) -> pd.DataFrame:
+    """
+    Fetch recent intraday bars and merge them into the partitioned raw cache.
+    Returns the fetched bars (not the whole history).
+    """
+    _check_interval(interval)
+    stats = {} if stats is None else stats
+
+    base = raw_intraday_dir(provider, interval, asset_key)
+    stats["cache_hit"] = any(base.glob("month=*.parquet"))
+    fresh = _fetch_with_retries(
+        provider, asset_key, stats, fetch=lambda key: fetch_intraday(provider, key, interval)
+    )
+    stats["rows_fetched"] = len(fresh)
+    stats["rows_added"] = write_partitioned(base, fresh)
+    return fresh
+
+
+def update_all_intraday(
+    interval: Interval,
+    *,
+    provider_priority: list[Provider] | None = None,
+    asset_keys: list[str] | None = None,
+) -> dict[str, Provider]:
+    """
+    Update the intraday raw caches of all assets (or only `asset_keys`).
+    Returns a dict: asset_key -> provider used.
+
+    Assets no provider has bars for are left out (their failed attempts are in
+    the ingest metrics). Assets that failed because of a provider outage (open
+    circuit, network or throttling errors) are not: once every asset has been
+    tried, a RuntimeError lists them. Breaker state is kept per interval,
+    apart from the daily one.
+    """
+    _check_interval(interval)
+    provider_priority = provider_priority or ["yahoo", "stooq"]
+
+    used: dict[str, Provider] = {}
+    outages: dict[str, str] = {}
+    metrics: list[IngestRecord] = []
+    run_id = new_run_id()
+    health = open_provider_health(interval)
+
+    try:
+        for key in asset_keys or list_asset_keys():
+            try:
+                provider, _df = _choose_provider_and_update(
+                    key,
+                    provider_priority,
+                    metrics=metrics,
+                    run_id=run_id,
+                    health=health,
+                    interval=interval,
+                )
+            except RuntimeError as e:
+                if _provider_outage(e, health, provider_priority):
+                    outages[key] = str(e)
+                # otherwise: no intraday bars for this asset at any provider
+                continue
+            used[key] = provider
+    finally:
+        write_ingest_metrics(metrics)
+        close_provider_health(health, interval)
+
+    if outages:
+        raise RuntimeError(
+            f"{interval} update incomplete, provider errors for {len(outages)} assets "
+            f"({len(used)} updated): {outages}"
+        )
+    return used
+
+
+def _provider_outage(err: RuntimeError, health: ProviderHealth, providers: list[Provider]) -> bool:
+    """
+    True if an asset's failed update was down to the providers rather than to
+    the asset: the last error was transient, or a provider was skipped or has
+    tripped its circuit on the way.
+    """
+    cause = err.__cause__
+    if isinstance(cause, Exception) and _is_transient(cause):
+        return True
+    return any(health.is_open(p) for p in providers)
+
+
+# ==========================
+# Canonical intraday dataset
+# ==========================
+
+
+@profiled
+def export_intraday(
+    interval: Interval,
+    *,
+    asset_keys: list[str] | None = None,
+    provider_priority: list[Provider] | None = None,
+) -> dict[str, Provider]:
+    """
+    Build the canonical intraday partitions from the raw caches (no network).
+
+    Per asset the first provider in priority order with cached bars is used.
+    Only months whose raw partition is newer than the canonical one are
+    rewritten, one month at a time. Returns asset_key -> provider used.
+    """
+    _check_interval(interval)
+    provider_priority = provider_priority or ["yahoo", "stooq"]
+
+    used: dict[str, Provider] = {}
+    for key in asset_keys or list_asset_keys():
+        for provider in provider_priority:
+            if not has_identifier(key, provider):
+                continue
+            raw_parts = list_partitions(raw_intraday_dir(provider, interval, key))
+            if raw_parts:
+                break
+        else:
+            continue
+
+        out_dir = intraday_dir(interval, key)
+        for raw in raw_parts:
+            out = _partition_path(out_dir, _partition_month(raw))
+            if out.exists() and out.stat().st_mtime_ns >= raw.stat().st_mtime_ns:
+                continue
+            with span("partition"):
+                _canonicalize_ohlcv(_read_partition(raw)).to_parquet(out)
+        used[key] = provider
+
+    return used
+
+
+def resample_bars(bars: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars to a coarser bar size (pandas offset, e.g. "15min", "1h", "1D").
+    Periods without bars are dropped.
+    """
+    agg = {c: BAR_AGG[c] for c in bars.columns if c in BAR_AGG}
+    out = bars.resample(rule).agg(agg)
+    out.index.name = "date"
+    return out.dropna(subset=["close"]) if "close" in out.columns else out.dropna(how="all")
+
+
+def load_intraday_bars(
+    asset_key: str,
+    interval: Interval,
+    *,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+    resample: str | None = None,
+) -> pd.DataFrame:
+    """
+    Canonical intraday bars of one asset in [start, end], optionally resampled.
+    """
+    _check_interval(interval)
+    df = read_partitioned(intraday_dir(interval, asset_key), start=start, end=end)
+    if df is None:
+        raise FileNotFoundError(
+            f"No {interval} bars for '{asset_key}'. Run update_all_intraday() + export_intraday()."
+        )
+    return resample_bars(df, resample) if resample else df
+
+
+def load_intraday_field(
+    field: str,
+    interval: Interval,
+    *,
+    resample: str | None = "1D",
+    asset_keys: list[str] | None = None,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """
+    Wide (time × asset) frame for one field. Each asset is resampled before the
+    panel is assembled, so memory scales with the output bar size. attrs carry a
+    version of the partitions read (like load_cleaned_field).
+    """
+    _check_interval(interval)
+    if field not in BAR_AGG:
+        raise KeyError(f"Field '{field}' not found. Available fields: {list(BAR_AGG)}")
+
+    columns: dict[str, pd.Series] = {}
+    fingerprints: list[str] = []
+    for key in asset_keys or list_asset_keys():
+        base = intraday_dir(interval, key)
+        bars = read_partitioned(base, start=start, end=end)
+        if bars is None:
+            continue
+        if resample:
+            bars = resample_bars(bars, resample)
+        columns[key] = bars[field]
+        fingerprints += [file_fingerprint(p) for p in list_partitions(base, start=start, end=end)]
+
+    if not columns:
+        raise FileNotFoundError(f"No {interval} bars found. Run export_intraday() first.")
+
+    out = pd.DataFrame(columns).sort_index()
+    out.columns.name = "asset"
+    out.index.name = "date"
+    out.attrs["dataset_version"] = hash_payload([interval, resample, fingerprints])[:16]
+    out.attrs["field"] = field
+    return out
@@ -0,0 +1,278 @@
+"""
+Local price-panel server: one process holds the cleaned and canonical panels,
+research processes fetch the slices they need over a Unix socket.
+
+Protocol (one request per connection):
+  client -> server: a JSON line, e.g.
+      {"op": "field", "dataset": "cleaned", "field": "adj_close",
+       "assets": ["spy", ...] | null, "start": "2015-01-01" | null, "end": null}
+  server -> client: a JSON header line {"ok": true, "version": ...}, followed by
+      the slice as an Arrow IPC stream; or {"ok": false, "error": ..., "type": ...}
+
+Ops: "field" (wide date × asset frame of one field), "ohlcv" (the wide
+(asset, field) frame), "version" and "ping".
+
+The server checks the dataset file's fingerprint on every request (and in a
+background thread every `reload_interval` seconds) and reloads when
+rebuild_data.py has written a new version. A failed reload (file being
+rewritten) keeps the old panel until the next check.
+
+With settings.panel_socket set, load_cleaned_field() asks the server first and
+falls back to reading the parquet file itself when no server is running, so
+existing code picks the server up without changes.
+"""
+
+import json
+import socket
+import socketserver
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+import pandas as pd
+import pyarrow as pa
+
+from algo.config import settings
+from algo.data.fingerprint import file_fingerprint
+
+Dataset = Literal["cleaned", "canonical"]
+
+_ERRORS: dict[str, type[Exception]] = {
+    "KeyError": KeyError,
+    "ValueError": ValueError,
+    "FileNotFoundError": FileNotFoundError,
+}
+
+
+class ServerUnavailable(ConnectionError):
+    """
+    Nothing is listening on the panel socket.
+    """
+
+
+def default_socket_path() -> Path:
+    return settings.panel_socket or settings.data_dir / "panel.sock"
+
+
+def _dataset_path(dataset: Dataset) -> Path:
+    from algo.data.cleaning import cleaned_path
+    from algo.data.prices import canonical_ohlcv_path
+
+    if dataset == "cleaned":
+        return cleaned_path()
+    if dataset == "canonical":
+        return canonical_ohlcv_path()
+    raise ValueError(f"Unknown dataset: {dataset}")
+
+
+# ==========================
+# Server
+# ==========================
+
+
+@dataclass
+class LoadedPanel:
+    version: str
+    frame: pd.DataFrame  # wide, MultiIndex columns (asset, field)
+    fields: dict[str, pd.DataFrame]  # per-field views, built on first request
+
+
+class PanelStore:
+    """
+    The panels held by the server, reloaded when the file's fingerprint changes.
+    """
+
+    def __init__(self) -> None:
+        self.panels: dict[str, LoadedPanel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, dataset: Dataset) -> LoadedPanel:
+        path = _dataset_path(dataset)
+        version = file_fingerprint(path)
+        panel = self.panels.get(dataset)
+        if panel is not None and panel.version == version:
+            return panel
+
+        with self._lock:
+            panel = self.panels.get(dataset)
+            if panel is not None and panel.version == version:
+                return panel
+            try:
+                frame = pd.read_parquet(path)
+            except Exception:
+                # mid-rewrite: keep serving the previous version if we have one
+                if panel is None:
+                    raise
+                return panel
+            frame.index = pd.to_datetime(frame.index)
+            panel = LoadedPanel(version=version, frame=frame.sort_index(), fields={})
+            self.panels[dataset] = panel
+            return panel
+
+    def field(self, panel: LoadedPanel, name: str) -> pd.DataFrame:
+        out = panel.fields.get(name)
+        if out is None:
+            if name not in panel.frame.columns.get_level_values("field"):
+                available = sorted(set(panel.frame.columns.get_level_values("field")))
+                raise KeyError(f"Field '{name}' not found. Available fields: {available}")
+            out = panel.fields[name] = panel.frame.xs(name, axis=1, level="field")
+        return out
+
+    def refresh(self) -> None:
+        for dataset in list(self.panels):
+            self.get(dataset)  # type: ignore[arg-type]
+
+
+def _slice(df: pd.DataFrame, req: dict[str, Any], *, level: str | None = None) -> pd.DataFrame:
+    if req.get("assets") is not None:
+        assets = req["assets"]
+        if level is None:
+            df = df[[a for a in assets if a in df.columns]]
+        else:
+            df = df.loc[:, df.columns.get_level_values(level).isin(assets)]
+    return df.loc[req.get("start") : req.get("end")]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "PanelServer"
+
+    def handle(self) -> None:
+        try:
+            req = json.loads(self.rfile.readline())
+            header, frame = self.server.answer(req)
+        except Exception as e:
+            header = {"ok": False, "error": str(e), "type": type(e).__name__}
+            frame = None
+
+        self.wfile.write((json.dumps(header) + "\n").encode("utf-8"))
+        if frame is not None:
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            with pa.ipc.new_stream(self.wfile, table.schema) as writer:
+                writer.write_table(table)
+
+
+class PanelServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path | None = None, *, reload_interval: float = 5.0) -> None:
+        self.socket_path = socket_path or default_socket_path()
+        if self.socket_path.exists():
+            self.socket_path.unlink()  # stale socket of a previous run
+        self.store = PanelStore()
+        self.reload_interval = reload_interval
+        self._stop = threading.Event()
+        super().__init__(str(self.socket_path), _Handler)
+
+    def answer(self, req: dict[str, Any]) -> tuple[dict[str, Any], pd.DataFrame | None]:
+        op = req.get("op")
+        if op == "ping":
+            return {"ok": True}, None
+
+        dataset = req.get("dataset", "cleaned")
+        panel = self.store.get(dataset)
+        header = {"ok": True, "version": panel.version}
+
+        if op == "version":
+            return header, None
+        if op == "field":
+            return header, _slice(self.store.field(panel, req["field"]), req)
+        if op == "ohlcv":
+            return header, _slice(panel.frame, req, level="asset")
+        raise ValueError(f"Unknown op: {op}")
+
+    def preload(self, datasets: tuple[Dataset, ...] = ("cleaned", "canonical")) -> None:
+        for dataset in datasets:
+            if _dataset_path(dataset).exists():
+                self.store.get(dataset)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.store.refresh()
+            except Exception:
+                pass  # retried on the next tick / request
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stop.set()
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+# ==========================
+# Client
+# ==========================
+
+
+def request_panel(
+    req: dict[str, Any],
+    *,
+    socket_path: Path | None = None,
+    timeout: float = 60.0,
+) -> tuple[dict[str, Any], pd.DataFrame | None]:
+    """
+    Send one request; returns (header, frame or None). Errors raised by the
+    server are re-raised here with the same type where possible.
+    """
+    path = socket_path or default_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path))
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ServerUnavailable(f"No panel server at {path}") from e
+        sock.sendall((json.dumps(req, default=str) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as f:
+            header = json.loads(f.readline())
+            if not header.get("ok"):
+                raise _ERRORS.get(header.get("type", ""), RuntimeError)(header.get("error"))
+            if req.get("op") in ("ping", "version"):
+                return header, None
+            frame = pa.ipc.open_stream(f).read_all().to_pandas()
+    return header, frame
+
+
+def server_available(socket_path: Path | None = None) -> bool:
+    try:
+        request_panel({"op": "ping"}, socket_path=socket_path, timeout=2.0)
+    except ServerUnavailable:
+        return False
+    return True
+
+
+def served_field(
+    field: str,
+    *,
+    dataset: Dataset = "cleaned",
+    assets: list[str] | None = None,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+    socket_path: Path | None = None,
+) -> pd.DataFrame:
+    """
+    Wide (date × asset) frame for one field from the server, with the same
+    attrs as load_cleaned_field (dataset_version, field).
+    """
+    req = {
+        "op": "field",
+        "dataset": dataset,
+        "field": field,
+        "assets": assets,
+        "start": start,
+        "end": end,
+    }
+    header, out = request_panel(req, socket_path=socket_path)
+    if out is None:
+        raise RuntimeError("Panel server sent no data")
+    out.columns.name = "asset"
+    out.attrs["dataset_version"] = header["version"]
+    out.attrs["field"] = field
+    return out
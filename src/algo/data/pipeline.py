@@ -0,0 +1,242 @@
+"""
+Make-like orchestration of the data pipeline: fetch -> canonical -> cleaned.
+
+Every stage records its input fingerprints and output hashes in a manifest.
+A stage is skipped when its inputs are unchanged and its outputs are still
+the files it wrote, so a run where nothing changed finishes in seconds.
+"""
+
+import json
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Literal
+
+from algo.config import settings
+from algo.data import cleaning
+from algo.data.calendars import calendar_dir
+from algo.data.compact import compact_path
+from algo.data.fingerprint import file_fingerprint, file_sha256, hash_payload
+from algo.data.prices import (
+    Provider,
+    canonical_ohlcv_path,
+    export_canonical_ohlcv,
+    raw_cache_path,
+    update_all_prices,
+)
+from algo.data.returns import returns_dir
+from algo.profiling import span
+from algo.symbols.registry import get_registry, has_identifier, list_asset_keys
+
+StageName = Literal["fetch", "canonical", "cleaned"]
+STAGES: tuple[StageName, ...] = ("fetch", "canonical", "cleaned")
+
+DEFAULT_PROVIDERS: list[Provider] = ["yahoo", "stooq"]
+
+
+@dataclass
+class StageResult:
+    stage: StageName
+    ran: bool
+    seconds: float
+    reason: str
+
+
+# ==========================
+# Manifest
+# ==========================
+
+
+def manifest_path() -> Path:
+    base = settings.data_dir / "pipeline"
+    base.mkdir(parents=True, exist_ok=True)
+    return base / "manifest.json"
+
+
+def load_manifest() -> dict[str, Any]:
+    path = manifest_path()
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _save_manifest(manifest: dict[str, Any]) -> None:
+    manifest_path().write_text(json.dumps(manifest, indent=2, default=str), encoding="utf-8")
+
+
+def _output_record(path: Path, previous: dict[str, Any] | None = None) -> dict[str, str]:
+    """
+    {fingerprint, sha256} of an output file. The (expensive) sha256 is reused
+    from `previous` when the file's fingerprint has not changed.
+    """
+    fp = file_fingerprint(path)
+    if previous and previous.get("fingerprint") == fp and "sha256" in previous:
+        return {"fingerprint": fp, "sha256": previous["sha256"]}
+    return {"fingerprint": fp, "sha256": file_sha256(path) if path.exists() else "missing"}
+
+
+def _outputs_intact(entry: dict[str, Any]) -> bool:
+    return all(
+        file_fingerprint(Path(path)) == rec["fingerprint"]
+        for path, rec in entry.get("outputs", {}).items()
+    )
+
+
+# ==========================
+# Stage inputs / outputs
+# ==========================
+
+
+def _raw_fingerprints(assets: Sequence[str], providers: Sequence[Provider]) -> dict[str, str]:
+    return {
+        f"{provider}/{key}": file_fingerprint(raw_cache_path(provider, key))
+        for key in assets
+        for provider in providers
+        if has_identifier(key, provider)
+    }
+
+
+def _stage_inputs(
+    stage: StageName,
+    manifest: dict[str, Any],
+    *,
+    assets: Sequence[str],
+    providers: list[Provider],
+) -> dict[str, Any]:
+    if stage == "fetch":
+        # Providers publish new bars daily: a fetch is fresh for the rest of the day
+        return {
+            "registry": hash_payload(get_registry().model_dump()),
+            "assets": sorted(assets),
+            "providers": providers,
+            "day": date.today().isoformat(),
+        }
+
+    if stage == "canonical":
+        return {
+            "registry": hash_payload(get_registry().model_dump()),
+            "providers": providers,
+            "raw": _raw_fingerprints(list_asset_keys(), providers),
+            "compact": settings.compact_datasets,
+        }
+
+    if stage == "cleaned":
+        canonical = str(canonical_ohlcv_path())
+        previous = manifest.get("canonical", {}).get("outputs", {}).get(canonical)
+        return {
+            "canonical": _output_record(canonical_ohlcv_path(), previous)["sha256"],
+            # the registry places assets on calendars (per-calendar panels)
+            "registry": hash_payload(get_registry().model_dump()),
+            "params": {
+                "global_floor": cleaning.GLOBAL_FLOOR,
+                "minimum_days": cleaning.MINIMUM_DAYS,
+                "extreme_threshold": cleaning.EXTREME_THRESHOLD,
+                "coverage_limit": cleaning.COVERAGE_LIMIT,
+                "stable_window": cleaning.STABLE_WINDOW,
+                "ffill_limit": cleaning.FFILL_LIMIT,
+            },
+            "compact": settings.compact_datasets,
+        }
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def _panel_files(dataset: Literal["canonical", "cleaned"]) -> list[Path]:
+    """
+    Per-calendar panels written next to a dataset file (algo.data.calendars).
+    """
+    return sorted(calendar_dir(dataset).glob("*.parquet"))
+
+
+def _run_stage(
+    stage: StageName,
+    *,
+    assets: Sequence[str],
+    providers: list[Provider],
+) -> tuple[list[Path], dict[str, Any]]:
+    """
+    Run one stage. Returns (output files, extra info for the manifest).
+    """
+    if stage == "fetch":
+        used = update_all_prices(provider_priority=providers, asset_keys=list(assets))
+        return [], {"providers_used": used}
+
+    if stage == "canonical":
+        path = export_canonical_ohlcv(provider_priority=providers, refresh=False)
+        outputs = [path, *_panel_files("canonical")]
+        if settings.compact_datasets:
+            outputs.append(compact_path("canonical"))
+        return outputs, {}
+
+    if stage == "cleaned":
+        cleaning.build_cleaned_ohlcv()
+        outputs = [
+            cleaning.cleaned_path(),
+            cleaning.eligibility_path(),
+            *_panel_files("cleaned"),
+            *sorted(returns_dir("cleaned").glob("*.parquet")),
+        ]
+        if settings.compact_datasets:
+            outputs.append(compact_path("cleaned"))
+        return outputs, {}
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+# ==========================
+# Public API
+# ==========================
+
+
+def run_pipeline(
+    stages: Sequence[StageName] | None = None,
+    *,
+    assets: Sequence[str] | None = None,
+    provider_priority: list[Provider] | None = None,
+    rebuild: bool = False,
+) -> list[StageResult]:
+    """
+    Run the requested stages (default: all) in pipeline order, skipping those
+    that are up to date. rebuild=True runs them regardless.
+
+    assets limits the fetch stage (network); canonical and cleaned always cover
+    the whole registry, built from the raw caches, so they stay complete.
+    """
+    selected = [s for s in STAGES if stages is None or s in stages]
+    unknown = set(stages or []) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}")
+
+    providers = provider_priority or DEFAULT_PROVIDERS
+    assets = list(assets) if assets else list_asset_keys()
+    manifest = load_manifest()
+    results: list[StageResult] = []
+
+    for stage in selected:
+        t0 = time.perf_counter()
+        inputs = _stage_inputs(stage, manifest, assets=assets, providers=providers)
+        # same shape as after a manifest round-trip (Timestamps -> str, tuples -> lists)
+        inputs = json.loads(json.dumps(inputs, default=str))
+        entry = manifest.get(stage, {})
+
+        if not rebuild and entry.get("inputs") == inputs and _outputs_intact(entry):
+            results.append(StageResult(stage, False, time.perf_counter() - t0, "up to date"))
+            continue
+
+        reason = "forced" if rebuild else ("inputs changed" if entry else "never run")
+        with span(f"stage.{stage}"):
+            outputs, extra = _run_stage(stage, assets=assets, providers=providers)
+
+        previous = entry.get("outputs", {})
+        manifest[stage] = {
+            "inputs": inputs,
+            "outputs": {str(p): _output_record(p, previous.get(str(p))) for p in outputs},
+            "finished": time.time(),
+            **extra,
+        }
+        _save_manifest(manifest)
+        results.append(StageResult(stage, True, time.perf_counter() - t0, reason))
+
+    return results
@@ -1,12 +1,24 @@
 import io
+import time
+from collections.abc import Callable
 from pathlib import Path
-from typing import Literal
+from typing import Literal, get_args
 
 import pandas as pd
 import requests
 import yfinance as yf
 
 from algo.config import settings
+from algo.data.calendars import load_calendar_field, write_calendar_panels
+from algo.data.compact import compact_field, read_compact, write_compact_ohlcv
+from algo.data.ingest_metrics import IngestRecord, new_run_id, write_ingest_metrics
+from algo.data.provider_health import (
+    ProviderHealth,
+    close_provider_health,
+    open_provider_health,
+)
+from algo.data.snapshots import load_snapshot
+from algo.profiling import count, profiled, span
 from algo.symbols.registry import get_identifier, has_identifier, list_asset_keys
 
 Provider = Literal["stooq", "yahoo"]
@@ -37,6 +49,7 @@ def raw_cache_path(provider: Provider, asset_key: str) -> Path:
     return base / f"{filename}.parquet"
 
 
+@profiled
 def fetch_stooq_daily(asset_key: str) -> pd.DataFrame:
     stooq_symbol = get_identifier(asset_key, "stooq")
 
@@ -62,9 +75,12 @@ def fetch_stooq_daily(asset_key: str) -> pd.DataFrame:
 
     # Keep only rows that have a close; others are not useful
     out = out.dropna(subset=["close"])
+    out.attrs["payload_bytes"] = len(r.content)
+    count("fetch.stooq.rows", len(out))
     return out
 
 
+@profiled
 def fetch_yahoo_daily(asset_key: str) -> pd.DataFrame:
     yahoo_symbol = get_identifier(asset_key, "yahoo")
 
@@ -100,12 +116,22 @@ def fetch_yahoo_daily(asset_key: str) -> pd.DataFrame:
 
     out = out.sort_index()
     out = out.dropna(subset=["close"])
+    # yfinance does not expose the response; the downloaded frame is the closest proxy
+    out.attrs["payload_bytes"] = int(df.memory_usage(deep=True).sum())
+    count("fetch.yahoo.rows", len(out))
     return out
 
 
+def _datetime_index(index: pd.Index) -> pd.DatetimeIndex:
+    # pd.to_datetime on an index that already is one still scans it (~5 ms per 6k rows)
+    return index if isinstance(index, pd.DatetimeIndex) else pd.DatetimeIndex(pd.to_datetime(index))
+
+
+@profiled
 def read_cache(provider: Provider, asset_key: str) -> pd.DataFrame | None:
     path = raw_cache_path(provider, asset_key)
     if not path.exists():
+        count("read_cache.miss")
         return None  # No raw prices saved
 
     df = pd.read_parquet(path)
@@ -114,18 +140,19 @@ def read_cache(provider: Provider, asset_key: str) -> pd.DataFrame | None:
     if "date" in df.columns:
         df = df.set_index("date")
 
-    df.index = pd.to_datetime(df.index)
+    df.index = _datetime_index(df.index)
     df = df.sort_index()
     df = df[~df.index.duplicated(keep="last")]
 
     return df
 
 
+@profiled
 def write_cache(provider: Provider, asset_key: str, df: pd.DataFrame) -> None:
     path = raw_cache_path(provider, asset_key)
 
     out = df.copy()
-    out.index = pd.to_datetime(out.index)
+    out.index = _datetime_index(out.index)
     out.index.name = "date"
     out = out.sort_index()
     out = out[~out.index.duplicated(keep="last")]
@@ -135,7 +162,7 @@ def write_cache(provider: Provider, asset_key: str, df: pd.DataFrame) -> None:
 
 def merge_prices(existing: pd.DataFrame | None, new: pd.DataFrame) -> pd.DataFrame:
     new = new.copy()
-    new.index = pd.to_datetime(new.index)
+    new.index = _datetime_index(new.index)
     new = new.sort_index()
     new = new[~new.index.duplicated(keep="last")]
 
@@ -148,71 +175,207 @@ def merge_prices(existing: pd.DataFrame | None, new: pd.DataFrame) -> pd.DataFra
     return merged
 
 
-def update_cache_stooq(asset_key: str) -> pd.DataFrame:
-    provider: Provider = "stooq"
+def _is_transient(e: Exception) -> bool:
+    """
+    Network hiccups and throttling/server errors are retried; anything else
+    (unknown symbol, empty data, parse errors) fails right away.
+    """
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return False
 
-    existing = read_cache(provider, asset_key)
-    fresh = fetch_stooq_daily(asset_key)
 
-    merged = merge_prices(existing, fresh)
-    write_cache(provider, asset_key, merged)
+def _fetch_with_retries(
+    provider: Provider,
+    asset_key: str,
+    stats: dict,
+    *,
+    fetch: Callable[[str], pd.DataFrame] | None = None,
+) -> pd.DataFrame:
+    fetch = fetch or (fetch_stooq_daily if provider == "stooq" else fetch_yahoo_daily)
 
-    return merged
+    stats["retries"] = 0
+    while True:
+        t0 = time.perf_counter()
+        try:
+            df = fetch(asset_key)
+        except Exception as e:
+            if not _is_transient(e) or stats["retries"] >= settings.fetch_retries:
+                raise
+            stats["retries"] += 1
+            time.sleep(settings.fetch_retry_backoff * 2 ** (stats["retries"] - 1))
+            continue
 
+        stats["fetch_s"] = time.perf_counter() - t0
+        stats["payload_bytes"] = df.attrs.get("payload_bytes")
+        return df
 
-def update_cache_yahoo(asset_key: str) -> pd.DataFrame:
-    provider: Provider = "yahoo"
+
+def update_cache(
+    provider: Provider,
+    asset_key: str,
+    *,
+    stats: dict | None = None,
+    interval: str = "1d",
+) -> pd.DataFrame:
+    """
+    Fetch fresh prices, merge them into the raw cache and return the merged frame.
+    stats (optional) is filled with the ingest metrics of this update.
+
+    Intraday intervals go to the partitioned raw cache (algo.data.intraday) and
+    return only the fetched bars.
+    """
+    if provider not in get_args(Provider):
+        raise ValueError(f"Unknown provider: {provider}")
+    stats = {} if stats is None else stats
+
+    if interval != "1d":
+        from algo.data.intraday import update_intraday_cache
+
+        return update_intraday_cache(provider, asset_key, interval, stats=stats)
 
     existing = read_cache(provider, asset_key)
-    fresh = fetch_yahoo_daily(asset_key)
+    stats["cache_hit"] = existing is not None
+    fresh = _fetch_with_retries(provider, asset_key, stats)
 
     merged = merge_prices(existing, fresh)
     write_cache(provider, asset_key, merged)
 
+    stats["rows_fetched"] = len(fresh)
+    stats["rows_added"] = len(merged) - (0 if existing is None else len(existing))
+    stats["rows_total"] = len(merged)
     return merged
 
 
-def update_cache(provider: Provider, asset_key: str) -> pd.DataFrame:
-    if provider == "stooq":
-        return update_cache_stooq(asset_key)
-    if provider == "yahoo":
-        return update_cache_yahoo(asset_key)
-    raise ValueError(f"Unknown provider: {provider}")
+def update_cache_stooq(asset_key: str) -> pd.DataFrame:
+    return update_cache("stooq", asset_key)
+
+
+def update_cache_yahoo(asset_key: str) -> pd.DataFrame:
+    return update_cache("yahoo", asset_key)
 
 
 def _choose_provider_and_update(
     asset_key: str,
     provider_priority: list[Provider],
+    *,
+    metrics: list[IngestRecord] | None = None,
+    run_id: str | None = None,
+    health: ProviderHealth | None = None,
+    interval: str = "1d",
 ) -> tuple[Provider, pd.DataFrame]:
+    """
+    Update the raw cache from the first provider that works. Every attempt is
+    appended to `metrics` (if given) as an IngestRecord.
+
+    With `health`, providers whose circuit is open are skipped and the rest are
+    tried healthiest first (see algo.data.provider_health). Only transient
+    provider errors (network, HTTP 429/5xx) are recorded as failures.
+    """
     last_err: Exception | None = None
+    provider_err: Exception | None = None
+    run_id = run_id or new_run_id()
+
+    candidates = [p for p in provider_priority if has_identifier(asset_key, p)]
+    skipped: list[Provider] = []
+    if health is not None:
+        candidates, skipped = health.order(candidates)
+
+    fallback = f"circuit open: {', '.join(skipped)}" if skipped else None
+    for provider in candidates:
+        stats: dict = {}
+        if last_err is not None:
+            fallback = f"{type(last_err).__name__}: {last_err}"
+        t0 = time.perf_counter()
+        try:
+            df = update_cache(provider, asset_key, stats=stats, interval=interval)
+        except Exception as e:
+            last_err = e
+            if _is_transient(e):
+                provider_err = e
+            status, error = "error", f"{type(e).__name__}: {e}"
+        else:
+            status, error = "ok", None
+
+        # only provider-level errors count against the circuit; an asset the
+        # provider has no data for (or a bad interval) says nothing about its health
+        if health is not None:
+            if status == "ok":
+                health.record_success(provider, stats.get("fetch_s"))
+            elif provider_err is last_err:
+                health.record_failure(provider)
+
+        if metrics is not None:
+            metrics.append(
+                IngestRecord(
+                    run_id=run_id,
+                    ts=time.time(),
+                    asset=asset_key,
+                    provider=provider,
+                    status=status,
+                    total_s=time.perf_counter() - t0,
+                    fallback_reason=fallback,
+                    error=error,
+                    **stats,
+                )
+            )
+        if status == "ok":
+            return provider, df
+
+    if last_err is None and skipped:
+        raise RuntimeError(f"Failed for '{asset_key}'. Circuit open for: {', '.join(skipped)}")
+    # chained to a provider error if there was one, so that callers can tell an
+    # outage from an asset no provider has data for
+    raise RuntimeError(f"Failed for '{asset_key}'. Last error: {last_err}") from (
+        provider_err or last_err
+    )
 
+
+def _choose_cached(
+    asset_key: str,
+    provider_priority: list[Provider],
+) -> tuple[Provider, pd.DataFrame]:
+    """
+    Like _choose_provider_and_update, but only reads the raw caches (no network).
+    """
     for provider in provider_priority:
         if not has_identifier(asset_key, provider):
             continue
-        try:
-            df = update_cache(provider, asset_key)
+        df = read_cache(provider, asset_key)
+        if df is not None:
             return provider, df
-        except Exception as e:
-            last_err = e
 
-    raise RuntimeError(f"Failed for '{asset_key}'. Last error: {last_err}")
+    raise FileNotFoundError(f"No cached prices for '{asset_key}' ({provider_priority})")
 
 
 def update_all_prices(
     *,
     provider_priority: list[Provider] | None = None,
+    asset_keys: list[str] | None = None,
 ) -> dict[str, Provider]:
     """
-    Update caches for all assets in the registry.
+    Update caches for all assets in the registry (or only `asset_keys`).
     Returns a dict: asset_key -> provider used.
+    Every provider attempt is logged (see algo.data.ingest_metrics).
     """
     provider_priority = provider_priority or ["yahoo", "stooq"]
 
     used: dict[str, Provider] = {}
-
-    for key in list_asset_keys():
-        provider, _df = _choose_provider_and_update(key, provider_priority)
-        used[key] = provider
+    metrics: list[IngestRecord] = []
+    run_id = new_run_id()
+    health = open_provider_health()
+
+    try:
+        for key in asset_keys or list_asset_keys():
+            provider, _df = _choose_provider_and_update(
+                key, provider_priority, metrics=metrics, run_id=run_id, health=health
+            )
+            used[key] = provider
+    finally:
+        write_ingest_metrics(metrics)
+        close_provider_health(health)
 
     return used
 
@@ -239,16 +402,21 @@ def _canonicalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
     return out[cols + ["adj_close"]]
 
 
+@profiled
 def export_canonical_ohlcv(
     asset_keys: list[str] | None = None,
     *,
     path: Path | None = None,
     provider_priority: list[Provider] | None = None,
+    refresh: bool = True,
 ) -> Path:
     """
     Build a canonical OHLCV+adj_close dataset with MultiIndex columns:
       (asset_key, field)
 
+    refresh=True updates each asset's raw cache first (network); refresh=False
+    builds from the raw caches as they are.
+
     Writes a single parquet file and returns its path.
     """
     provider_priority = provider_priority or ["yahoo", "stooq"]
@@ -258,26 +426,80 @@ def export_canonical_ohlcv(
         asset_keys = list_asset_keys()
 
     frames: list[pd.DataFrame] = []
+    metrics: list[IngestRecord] = []
+    run_id = new_run_id()
+    health = open_provider_health()
 
-    for key in asset_keys:
-        _provider, df = _choose_provider_and_update(key, provider_priority)
+    try:
+        for key in asset_keys:
+            if refresh:
+                _provider, df = _choose_provider_and_update(
+                    key, provider_priority, metrics=metrics, run_id=run_id, health=health
+                )
+            else:
+                _provider, df = _choose_cached(key, provider_priority)
 
-        canon = _canonicalize_ohlcv(df)
-        canon.columns = pd.MultiIndex.from_product(
-            [[key], canon.columns],
-            names=["asset", "field"],
-        )
-        frames.append(canon)
+            frames.append(canonical_asset_frame(key, df))
+    finally:
+        write_ingest_metrics(metrics)
+        close_provider_health(health)
 
-    out = pd.concat(frames, axis=1).sort_index()
-    out.to_parquet(path)
+    return write_canonical_ohlcv(frames, path=path)
+
+
+def canonical_asset_frame(asset_key: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Canonical columns for one asset, labelled (asset_key, field).
+    """
+    canon = _canonicalize_ohlcv(df)
+    canon.columns = pd.MultiIndex.from_product(
+        [[asset_key], canon.columns],
+        names=["asset", "field"],
+    )
+    return canon
+
+
+@profiled
+def write_canonical_ohlcv(
+    frames: list[pd.DataFrame],
+    *,
+    path: Path | None = None,
+    calendars: dict[str, str] | None = None,
+) -> Path:
+    """
+    Concatenate per-asset canonical frames into the canonical dataset file, and
+    write the per-calendar panels next to it (see algo.data.calendars).
+    calendars: asset -> calendar, derived from the registry / data if None.
+    """
+    path = path or canonical_ohlcv_path()
+    with span("concat"):
+        out = pd.concat(frames, axis=1).sort_index()
+    with span("to_parquet"):
+        out.to_parquet(path)
+    with span("calendars"):
+        write_calendar_panels(out, path, calendars=calendars)
+    if settings.compact_datasets:
+        with span("compact"):
+            write_compact_ohlcv(out, "canonical")
     return path
 
 
-def load_canonical_ohlcv(*, path: Path | None = None) -> pd.DataFrame:
+def load_canonical_ohlcv(
+    *,
+    path: Path | None = None,
+    compact: bool = False,
+    version: str | None = None,
+) -> pd.DataFrame:
     """
     Load the canonical OHLCV+adj_close dataset (MultiIndex columns: asset, field).
+    compact=True reads the float32 copy (see algo.data.compact); version= a
+    snapshot id or "latest" (see algo.data.snapshots).
     """
+    if version is not None:
+        return load_snapshot(version, dataset="canonical")
+    if compact:
+        return read_compact("canonical", path=path)
+
     path = path or canonical_ohlcv_path()
     if not path.exists():
         raise FileNotFoundError(
@@ -293,7 +515,29 @@ def load_canonical_field(
     field: str,
     *,
     path: Path | None = None,
+    compact: bool = False,
+    calendar: str | None = None,
+    version: str | None = None,
 ) -> pd.DataFrame:
+    """
+    Wide (date × asset) frame for one field on the union date index; with
+    calendar= only that calendar's assets on its own trading days, with
+    version= as of that snapshot (not combined with calendar= or compact=).
+    """
+    if version is not None:
+        if calendar is not None or compact:
+            raise ValueError("version= cannot be combined with calendar= or compact=")
+        df = load_canonical_ohlcv(version=version)
+        out = df.xs(field, axis=1, level="field")
+        out.attrs["dataset_version"] = df.attrs["snapshot"]
+        out.attrs["field"] = field
+        return out
+
+    if calendar is not None:
+        return load_calendar_field(field, calendar, dataset="canonical", path=path)
+    if compact:
+        return compact_field("canonical", field, path=path).sort_index()
+
     df = load_canonical_ohlcv(path=path)
 
     if not isinstance(df.columns, pd.MultiIndex):
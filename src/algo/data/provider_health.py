@@ -0,0 +1,197 @@
+"""
+Provider health tracking with a circuit breaker.
+
+- after `failure_threshold` consecutive failures within `window_s` seconds a
+  provider's circuit opens and it is skipped for `cooldown_s` seconds
+- after the cooldown a single probe request is let through (half-open): the
+  provider is tried first by the caller that gets the probe; a success closes
+  the circuit, a failure opens it again, and a probe that never reports back
+  expires after another cooldown
+- order() moves clearly degraded providers back: score = success-rate EWMA ×
+  latency factor, and only a score below DEGRADED_SCORE (e.g. 4 failures in a
+  row, or ~5 s average latency) outranks the configured priority
+
+One ProviderHealth is shared by all fetch workers of a run (thread-safe). With
+settings.provider_health_persist it is loaded from / saved to
+data/raw_prices/provider_health.json (intraday: one file per interval under
+data/raw_intraday/), so an open circuit survives into the next run.
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from algo.config import settings
+
+# weight of the newest observation in the success-rate / latency EWMAs
+EWMA_ALPHA = 0.2
+# latency at which a provider's score is halved
+LATENCY_REF_S = 5.0
+DEGRADED_SCORE = 0.5
+
+
+@dataclass
+class ProviderState:
+    attempts: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    failure_times: list[float] = field(default_factory=list)
+    success_rate: float = 1.0  # EWMA, optimistic start
+    latency_s: float | None = None  # EWMA of successful requests
+    open_until: float = 0.0
+    tripped: bool = False
+    trips: int = 0
+    probing: bool = False
+
+    def score(self) -> float:
+        latency = self.latency_s or 0.0
+        return self.success_rate / (1.0 + latency / LATENCY_REF_S)
+
+
+class ProviderHealth:
+    def __init__(
+        self,
+        *,
+        failure_threshold: int | None = None,
+        window_s: float | None = None,
+        cooldown_s: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.failure_threshold = failure_threshold or settings.provider_failure_threshold
+        self.window_s = settings.provider_failure_window if window_s is None else window_s
+        self.cooldown_s = settings.provider_cooldown if cooldown_s is None else cooldown_s
+        self.clock = clock
+        self.states: dict[str, ProviderState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, provider: str) -> ProviderState:
+        return self.states.setdefault(provider, ProviderState())
+
+    # ---------- breaker ----------
+
+    def is_open(self, provider: str) -> bool:
+        with self._lock:
+            s = self._state(provider)
+            return s.tripped and self.clock() < s.open_until
+
+    def order(self, priority: Sequence[str]) -> tuple[list[str], list[str]]:
+        """
+        (providers to try, best first; providers skipped because their circuit is open).
+        A half-open provider is handed to one caller at a time as a probe, ahead
+        of the healthy ones so that the probe is actually sent; the circuit stays
+        open to other callers until the probe reports back or another cooldown
+        has passed.
+        """
+        now = self.clock()
+        usable: list[str] = []
+        skipped: list[str] = []
+        probes: set[str] = set()
+
+        with self._lock:
+            for provider in priority:
+                s = self._state(provider)
+                if s.tripped and now < s.open_until:
+                    skipped.append(provider)
+                    continue
+                if s.tripped:
+                    s.probing = True
+                    s.open_until = now + self.cooldown_s
+                    probes.add(provider)
+                usable.append(provider)
+
+            rank = {p: i for i, p in enumerate(priority)}
+            usable.sort(
+                key=lambda p: (
+                    p not in probes,
+                    self._state(p).score() < DEGRADED_SCORE,
+                    rank[p],
+                )
+            )
+
+        return usable, skipped
+
+    def record_success(self, provider: str, latency_s: float | None = None) -> None:
+        with self._lock:
+            s = self._state(provider)
+            s.attempts += 1
+            s.consecutive_failures = 0
+            s.failure_times.clear()
+            s.tripped = s.probing = False
+            s.success_rate += EWMA_ALPHA * (1.0 - s.success_rate)
+            if latency_s is not None:
+                s.latency_s = (
+                    latency_s
+                    if s.latency_s is None
+                    else s.latency_s + EWMA_ALPHA * (latency_s - s.latency_s)
+                )
+
+    def record_failure(self, provider: str) -> None:
+        now = self.clock()
+        with self._lock:
+            s = self._state(provider)
+            s.attempts += 1
+            s.failures += 1
+            s.consecutive_failures += 1
+            s.success_rate -= EWMA_ALPHA * s.success_rate
+            s.failure_times = [t for t in s.failure_times if now - t <= self.window_s] + [now]
+
+            # a failed probe re-opens right away; otherwise N failures within the window
+            if s.tripped or len(s.failure_times) >= self.failure_threshold:
+                s.tripped, s.probing = True, False
+                s.open_until = now + self.cooldown_s
+                s.trips += 1
+
+    # ---------- persistence ----------
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {p: {**asdict(s), "probing": False} for p, s in self.states.items()}
+
+    def save(self, path: Path | None = None) -> Path:
+        path = path or provider_health_path()
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: Path | None = None, **kwargs: Any) -> "ProviderHealth":
+        health = cls(**kwargs)
+        path = path or provider_health_path()
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            health.states = {p: ProviderState(**s) for p, s in data.items()}
+        return health
+
+
+def provider_health_path(interval: str = "1d") -> Path:
+    """
+    Health file of one bar interval: daily and intraday endpoints fail
+    independently (a provider without 1m bars is fine for daily prices), so
+    each intraday interval gets its own breaker state.
+    """
+    if interval == "1d":
+        base = settings.data_dir / "raw_prices"
+        name = "provider_health.json"
+    else:
+        base = settings.data_dir / "raw_intraday"
+        name = f"provider_health_{interval}.json"
+    base.mkdir(parents=True, exist_ok=True)
+    return base / name
+
+
+def open_provider_health(interval: str = "1d") -> ProviderHealth:
+    """
+    Health tracker for one ingest run of `interval` bars (carried over from the
+    last run when settings.provider_health_persist is on).
+    """
+    if settings.provider_health_persist:
+        return ProviderHealth.load(provider_health_path(interval))
+    return ProviderHealth()
+
+
+def close_provider_health(health: ProviderHealth, interval: str = "1d") -> None:
+    if settings.provider_health_persist:
+        health.save(provider_health_path(interval))
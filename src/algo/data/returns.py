@@ -0,0 +1,220 @@
+import json
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from algo.config import settings
+from algo.data.fingerprint import file_fingerprint
+from algo.data.prices import canonical_ohlcv_path, load_canonical_field
+from algo.profiling import profiled
+
+ReturnKind = Literal["simple", "log"]
+Dataset = Literal["canonical", "cleaned"]
+
+RETURN_KINDS: tuple[ReturnKind, ...] = ("simple", "log")
+
+
+# ==========================
+# Core logic
+# ==========================
+
+
+def compute_returns(prices: pd.DataFrame, *, kind: ReturnKind = "simple") -> pd.DataFrame:
+    """
+    Returns measured from each asset's previous observation (NaN gaps are bridged):
+        r[t] = p[t] / p[prev] - 1      (simple)
+        r[t] = log(p[t] / p[prev])     (log)
+    NaN where p[t] is missing and at each asset's first observation.
+
+    This is what pct_change() gives on a series with the NaNs dropped. The
+    adjacent-row version (DataFrame.pct_change() on the full panel) is
+    adjacent_returns(returns, prices).
+    """
+    if kind not in RETURN_KINDS:
+        raise ValueError(f"Unknown return kind: {kind}")
+
+    px = prices.to_numpy(dtype=float)
+    prev = prices.ffill().shift().to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = px / prev
+    out = ratio - 1 if kind == "simple" else np.log(ratio)
+
+    return pd.DataFrame(out, index=prices.index, columns=prices.columns)
+
+
+def adjacent_returns(returns: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Restrict gap-bridged returns to rows whose previous row has a price, i.e. the
+    exact values of prices.pct_change() (for simple returns). prices must be the
+    frame the caller works on (after slicing), so its first row yields NaN.
+    """
+    returns = returns.reindex(index=prices.index, columns=prices.columns)
+    return returns.where(prices.shift().notna())
+
+
+# ==========================
+# Storage
+# ==========================
+
+
+def returns_dir(dataset: Dataset) -> Path:
+    base = settings.data_dir / dataset / "returns"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def returns_path(field: str, kind: ReturnKind, *, dataset: Dataset = "cleaned") -> Path:
+    return returns_dir(dataset) / f"{field}_{kind}.parquet"
+
+
+def _manifest_path(dataset: Dataset) -> Path:
+    return returns_dir(dataset) / "manifest.json"
+
+
+def _dataset_file(dataset: Dataset) -> Path:
+    if dataset == "canonical":
+        return canonical_ohlcv_path()
+    if dataset == "cleaned":
+        from algo.data.cleaning import cleaned_path
+
+        return cleaned_path()
+    raise ValueError(f"Unknown dataset: {dataset}")
+
+
+def _load_dataset_field(dataset: Dataset, field: str) -> pd.DataFrame:
+    if dataset == "canonical":
+        return load_canonical_field(field)
+
+    from algo.data.cleaning import load_cleaned_field
+
+    return load_cleaned_field(field)
+
+
+def _read_manifest(dataset: Dataset) -> dict:
+    path = _manifest_path(dataset)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def returns_version(dataset: Dataset = "cleaned") -> str:
+    """
+    Version of the price file the returns must be derived from.
+    """
+    return file_fingerprint(_dataset_file(dataset))
+
+
+@profiled
+def build_returns(
+    field: str,
+    *,
+    dataset: Dataset = "cleaned",
+    kinds: tuple[ReturnKind, ...] = RETURN_KINDS,
+    prices: pd.DataFrame | None = None,
+) -> dict[ReturnKind, Path]:
+    """
+    Materialize the returns panel(s) for one field of a dataset next to its prices.
+    The manifest records which dataset version each file was built from.
+    """
+    version = returns_version(dataset)
+    if version == "missing":
+        raise FileNotFoundError(f"No {dataset} dataset at {_dataset_file(dataset)}")
+
+    prices = _load_dataset_field(dataset, field) if prices is None else prices.sort_index()
+
+    manifest = _read_manifest(dataset)
+    if manifest.get("dataset_version") != version:
+        manifest = {"dataset_version": version, "files": {}}
+
+    # each asset's first price, so loaders can tell which returns are bridged
+    # from before a window's start without reading the prices
+    first = prices.notna().idxmax().where(prices.notna().any())
+    first_obs = {a: None if pd.isna(d) else str(d.date()) for a, d in first.items()}
+
+    paths: dict[ReturnKind, Path] = {}
+    for kind in kinds:
+        path = returns_path(field, kind, dataset=dataset)
+        rets = compute_returns(prices, kind=kind)
+        rets.index.name = "date"
+        rets.to_parquet(path)
+        manifest["files"][path.name] = {"field": field, "kind": kind, "first_obs": first_obs}
+        paths[kind] = path
+
+    _manifest_path(dataset).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return paths
+
+
+def _is_current(path: Path, dataset: Dataset) -> bool:
+    manifest = _read_manifest(dataset)
+    return (
+        path.exists()
+        and manifest.get("dataset_version") == returns_version(dataset)
+        and path.name in manifest.get("files", {})
+    )
+
+
+# ==========================
+# Public API
+# ==========================
+
+
+@profiled
+def load_returns(
+    field: str = "adj_close",
+    *,
+    kind: ReturnKind = "simple",
+    dataset: Dataset = "cleaned",
+    assets: list[str] | None = None,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+    bridge_start: bool = True,
+) -> pd.DataFrame:
+    """
+    Wide (date × asset) returns panel for one field (see compute_returns()).
+
+    The panel is built on first use and rebuilt whenever the underlying dataset
+    changes. assets/start/end are pushed down to the parquet reader.
+
+    Each asset's first return in [start, end] is measured from its last price
+    before start. bridge_start=False drops it (NaN), as if the prices had been
+    sliced at start before computing returns.
+    """
+    path = returns_path(field, kind, dataset=dataset)
+    entry = _read_manifest(dataset).get("files", {}).get(path.name, {})
+    # panels built before first_obs was recorded are rebuilt once
+    if not _is_current(path, dataset) or "first_obs" not in entry:
+        build_returns(field, dataset=dataset)
+
+    filters = []
+    if start is not None:
+        filters.append(("date", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("date", "<=", pd.Timestamp(end)))
+
+    df = pd.read_parquet(path, columns=assets, filters=filters or None)
+    df.index = pd.to_datetime(df.index)
+    df = df.sort_index()
+
+    if not bridge_start and start is not None:
+        df = _drop_bridged(df, path, pd.Timestamp(start), dataset)
+
+    df.attrs["dataset_version"] = returns_version(dataset)
+    df.attrs["field"] = f"{field}_{kind}_returns"
+    return df
+
+
+def _drop_bridged(
+    df: pd.DataFrame, path: Path, start: pd.Timestamp, dataset: Dataset
+) -> pd.DataFrame:
+    """
+    NaN out each asset's first return in df if the asset has a price before
+    start. Within the window a return is missing only where the price is (or at
+    the asset's first price), so that return is the one bridged across start.
+    """
+    first_obs = _read_manifest(dataset)["files"][path.name]["first_obs"]
+    listed = pd.to_datetime(pd.Series({a: first_obs.get(a) for a in df.columns}))
+    bridged = df.notna() & ~df.notna().cumsum().shift(fill_value=0).astype(bool)
+    bridged &= (listed < start).to_numpy()
+    return df.mask(bridged)
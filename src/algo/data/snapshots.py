@@ -0,0 +1,429 @@
+"""
+Content-addressed snapshots of the canonical and cleaned datasets, so a
+backtest can be reproduced after rebuild_data.py has rewritten the files.
+
+A dataset is cut into chunks, one per asset and period. Only rows where the
+asset has data are kept. Periods are calendar years, except that the dataset's
+last year is cut into months, so a nightly append only touches each asset's
+current month. Every chunk is named by the sha256 of its content (dates,
+fields, values). A snapshot is the list of (asset, period) -> chunk plus the
+dataset's own date index, which is stored as chunks of asset INDEX_KEY.
+
+    data/snapshots/packs/<snapshot>.parquet      chunks first stored by that snapshot
+                                                 (long: chunk, date, fields...)
+    data/snapshots/manifests/<snapshot>.json     metadata (dataset, source, fields, assets)
+    data/snapshots/manifests/<snapshot>.parquet  entries: asset, period, chunk, pack
+    data/snapshots/blobs/<sha256>.parquet        side files (cleaned eligibility)
+
+A new snapshot only writes the chunks that are not in the latest snapshot of
+either dataset. Unchanged history, and cleaned chunks equal to canonical ones,
+point to the pack that already holds them. A year of nightly snapshots costs
+one copy, plus the month chunks of each night, plus the assets whose history
+was restated (e.g. adj_close after a dividend).
+
+The snapshot id is a hash of the entries, so an unchanged dataset always gets
+the same id and nothing is written. Loaders take version= (a snapshot id or
+"latest"): load_cleaned_field("adj_close", version=...).
+"""
+
+import hashlib
+import json
+import shutil
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from algo.config import settings
+from algo.data.compact import from_long_compact
+from algo.data.fingerprint import file_fingerprint, file_sha256, hash_payload
+from algo.profiling import count, profiled, span
+
+Dataset = Literal["canonical", "cleaned"]
+
+INDEX_KEY = "__index__"  # entries holding the dataset's date index
+
+_HASH_CHARS = 32  # 128 bits of the sha256
+
+
+# ==========================
+# Paths
+# ==========================
+
+
+def snapshots_dir() -> Path:
+    base = settings.data_dir / "snapshots"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def _subdir(name: str) -> Path:
+    base = snapshots_dir() / name
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def pack_path(pack: str) -> Path:
+    return _subdir("packs") / f"{pack}.parquet"
+
+
+def _meta_path(snapshot_id: str) -> Path:
+    return _subdir("manifests") / f"{snapshot_id}.json"
+
+
+def _entries_path(snapshot_id: str) -> Path:
+    return _subdir("manifests") / f"{snapshot_id}.parquet"
+
+
+def blob_path(sha256: str) -> Path:
+    return _subdir("blobs") / f"{sha256}.parquet"
+
+
+def _dataset_path(dataset: Dataset) -> Path:
+    from algo.data.cleaning import cleaned_path
+    from algo.data.prices import canonical_ohlcv_path
+
+    if dataset == "cleaned":
+        return cleaned_path()
+    if dataset == "canonical":
+        return canonical_ohlcv_path()
+    raise ValueError(f"Unknown dataset: {dataset}")
+
+
+# ==========================
+# Chunking
+# ==========================
+
+
+def _period_codes(index: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Per row a period code, sorted like the index: YYYY00 before the index's
+    last year, YYYYMM within it.
+    """
+    year, month = index.year.to_numpy(), index.month.to_numpy()
+    last = year.max() if len(year) else 0
+    return np.where(year < last, year * 100, year * 100 + month)
+
+
+def _period_label(code: int) -> str:
+    return f"{code // 100}" if code % 100 == 0 else f"{code // 100}-{code % 100:02d}"
+
+
+def _chunk_hash(fields: list[str], dates: np.ndarray, values: np.ndarray) -> str:
+    h = hashlib.sha256()
+    h.update(",".join(fields).encode("utf-8"))
+    h.update(dates.tobytes())
+    # one NaN bit pattern, so equal data always hashes alike
+    h.update(np.where(np.isnan(values), np.nan, values).tobytes())
+    return h.hexdigest()[:_HASH_CHARS]
+
+
+def _iter_chunks(
+    wide: pd.DataFrame, fields: list[str]
+) -> Iterator[tuple[str, str, str, np.ndarray, np.ndarray]]:
+    """
+    (asset, period, chunk hash, dates, values) for the index and every asset.
+    """
+    codes = _period_codes(wide.index)
+    dates = wide.index.to_numpy()
+    dates_i8 = dates.view("i8")
+
+    def split(asset: str, keep: np.ndarray, values: np.ndarray, chunk_fields: list[str]):
+        kept_codes = codes[keep]
+        bounds = np.flatnonzero(np.diff(kept_codes)) + 1
+        for rows in np.split(np.arange(len(kept_codes)), bounds):
+            if len(rows) == 0:
+                continue
+            d, v = dates[keep][rows], values[rows]
+            period = _period_label(int(kept_codes[rows[0]]))
+            yield asset, period, _chunk_hash(chunk_fields, dates_i8[keep][rows], v), d, v
+
+    everything = np.ones(len(dates), dtype=bool)
+    yield from split(INDEX_KEY, everything, np.empty((len(dates), 0)), [])
+
+    for asset in wide.columns.get_level_values("asset").unique():
+        values = wide[asset].reindex(columns=fields).to_numpy(dtype=float)
+        keep = ~np.isnan(values).all(axis=1)
+        yield from split(asset, keep, values[keep], fields)
+
+
+# ==========================
+# Manifests
+# ==========================
+
+
+def list_snapshots(dataset: Dataset | None = None) -> pd.DataFrame:
+    """
+    Snapshots (oldest first) with their metadata, optionally of one dataset.
+    """
+    rows = [json.loads(p.read_text(encoding="utf-8")) for p in _subdir("manifests").glob("*.json")]
+    if dataset is not None:
+        rows = [r for r in rows if r["dataset"] == dataset]
+    columns = [
+        "id",
+        "dataset",
+        "created",
+        "source",
+        "source_fingerprint",
+        "n_chunks",
+        "new_chunks",
+        "new_bytes",
+    ]
+    if not rows:
+        return pd.DataFrame(columns=columns).set_index("id")
+    return pd.DataFrame(rows)[columns].sort_values("created").set_index("id")
+
+
+def snapshot_info(snapshot_id: str, *, dataset: Dataset | None = None) -> dict[str, Any]:
+    """
+    Metadata of a snapshot; snapshot_id="latest" picks the newest one of `dataset`.
+    """
+    if snapshot_id == "latest":
+        if dataset is None:
+            raise ValueError('version="latest" needs a dataset')
+        snapshots = list_snapshots(dataset)
+        if snapshots.empty:
+            raise FileNotFoundError(f"No {dataset} snapshots in {snapshots_dir()}")
+        snapshot_id = str(snapshots.index[-1])
+
+    path = _meta_path(snapshot_id)
+    if not path.exists():
+        raise KeyError(f"Unknown snapshot: {snapshot_id}")
+    info = json.loads(path.read_text(encoding="utf-8"))
+    if dataset is not None and info["dataset"] != dataset:
+        raise ValueError(
+            f"Snapshot {snapshot_id} is of the {info['dataset']} dataset, not {dataset}"
+        )
+    return info
+
+
+def snapshot_entries(snapshot_id: str) -> pd.DataFrame:
+    """
+    asset, period, chunk, pack of every chunk of a snapshot.
+    """
+    return pd.read_parquet(_entries_path(snapshot_id))
+
+
+def _known_chunks() -> dict[str, str]:
+    """
+    chunk -> pack for the latest snapshot of each dataset.
+    """
+    known: dict[str, str] = {}
+    for dataset in ("canonical", "cleaned"):
+        snapshots = list_snapshots(dataset)
+        if not snapshots.empty:
+            entries = snapshot_entries(str(snapshots.index[-1]))
+            known.update(zip(entries["chunk"], entries["pack"], strict=True))
+    return known
+
+
+def current_snapshot(dataset: Dataset, *, path: Path | None = None) -> str | None:
+    """
+    Id of the snapshot taken of the dataset file as it is now, None if there is none.
+    """
+    fingerprint = file_fingerprint(path or _dataset_path(dataset))
+    snapshots = list_snapshots(dataset)
+    matching = snapshots.index[snapshots["source_fingerprint"] == fingerprint]
+    return str(matching[-1]) if len(matching) else None
+
+
+# ==========================
+# Write
+# ==========================
+
+
+def _write_pack(path: Path, chunks: list[tuple[str, np.ndarray, np.ndarray]], fields: list[str]):
+    n = [len(d) for _, d, _ in chunks]
+    values = np.full((sum(n), len(fields)), np.nan)
+    row = 0
+    for (_, _, v), k in zip(chunks, n, strict=True):
+        if v.shape[1]:
+            values[row : row + k] = v
+        row += k
+
+    table = pa.table(
+        {
+            "chunk": pa.array(np.repeat([c for c, _, _ in chunks], n)).dictionary_encode(),
+            "date": pa.array(np.concatenate([d for _, d, _ in chunks])),
+            **{f: pa.array(values[:, j], from_pandas=True) for j, f in enumerate(fields)},
+        }
+    )
+    pq.write_table(table, path)
+
+
+@profiled
+def create_snapshot(dataset: Dataset = "cleaned", *, path: Path | None = None) -> str:
+    """
+    Snapshot the dataset file as it is now and return the snapshot id. Only
+    chunks missing from the latest snapshots are written; an unchanged dataset
+    returns the existing id.
+    """
+    path = path or _dataset_path(dataset)
+    if not path.exists():
+        raise FileNotFoundError(f"No {dataset} dataset at {path}")
+
+    with span("read"):
+        wide = pd.read_parquet(path)
+        wide.index = pd.DatetimeIndex(wide.index, name="date")
+        wide = wide.sort_index()
+    if not isinstance(wide.columns, pd.MultiIndex):
+        raise ValueError("Expected MultiIndex columns (asset, field)")
+
+    fields = list(wide.columns.get_level_values("field").unique())
+    assets = list(wide.columns.get_level_values("asset").unique())
+    with span("hash"):
+        chunks = list(_iter_chunks(wide, fields))
+
+    eligibility = path.parent / "eligibility.parquet"
+    blob = file_sha256(eligibility) if dataset == "cleaned" and eligibility.exists() else None
+
+    snapshot_id = hash_payload(
+        [dataset, fields, assets, [(a, p, c) for a, p, c, _, _ in chunks], blob]
+    )[:16]
+    info = {
+        "id": snapshot_id,
+        "dataset": dataset,
+        "created": datetime.now().isoformat(),
+        "source": str(path),
+        "source_fingerprint": file_fingerprint(path),
+        "fields": fields,
+        "assets": assets,
+        "eligibility": blob,
+    }
+
+    if _meta_path(snapshot_id).exists():
+        # same content as an earlier snapshot: it becomes the latest, taken of the current file
+        previous = json.loads(_meta_path(snapshot_id).read_text(encoding="utf-8"))
+        previous["created"] = info["created"]
+        previous["source_fingerprint"] = info["source_fingerprint"]
+        _meta_path(snapshot_id).write_text(json.dumps(previous, indent=2), encoding="utf-8")
+        return snapshot_id
+
+    known = _known_chunks()
+    new: dict[str, tuple[str, np.ndarray, np.ndarray]] = {}
+    for _, _, chunk, dates, values in chunks:
+        if chunk not in known and chunk not in new:
+            new[chunk] = (chunk, dates, values)
+
+    if new:
+        with span("write_pack"):
+            _write_pack(pack_path(snapshot_id), list(new.values()), fields)
+    if blob is not None and not blob_path(blob).exists():
+        shutil.copyfile(eligibility, blob_path(blob))
+
+    entries = pd.DataFrame(
+        {
+            "asset": [a for a, _, _, _, _ in chunks],
+            "period": [p for _, p, _, _, _ in chunks],
+            "chunk": [c for _, _, c, _, _ in chunks],
+            "pack": [snapshot_id if c in new else known[c] for _, _, c, _, _ in chunks],
+        }
+    )
+    entries.to_parquet(_entries_path(snapshot_id))
+    count("snapshots.new_chunks", len(new))
+
+    info |= {
+        "n_chunks": len(entries),
+        "new_chunks": len(new),
+        "new_bytes": pack_path(snapshot_id).stat().st_size if new else 0,
+    }
+    # metadata last: a snapshot is listed only once its entries and pack exist
+    _meta_path(snapshot_id).write_text(json.dumps(info, indent=2), encoding="utf-8")
+    return snapshot_id
+
+
+def ensure_snapshot(dataset: Dataset = "cleaned", *, path: Path | None = None) -> str:
+    """
+    current_snapshot() if the file was snapshotted already, else a new snapshot.
+    """
+    return current_snapshot(dataset, path=path) or create_snapshot(dataset, path=path)
+
+
+def delete_snapshot(snapshot_id: str) -> None:
+    """
+    Forget a snapshot. Its chunks stay until collect_garbage() finds them unreferenced.
+    """
+    if not _meta_path(snapshot_id).exists():
+        raise KeyError(f"Unknown snapshot: {snapshot_id}")
+    _meta_path(snapshot_id).unlink()
+    _entries_path(snapshot_id).unlink(missing_ok=True)
+
+
+def collect_garbage() -> list[Path]:
+    """
+    Delete packs and blobs no remaining snapshot refers to. Returns the deleted files.
+    """
+    snapshots = list_snapshots()
+    packs: set[str] = set()
+    blobs: set[str] = set()
+    for snapshot_id in snapshots.index:
+        packs.update(snapshot_entries(str(snapshot_id))["pack"].unique())
+        blob = snapshot_info(str(snapshot_id))["eligibility"]
+        if blob is not None:
+            blobs.add(blob)
+
+    deleted: list[Path] = []
+    for directory, live in [(_subdir("packs"), packs), (_subdir("blobs"), blobs)]:
+        for p in directory.glob("*.parquet"):
+            if p.stem not in live:
+                p.unlink()
+                deleted.append(p)
+    return deleted
+
+
+# ==========================
+# Read
+# ==========================
+
+
+@profiled
+def load_snapshot(version: str, *, dataset: Dataset | None = None) -> pd.DataFrame:
+    """
+    The dataset as it was at snapshot `version` (id or "latest"): the wide
+    (asset, field) frame of the file it was taken from. attrs carry the snapshot id.
+    """
+    info = snapshot_info(version, dataset=dataset)
+    fields = info["fields"]
+    entries = snapshot_entries(info["id"])
+
+    parts: list[pd.DataFrame] = []
+    for pack, group in entries.groupby("pack", sort=False):
+        table = pq.read_table(
+            pack_path(str(pack)),
+            columns=["chunk", "date", *fields],
+            filters=[("chunk", "in", list(group["chunk"].unique()))],
+        )
+        parts.append(table.to_pandas())
+    long = pd.concat(parts, ignore_index=True)
+    long["chunk"] = long["chunk"].astype(str)
+
+    is_index = entries["asset"] == INDEX_KEY
+    index_chunks = set(entries.loc[is_index, "chunk"])
+    index = pd.DatetimeIndex(
+        long.loc[long["chunk"].isin(index_chunks), "date"].unique(), name="date"
+    ).sort_values()
+
+    # a chunk can back several assets (equal content), hence the merge
+    rows = long.merge(entries.loc[~is_index, ["asset", "chunk"]], on="chunk")
+    rows["asset"] = pd.Categorical(rows["asset"], categories=info["assets"])
+    wide = from_long_compact(rows[["date", "asset", *fields]], fields)
+
+    columns = pd.MultiIndex.from_product([info["assets"], fields], names=["asset", "field"])
+    out = wide.reindex(index=index, columns=columns)
+    out.attrs["snapshot"] = info["id"]
+    return out
+
+
+def snapshot_eligibility_path(version: str) -> Path:
+    """
+    The cleaned eligibility file stored with a cleaned snapshot.
+    """
+    info = snapshot_info(version, dataset="cleaned")
+    if info["eligibility"] is None:
+        raise FileNotFoundError(f"Snapshot {info['id']} has no eligibility file")
+    return blob_path(info["eligibility"])
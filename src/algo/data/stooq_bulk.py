@@ -0,0 +1,177 @@
+"""
+Backfill the stooq raw caches from a stooq bulk database (the zipped daily
+"db" downloads, e.g. d_us_txt.zip) instead of one HTTP request per symbol.
+
+The archive holds one CSV per symbol, e.g. data/daily/us/nyse stocks/1/ibm.us.txt:
+
+    <TICKER>,<PER>,<DATE>,<TIME>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<VOL>,<OPENINT>
+    IBM.US,D,19700102,000000,...
+
+Members are matched to registry keys by file name through the reverse stooq
+identifier index, so only members of registered assets are decompressed and
+parsed (pyarrow.csv). Everything happens in one pass over the archive, one
+member in memory at a time; each match is merged into the asset's raw cache
+just like update_cache("stooq", ...) would.
+"""
+
+import io
+import time
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from algo.data.ingest_metrics import IngestRecord, new_run_id, write_ingest_metrics
+from algo.data.prices import merge_prices, read_cache, write_cache
+from algo.profiling import count, profiled
+from algo.symbols.registry import get_registry
+
+MEMBER_SUFFIXES = (".txt", ".csv")
+
+_COLUMNS = {
+    "<TICKER>": pa.string(),
+    "<PER>": pa.string(),
+    "<DATE>": pa.timestamp("us"),
+    "<OPEN>": pa.float64(),
+    "<HIGH>": pa.float64(),
+    "<LOW>": pa.float64(),
+    "<CLOSE>": pa.float64(),
+    "<VOL>": pa.float64(),
+}
+
+
+def member_symbol(name: str) -> str:
+    """
+    Stooq symbol of an archive member: "data/daily/us/nyse stocks/1/ibm.us.txt" -> "ibm.us".
+    """
+    p = PurePosixPath(name.replace("\\", "/"))
+    return p.name.removesuffix(p.suffix).lower()
+
+
+def _iter_members(archive: Path) -> Iterator[tuple[str, int, zipfile.ZipFile | None]]:
+    """
+    (member name, uncompressed size, open zip or None for a plain directory).
+    """
+    if archive.is_dir():
+        for path in sorted(archive.rglob("*")):
+            if path.suffix.lower() in MEMBER_SUFFIXES:
+                yield str(path), path.stat().st_size, None
+        return
+
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            if not info.is_dir() and info.filename.lower().endswith(MEMBER_SUFFIXES):
+                yield info.filename, info.file_size, zf
+
+
+@profiled
+def parse_stooq_bulk_csv(data: bytes) -> pd.DataFrame:
+    """
+    One bulk-database CSV -> the frame fetch_stooq_daily returns
+    (open, high, low, close, volume; midnight DatetimeIndex). Non-daily rows are dropped.
+    """
+    table = pacsv.read_csv(
+        io.BytesIO(data),
+        convert_options=pacsv.ConvertOptions(
+            column_types=_COLUMNS,
+            include_columns=list(_COLUMNS),
+            timestamp_parsers=["%Y%m%d"],
+        ),
+    )
+    df = table.to_pandas()
+    df = df[df["<PER>"] == "D"]
+
+    out = pd.DataFrame(
+        {
+            "open": df["<OPEN>"].to_numpy(),
+            "high": df["<HIGH>"].to_numpy(),
+            "low": df["<LOW>"].to_numpy(),
+            "close": df["<CLOSE>"].to_numpy(),
+            "volume": df["<VOL>"].to_numpy(),
+        },
+        index=pd.DatetimeIndex(df["<DATE>"], name="date"),
+    )
+    out = out.sort_index().dropna(subset=["close"])
+    return out[~out.index.duplicated(keep="last")]
+
+
+@profiled
+def ingest_stooq_bulk(
+    archive: Path,
+    *,
+    asset_keys: list[str] | None = None,
+) -> dict[str, int]:
+    """
+    Merge every registered asset found in the archive (zip or unpacked
+    directory) into its stooq raw cache. Returns asset_key -> rows in the
+    cache afterwards; registered assets missing from the archive are left out.
+    Each written asset is logged as an ingest attempt (see algo.data.ingest_metrics).
+    """
+    if not archive.exists():
+        raise FileNotFoundError(f"No stooq archive at {archive}")
+
+    index = get_registry().reverse_index("stooq")
+    wanted = None if asset_keys is None else set(asset_keys)
+
+    written: dict[str, int] = {}
+    metrics: list[IngestRecord] = []
+    run_id = new_run_id()
+
+    try:
+        for name, size, zf in _iter_members(archive):
+            keys = [k for k in index.get(member_symbol(name), []) if wanted is None or k in wanted]
+            if not keys:
+                count("stooq_bulk.skipped")
+                continue
+
+            t0 = time.perf_counter()
+            data = zf.read(name) if zf is not None else Path(name).read_bytes()
+            try:
+                fresh = parse_stooq_bulk_csv(data)
+            except (pa.ArrowInvalid, KeyError, ValueError) as e:
+                # a broken member (empty file, other layout) must not stop the backfill
+                error = f"{type(e).__name__}: {e}"
+                for key in keys:
+                    metrics.append(
+                        IngestRecord(
+                            run_id=run_id,
+                            ts=time.time(),
+                            asset=key,
+                            provider="stooq",
+                            status="error",
+                            payload_bytes=size,
+                            error=error,
+                        )
+                    )
+                continue
+            parse_s = time.perf_counter() - t0
+            count("stooq_bulk.rows", len(fresh))
+
+            for key in keys:
+                existing = read_cache("stooq", key)
+                merged = merge_prices(existing, fresh)
+                write_cache("stooq", key, merged)
+                written[key] = len(merged)
+                metrics.append(
+                    IngestRecord(
+                        run_id=run_id,
+                        ts=time.time(),
+                        asset=key,
+                        provider="stooq",
+                        status="ok",
+                        fetch_s=parse_s,
+                        total_s=time.perf_counter() - t0,
+                        payload_bytes=size,
+                        rows_fetched=len(fresh),
+                        rows_added=len(merged) - (0 if existing is None else len(existing)),
+                        rows_total=len(merged),
+                        cache_hit=existing is not None,
+                    )
+                )
+    finally:
+        write_ingest_metrics(metrics)
+
+    return written
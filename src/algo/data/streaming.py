@@ -0,0 +1,305 @@
+"""
+Streaming build of the canonical and cleaned datasets.
+
+Each asset flows fetch -> canonicalize -> partition write as soon as its data
+arrives (download threads feed a bounded queue), and is then cleaned and
+written per asset in a process pool with a bounded number of tasks in flight.
+
+Cleaning needs the date index of each trading calendar (coverage windows and
+gap lengths are counted in rows of the calendar's combined frame, see
+algo.data.calendars), so it starts once the last asset is canonicalized; only
+those indexes are held in memory until then. The final
+single-file datasets are assembled from the partitions and are identical to
+what export_canonical_ohlcv() + build_cleaned_ohlcv() write.
+"""
+
+import os
+import queue
+import shutil
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from algo.config import settings
+from algo.data.calendars import asset_calendar
+from algo.data.cleaning import _clean_single_asset, write_cleaned_ohlcv
+from algo.data.ingest_metrics import IngestRecord, new_run_id, write_ingest_metrics
+from algo.data.prices import (
+    Provider,
+    _asset_key_to_filename,
+    _choose_cached,
+    _choose_provider_and_update,
+    canonical_asset_frame,
+    write_canonical_ohlcv,
+)
+from algo.data.provider_health import close_provider_health, open_provider_health
+from algo.data.returns import build_returns, compute_returns
+from algo.profiling import span
+from algo.symbols.registry import list_asset_keys
+
+# ==========================
+# Partitions
+# ==========================
+
+
+def parts_dir(dataset: str) -> Path:
+    base = settings.data_dir / dataset / "parts"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def part_path(dataset: str, asset_key: str) -> Path:
+    return parts_dir(dataset) / f"{_asset_key_to_filename(asset_key)}.parquet"
+
+
+def _read_part(dataset: str, asset_key: str) -> pd.DataFrame:
+    df = pd.read_parquet(part_path(dataset, asset_key))
+    df.columns = pd.MultiIndex.from_product([[asset_key], df.columns], names=["asset", "field"])
+    return df
+
+
+def _write_part(dataset: str, asset_key: str, df: pd.DataFrame) -> None:
+    out = df.copy()
+    out.columns = out.columns.get_level_values("field")
+    out.to_parquet(part_path(dataset, asset_key))
+
+
+# ==========================
+# Stage 1: fetch -> canonicalize
+# ==========================
+
+_DONE = object()
+_PUT_TIMEOUT = 0.1  # seconds between checks of the stop event while the queue is full
+
+
+def _put(q: queue.Queue, item: object, stop: threading.Event) -> bool:
+    """
+    q.put that gives up once `stop` is set (the consumer failed). Returns False then.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _fetch_into(
+    q: queue.Queue,
+    asset_keys: list[str],
+    *,
+    stop: threading.Event,
+    provider_priority: list[Provider],
+    refresh: bool,
+    workers: int,
+    metrics: list[IngestRecord],
+) -> None:
+    """
+    Download (or read cached) raw prices in a thread pool and put (key, df) on q.
+    q.put blocks when the consumer lags, which bounds memory; once `stop` is
+    set, remaining assets are skipped and nothing more is put. All download
+    threads share one provider health tracker (circuit breaker).
+    """
+    run_id = new_run_id()
+    health = open_provider_health()
+
+    def fetch(key: str) -> None:
+        if stop.is_set():
+            return
+        try:
+            if refresh:
+                _, df = _choose_provider_and_update(
+                    key, provider_priority, metrics=metrics, run_id=run_id, health=health
+                )
+            else:
+                _, df = _choose_cached(key, provider_priority)
+        except Exception as e:
+            df = e
+        _put(q, (key, df), stop)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(fetch, asset_keys))
+    finally:
+        close_provider_health(health)
+    _put(q, _DONE, stop)
+
+
+def _canonicalize_stream(
+    asset_keys: list[str],
+    *,
+    provider_priority: list[Provider],
+    refresh: bool,
+    fetch_workers: int,
+    queue_size: int,
+) -> tuple[dict[str, str], dict[str, pd.DatetimeIndex]]:
+    """
+    Canonicalize assets as they arrive and write one partition per asset.
+    Returns (asset -> calendar, calendar -> date index), the only things kept in memory.
+    """
+    q: queue.Queue = queue.Queue(maxsize=queue_size)
+    calendars: dict[str, str] = {}
+    indexes: dict[str, pd.Index] = {}
+    metrics: list[IngestRecord] = []
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=1) as producer:
+        fut = producer.submit(
+            _fetch_into,
+            q,
+            asset_keys,
+            stop=stop,
+            provider_priority=provider_priority,
+            refresh=refresh,
+            workers=fetch_workers,
+            metrics=metrics,
+        )
+        try:
+            while (item := q.get()) is not _DONE:
+                key, df = item
+                if isinstance(df, Exception):
+                    raise df
+
+                canon = canonical_asset_frame(key, df)
+                _write_part("canonical", key, canon)
+                dates = canon.dropna(how="all").index
+                calendar = calendars[key] = asset_calendar(key, dates)
+                index = indexes.get(calendar)
+                indexes[calendar] = dates if index is None else index.union(dates)
+            fut.result()
+        except BaseException:
+            # unblock the producers (they stop putting) and let the executor shut down
+            stop.set()
+            while not fut.done():
+                try:
+                    q.get(timeout=_PUT_TIMEOUT)
+                except queue.Empty:
+                    pass
+            raise
+        finally:
+            write_ingest_metrics(metrics)
+
+    if not indexes:
+        raise ValueError("No assets to build")
+    return calendars, {c: pd.DatetimeIndex(i).sort_values() for c, i in indexes.items()}
+
+
+# ==========================
+# Stage 2: clean per asset
+# ==========================
+
+
+def _clean_part(asset_key: str, calendar: str, index: pd.DatetimeIndex) -> dict | None:
+    """
+    Clean one canonical partition on its calendar's index; write the cleaned partition.
+    Runs in a worker process. Returns the eligibility row (None if dropped).
+    """
+    canon = _read_part("canonical", asset_key).reindex(index)
+    price_field = "adj_close" if (asset_key, "adj_close") in canon.columns else "close"
+    rets = compute_returns(canon[[(asset_key, price_field)]]).iloc[:, 0]
+
+    cleaned, info = _clean_single_asset(canon, asset_key, rets)
+    if cleaned is None:
+        return None
+    info["calendar"] = calendar
+
+    cleaned.columns = pd.MultiIndex.from_product(
+        [[asset_key], cleaned.columns], names=["asset", "field"]
+    )
+    _write_part("cleaned", asset_key, cleaned)
+    return info
+
+
+def _bounded_map(
+    pool: ProcessPoolExecutor,
+    asset_keys: list[str],
+    calendars: dict[str, str],
+    indexes: dict[str, pd.DatetimeIndex],
+    in_flight: int,
+) -> Iterator[tuple[str, dict | None]]:
+    """
+    Submit at most `in_flight` tasks at a time; yield results in asset order.
+    """
+    pending: dict[str, Future] = {}
+    keys = iter(asset_keys)
+
+    def submit(key: str) -> Future:
+        calendar = calendars[key]
+        return pool.submit(_clean_part, key, calendar, indexes[calendar])
+
+    for key in keys:
+        pending[key] = submit(key)
+        if len(pending) >= in_flight:
+            break
+
+    for key in asset_keys:
+        info = pending.pop(key).result()
+        nxt = next(keys, None)
+        if nxt is not None:
+            pending[nxt] = submit(nxt)
+        yield key, info
+
+
+# ==========================
+# Public API
+# ==========================
+
+
+def stream_build_datasets(
+    asset_keys: list[str] | None = None,
+    *,
+    provider_priority: list[Provider] | None = None,
+    refresh: bool = True,
+    fetch_workers: int = 8,
+    clean_workers: int | None = None,
+    queue_size: int = 16,
+) -> tuple[Path, pd.DataFrame, pd.DataFrame]:
+    """
+    Streaming equivalent of export_canonical_ohlcv() followed by build_cleaned_ohlcv().
+
+    refresh=False reads the raw caches instead of downloading.
+    queue_size bounds both the fetched-but-not-canonicalized frames and the
+    cleaning tasks in flight.
+
+    Returns (canonical path, cleaned, eligibility).
+    """
+    provider_priority = provider_priority or ["yahoo", "stooq"]
+    asset_keys = asset_keys or list_asset_keys()
+
+    for dataset in ["canonical", "cleaned"]:
+        shutil.rmtree(parts_dir(dataset), ignore_errors=True)
+
+    with span("stream.canonicalize"):
+        calendars, indexes = _canonicalize_stream(
+            asset_keys,
+            provider_priority=provider_priority,
+            refresh=refresh,
+            fetch_workers=fetch_workers,
+            queue_size=queue_size,
+        )
+
+    workers = clean_workers or os.cpu_count() or 1
+    survivors: list[str] = []
+    eligibility: list[dict] = []
+    with span("stream.clean"), ProcessPoolExecutor(max_workers=workers) as pool:
+        for key, info in _bounded_map(
+            pool, asset_keys, calendars, indexes, max(queue_size, workers)
+        ):
+            if info is not None:
+                survivors.append(key)
+                eligibility.append(info)
+
+    # Assemble the single-file datasets from the partitions
+    canonical_path = write_canonical_ohlcv(
+        [_read_part("canonical", k) for k in asset_keys], calendars=calendars
+    )
+    build_returns("adj_close", dataset="canonical")
+
+    cleaned, eligibility_df = write_cleaned_ohlcv(
+        [_read_part("cleaned", k) for k in survivors], eligibility
+    )
+    return canonical_path, cleaned, eligibility_df
@@ -0,0 +1,315 @@
+"""
+Synthetic canonical OHLCV panels for scale testing (N assets × M years, offline).
+
+Prices follow a regime-switching GBM: a shared two-state (calm/stressed) market
+regime scales a market factor and fat-tailed idiosyncratic noise. On top of
+that the generator adds what real data has and the cleaning step must handle:
+
+- calendars per kind: US equities/ETFs (US holidays), FX (weekdays), crypto (7/7);
+  mixing them is opt-in via kind_mix (MIXED_KIND_MIX)
+- late listings and delistings
+- holes: short gaps (filled by cleaning) and long gaps (left as NaN)
+- extreme moves (unadjusted splits / bad ticks), mostly early in an asset's life
+
+write_synthetic_dataset() writes the canonical file plus a matching registry, so
+with ALGO_DATA_DIR / ALGO_REGISTRY_PATH pointed at it, build_cleaned_ohlcv(),
+get_clean_universe() and the engines run on it unchanged.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from algo.data.calendars import KIND_CALENDAR, calendar_days
+from algo.data.prices import write_canonical_ohlcv
+from algo.symbols.registry import Asset, AssetFile, write_registry
+
+FIELDS = ["open", "high", "low", "close", "volume", "adj_close"]
+
+MIXED_KIND_MIX: dict[str, float] = {"equity": 0.85, "etf": 0.05, "fx": 0.04, "crypto": 0.06}
+
+# per kind: (annual drift, annual idio vol, beta mean, beta std)
+_KIND_PARAMS: dict[str, tuple[float, float, float, float]] = {
+    "equity": (0.07, 0.30, 1.0, 0.3),
+    "etf": (0.06, 0.08, 1.0, 0.1),
+    "fx": (0.0, 0.08, 0.0, 0.05),
+    "crypto": (0.20, 0.80, 0.5, 0.3),
+}
+
+
+class SyntheticSpec(BaseModel):
+    n_assets: int = 1000
+    years: int = 20
+    start: str = "2000-01-03"
+    seed: int = 0
+    # only US-calendar kinds by default; MIXED_KIND_MIX adds FX and crypto, which
+    # are stored and cleaned on their own calendars (algo.data.calendars)
+    kind_mix: dict[str, float] = Field(default_factory=lambda: {"equity": 0.9, "etf": 0.1})
+    # first asset is a full-history market ETF (the default benchmark key)
+    benchmark_key: str | None = "spy"
+
+    # market factor + regimes
+    market_drift: float = 0.07
+    market_vol: float = 0.16
+    p_calm_to_stress: float = 0.01
+    p_stress_to_calm: float = 0.05
+    stress_vol_mult: float = 2.5
+    tail_df: float = 4.0
+
+    # listings and data defects
+    late_listing_frac: float = 0.3
+    delisting_frac: float = 0.1
+    short_gap_rate: float = 0.002  # per trading row; gaps of 1-5 rows
+    long_gap_frac: float = 0.05  # assets with one gap of 10-60 rows
+    extreme_frac: float = 0.03  # assets with an extreme move
+    chunk_size: int = 512  # assets simulated at a time
+
+
+# ==========================
+# Core logic
+# ==========================
+
+
+def _market_path(
+    spec: SyntheticSpec, n_days: int, dt: float, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (regime vol multiplier, market log-returns) per day of the master index.
+    """
+    stressed = np.zeros(n_days, dtype=bool)
+    flips = rng.random(n_days)
+    for t in range(1, n_days):
+        p = spec.p_stress_to_calm if stressed[t - 1] else spec.p_calm_to_stress
+        stressed[t] = stressed[t - 1] != (flips[t] < p)
+
+    mult = np.where(stressed, spec.stress_vol_mult, 1.0)
+    sigma = spec.market_vol * np.sqrt(dt) * mult
+    market = (spec.market_drift - 0.5 * spec.market_vol**2) * dt + sigma * rng.standard_normal(
+        n_days
+    )
+    return mult, market
+
+
+def _student_t(rng: np.random.Generator, df: float, shape: tuple[int, int]) -> np.ndarray:
+    # unit-variance Student-t noise (fat tails)
+    return rng.standard_t(df, size=shape) * np.sqrt((df - 2) / df)
+
+
+def _punch_holes(
+    observed: np.ndarray, spec: SyntheticSpec, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Remove short gaps (1-5 trading rows) and, for some assets, one long gap
+    (10-60 rows) from the observed mask. Returns (mask, gap rows per asset).
+    """
+    n = observed.shape[1]
+    holes = np.zeros(n, dtype=int)
+
+    for j in range(n):
+        rows = np.flatnonzero(observed[:, j])
+        if len(rows) < 100:
+            continue
+
+        n_short = rng.poisson(spec.short_gap_rate * len(rows))
+        gaps = [(s, int(rng.integers(1, 6))) for s in rng.integers(1, len(rows) - 5, n_short)]
+        if rng.random() < spec.long_gap_frac:
+            gaps.append((int(rng.integers(1, len(rows) - 60)), int(rng.integers(10, 61))))
+
+        for s, length in gaps:
+            hit = rows[s : s + length]
+            holes[j] += int(observed[hit, j].sum())
+            observed[hit, j] = False
+
+    return observed, holes
+
+
+def _simulate_chunk(
+    spec: SyntheticSpec,
+    kinds: list[str],
+    masks: dict[str, np.ndarray],
+    mult: np.ndarray,
+    market: np.ndarray,
+    dt: float,
+    rng: np.random.Generator,
+    *,
+    full_history: np.ndarray,
+) -> tuple[dict[str, np.ndarray], pd.DataFrame]:
+    n_days, n = len(market), len(kinds)
+    params = np.array([_KIND_PARAMS[k] for k in kinds])
+    drift, vol, beta_mu, beta_sd = params.T
+    beta = beta_mu + beta_sd * rng.standard_normal(n)
+
+    idio = vol * np.sqrt(dt) * mult[:, None] * _student_t(rng, spec.tail_df, (n_days, n))
+    log_ret = (drift - 0.5 * vol**2) * dt + beta * market[:, None] + idio
+
+    # extreme moves: one jump of |simple return| > 60%, mostly early in life
+    extreme = (rng.random(n) < spec.extreme_frac) & ~full_history
+    jump_day = np.where(
+        rng.random(n) < 0.7,
+        rng.integers(1, max(2, n_days // 5), n),
+        rng.integers(1, n_days, n),
+    )
+    jump = rng.choice([-1.0, 1.0], n) * rng.uniform(1.0, 1.6, n)
+    cols = np.flatnonzero(extreme)
+    log_ret[jump_day[cols], cols] += jump[cols]
+
+    adj = 100.0 * np.exp(rng.normal(0, 0.5, n)) * np.exp(np.cumsum(log_ret, axis=0))
+
+    # listing window
+    listed = np.where(
+        (rng.random(n) < spec.late_listing_frac) & ~full_history,
+        rng.integers(0, int(0.7 * n_days), n),
+        0,
+    )
+    delisted = np.where(
+        (rng.random(n) < spec.delisting_frac) & ~full_history,
+        listed + rng.integers(int(0.3 * n_days), n_days, n),
+        n_days,
+    ).clip(max=n_days)
+    t = np.arange(n_days)[:, None]
+    alive = (t >= listed) & (t < delisted)
+
+    calendars = [KIND_CALENDAR[k] for k in kinds]
+    on_calendar = np.column_stack([masks[c] for c in calendars])
+    observed, holes = _punch_holes(alive & on_calendar, spec, rng)
+    # the benchmark keeps its full history: no holes, none reported
+    observed[:, full_history] = (alive & on_calendar)[:, full_history]
+    holes[full_history] = 0
+
+    # unadjusted close: dividends make past closes higher than adj_close
+    div_yield = np.where(np.isin(kinds, ["equity", "etf"]), rng.uniform(0, 0.03, n), 0.0)
+    close = adj * np.exp(div_yield * (n_days - 1 - t) * dt)
+
+    # the day's move happens on trading days; days off-calendar are carried to the next one
+    px = np.where(observed, close, np.nan)
+    prev = pd.DataFrame(px).ffill().shift().to_numpy()
+    daily_sd = vol * np.sqrt(dt)
+    open_ = np.where(np.isnan(prev), close, prev) * np.exp(
+        0.2 * daily_sd * rng.standard_normal((n_days, n))
+    )
+    wick = np.abs(0.5 * daily_sd * rng.standard_normal((2, n_days, n)))
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+    volume = np.round(
+        np.exp(rng.normal(13, 1.5, n)) * np.exp(0.5 * rng.standard_normal((n_days, n)))
+    )
+
+    fields = {
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+        "adj_close": adj,
+    }
+    fields = {f: np.where(observed, a, np.nan) for f, a in fields.items()}
+
+    truth = pd.DataFrame(
+        {
+            "kind": kinds,
+            "calendar": calendars,
+            "beta": beta,
+            "vol": vol,
+            "listed": listed,
+            "delisted": delisted,
+            "extreme": extreme,
+            "gap_rows": holes,
+        }
+    )
+    return fields, truth
+
+
+# ==========================
+# Public API
+# ==========================
+
+
+def generate_synthetic_ohlcv(
+    spec: SyntheticSpec,
+) -> tuple[pd.DataFrame, AssetFile, pd.DataFrame]:
+    """
+    Simulate a canonical-format panel (MultiIndex columns: asset, field).
+
+    Returns (canonical, registry, truth); truth has the simulated parameters and
+    defects per asset (listing rows, extreme move, gap rows, ...).
+    """
+    rng = np.random.default_rng(spec.seed)
+    start = pd.Timestamp(spec.start)
+    end = start + pd.DateOffset(years=spec.years) - pd.Timedelta(days=1)
+
+    kinds_all = list(spec.kind_mix)
+    probs = np.array([spec.kind_mix[k] for k in kinds_all], dtype=float)
+    kinds = list(rng.choice(kinds_all, spec.n_assets, p=probs / probs.sum()))
+
+    keys = [f"syn{i:05d}" for i in range(spec.n_assets)]
+    full_history = np.zeros(spec.n_assets, dtype=bool)
+    if spec.benchmark_key is not None and spec.n_assets > 0:
+        keys[0], kinds[0], full_history[0] = spec.benchmark_key, "etf", True
+
+    calendars = {KIND_CALENDAR[k] for k in kinds}
+    index = pd.DatetimeIndex([])
+    for cal in calendars:
+        index = index.union(calendar_days(cal, start, end))
+    index.name = "date"
+    masks = {cal: index.isin(calendar_days(cal, start, end)) for cal in calendars}
+
+    # time step of one master row, so annual drift/vol hold on any calendar mix
+    dt = 1.0 / (len(index) / spec.years)
+    mult, market = _market_path(spec, len(index), dt, rng)
+
+    frames: list[pd.DataFrame] = []
+    truths: list[pd.DataFrame] = []
+    for lo in range(0, spec.n_assets, spec.chunk_size):
+        hi = min(lo + spec.chunk_size, spec.n_assets)
+        fields, truth = _simulate_chunk(
+            spec,
+            kinds[lo:hi],
+            masks,
+            mult,
+            market,
+            dt,
+            rng,
+            full_history=full_history[lo:hi],
+        )
+        # asset-major column order, like the canonical export
+        block = np.stack([fields[f] for f in FIELDS], axis=2).reshape(len(index), -1)
+        columns = pd.MultiIndex.from_product([keys[lo:hi], FIELDS], names=["asset", "field"])
+        frames.append(pd.DataFrame(block, index=index, columns=columns))
+        truth.index = pd.Index(keys[lo:hi], name="asset")
+        truths.append(truth)
+
+    canonical = pd.concat(frames, axis=1)
+    truth = pd.concat(truths)
+    truth["listed"] = index[truth["listed"]]
+    truth["delisted"] = [index[i] if i < len(index) else pd.NaT for i in truth["delisted"]]
+
+    registry = AssetFile(
+        assets=[
+            Asset(key=k, kind=kind, name=f"Synthetic {kind} {k}", identifiers={"synthetic": k})
+            for k, kind in zip(keys, kinds, strict=True)
+        ]
+    )
+    return canonical, registry, truth
+
+
+def write_synthetic_dataset(spec: SyntheticSpec, data_dir: Path) -> Path:
+    """
+    Write <data_dir>/canonical/ohlcv.parquet and <data_dir>/synthetic/{assets.yaml,
+    truth.parquet}. Returns the registry path (for ALGO_REGISTRY_PATH).
+    """
+    canonical, registry, truth = generate_synthetic_ohlcv(spec)
+
+    canonical_dir = data_dir / "canonical"
+    synthetic_dir = data_dir / "synthetic"
+    canonical_dir.mkdir(parents=True, exist_ok=True)
+    synthetic_dir.mkdir(parents=True, exist_ok=True)
+
+    write_canonical_ohlcv(
+        [canonical],
+        path=canonical_dir / "ohlcv.parquet",
+        calendars=truth["calendar"].to_dict(),
+    )
+    truth.to_parquet(synthetic_dir / "truth.parquet")
+    return write_registry(registry, synthetic_dir / "assets.yaml")
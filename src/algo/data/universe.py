@@ -2,17 +2,23 @@ import duckdb
 import pandas as pd
 
 from algo.data.cleaning import eligibility_path
+from algo.data.snapshots import snapshot_eligibility_path
 from algo.symbols.registry import get_registry
 
 
 def get_clean_universe(
-    kinds: set[str] | None = None, min_coverage: float = 0.98, max_extreme: int = 0
+    kinds: set[str] | None = None,
+    min_coverage: float = 0.98,
+    max_extreme: int = 0,
+    *,
+    version: str | None = None,
 ) -> list[str]:
     """
     Filtrerer universe via DuckDB SQL ved at joine Python Registry med Parquet-data.
+    version: eligibility fra et cleaned snapshot (algo.data.snapshots) i stedet for filen.
     """
     reg = get_registry()
-    path = str(eligibility_path())
+    path = str(snapshot_eligibility_path(version) if version is not None else eligibility_path())
 
     # 1. Konverter registry til en Pandas DataFrame i stedet for bare en liste
     meta_list = [{"asset": a.key, "kind": a.kind} for a in reg.assets]
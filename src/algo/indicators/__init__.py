@@ -0,0 +1,17 @@
+from . import rolling
+from .cache import (
+    IndicatorCache,
+    get_indicator_cache,
+    indicator,
+    list_indicators,
+    register_indicator,
+)
+
+__all__ = [
+    "IndicatorCache",
+    "get_indicator_cache",
+    "indicator",
+    "list_indicators",
+    "register_indicator",
+    "rolling",
+]
@@ -0,0 +1,250 @@
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from algo.config import settings
+from algo.data.fingerprint import hash_payload
+from algo.indicators import rolling
+
+IndicatorFn = Callable[..., pd.DataFrame]
+
+# name -> function(prices, **params) returning a DataFrame aligned to prices
+_INDICATORS: dict[str, IndicatorFn] = {
+    "sma": rolling.sma,
+    "ema": rolling.ema,
+    "rolling_max": rolling.rolling_max,
+    "rolling_min": rolling.rolling_min,
+    "drawdown": rolling.rolling_drawdown,
+    "zscore": rolling.rolling_zscore,
+    "volatility": rolling.rolling_volatility,
+    "windowed_return": rolling.windowed_return,
+}
+
+# Panels without a dataset version (ad hoc frames) are keyed on their content instead
+ADHOC_VERSION = "adhoc"
+
+
+def register_indicator(name: str, fn: IndicatorFn) -> None:
+    """
+    Make an indicator available to IndicatorCache.get() under `name`.
+    """
+    _INDICATORS[name] = fn
+
+
+def list_indicators() -> list[str]:
+    return sorted(_INDICATORS)
+
+
+_SAMPLE_ROWS = 64  # rows hashed in full by _values_digest, evenly spaced
+
+
+def _values_digest(prices: pd.DataFrame) -> str:
+    """
+    Cheap content digest: per-column sums (NaN skipped) and counts plus a sample
+    of whole rows. Any derived panel (scaled, filled, shifted) changes it.
+    """
+    values = prices.to_numpy(dtype=float)
+    h = hashlib.sha256()
+    h.update(np.nansum(values, axis=0).tobytes())
+    h.update(np.isnan(values).sum(axis=0).tobytes())
+    rows = (
+        np.unique(np.linspace(0, len(values) - 1, _SAMPLE_ROWS).astype(int)) if len(values) else []
+    )
+    h.update(np.ascontiguousarray(values[rows]).tobytes())
+    return h.hexdigest()
+
+
+def _panel_id(prices: pd.DataFrame, version: str) -> str:
+    """
+    Identity of the panel an indicator is computed on.
+
+    For versioned panels (loaded via load_cleaned_field) the slice shape plus a
+    cheap digest of the values: attrs survive arithmetic and ffill, so a panel
+    derived from a loaded one carries the same version and field.
+    Ad hoc panels are hashed on their full content.
+    """
+    if version != ADHOC_VERSION:
+        first = str(prices.index[0]) if len(prices) else None
+        last = str(prices.index[-1]) if len(prices) else None
+        return hash_payload(
+            [list(map(str, prices.columns)), first, last, len(prices), _values_digest(prices)]
+        )
+
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(prices, index=True).to_numpy().tobytes())
+    h.update(repr(list(prices.columns)).encode("utf-8"))
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Memoized indicators keyed by (dataset version, field, indicator, params, panel).
+
+    - in-memory LRU, bounded by max_bytes
+    - optional on-disk parquet tier under disk_dir/<version>/ (versioned panels only)
+    - when a panel with a new dataset version shows up, entries for older versions
+      are dropped from both tiers
+
+    Returned frames are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int | None = None,
+        disk_dir: Path | None = None,
+        disk_max_bytes: int | None = None,
+    ) -> None:
+        self.max_bytes = settings.indicator_cache_max_bytes if max_bytes is None else max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = (
+            settings.indicator_cache_disk_max_bytes if disk_max_bytes is None else disk_max_bytes
+        )
+
+        self._mem: OrderedDict[str, tuple[str, int, pd.DataFrame]] = OrderedDict()
+        self._bytes = 0
+        self._version: str | None = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- public ----------
+
+    def get(self, prices: pd.DataFrame, indicator: str, **params: Any) -> pd.DataFrame:
+        """
+        Return `indicator` computed on `prices` with `params`, computing it at most once.
+        Dataset version and field are read from prices.attrs (set by the loaders).
+        """
+        if indicator not in _INDICATORS:
+            raise KeyError(f"Unknown indicator '{indicator}'. Available: {list_indicators()}")
+
+        version = prices.attrs.get("dataset_version", ADHOC_VERSION)
+        field = prices.attrs.get("field")
+        key = hash_payload([version, field, indicator, params, _panel_id(prices, version)])[:32]
+
+        with self._lock:
+            if version != ADHOC_VERSION and version != self._version:
+                self._invalidate_except(version)
+
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+
+        out = self._read_disk(version, key)
+        if out is None:
+            out = _INDICATORS[indicator](prices, **params)
+            self._write_disk(version, key, out)
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        with self._lock:
+            self._put(key, version, out)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    # ---------- memory tier ----------
+
+    def _put(self, key: str, version: str, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(index=True).sum())
+        if size > self.max_bytes:
+            return
+        if key in self._mem:
+            self._bytes -= self._mem.pop(key)[1]
+
+        self._mem[key] = (version, size, df)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes and self._mem:
+            _, (_, old_size, _) = self._mem.popitem(last=False)
+            self._bytes -= old_size
+
+    def _invalidate_except(self, version: str) -> None:
+        """
+        Drop everything that belongs to another dataset version.
+        """
+        stale = [k for k, (v, _, _) in self._mem.items() if v not in (version, ADHOC_VERSION)]
+        for k in stale:
+            self._bytes -= self._mem.pop(k)[1]
+
+        if self.disk_dir is not None and self.disk_dir.exists():
+            for child in self.disk_dir.iterdir():
+                if child.is_dir() and child.name != version:
+                    shutil.rmtree(child, ignore_errors=True)
+
+        self._version = version
+
+    # ---------- disk tier ----------
+
+    def _disk_path(self, version: str, key: str) -> Path | None:
+        if self.disk_dir is None or version == ADHOC_VERSION:
+            return None
+        return self.disk_dir / version / f"{key}.parquet"
+
+    def _read_disk(self, version: str, key: str) -> pd.DataFrame | None:
+        path = self._disk_path(version, key)
+        if path is None or not path.exists():
+            return None
+        path.touch()  # LRU on mtime
+        return pd.read_parquet(path)
+
+    def _write_disk(self, version: str, key: str, df: pd.DataFrame) -> None:
+        path = self._disk_path(version, key)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path)
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        assert self.disk_dir is not None
+        files = sorted(self.disk_dir.glob("*/*.parquet"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        while files and total > self.disk_max_bytes:
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+
+
+_CACHE: IndicatorCache | None = None
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """
+    Process-wide shared cache (disk tier enabled when settings.indicator_cache_dir is set).
+    """
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = IndicatorCache(disk_dir=settings.indicator_cache_dir)
+    return _CACHE
+
+
+def indicator(
+    prices: pd.DataFrame,
+    name: str,
+    *,
+    cache: IndicatorCache | None = None,
+    **params: Any,
+) -> pd.DataFrame:
+    """
+    Shortcut for (cache or get_indicator_cache()).get(prices, name, **params).
+    """
+    return (cache or get_indicator_cache()).get(prices, name, **params)
@@ -0,0 +1,314 @@
+"""
+Panel-wide rolling indicators on NumPy arrays (date × asset).
+
+Every kernel runs in O(dates × assets) regardless of window length and follows the
+NaN rules of the pandas equivalents:
+- NaN (and ±inf, like pandas) are skipped inside a window
+- a window yields NaN when it has fewer than `min_periods` observations
+  (default: the full window, as in DataFrame.rolling)
+
+Kernels accept a 2-D ndarray or a DataFrame; DataFrames come back as DataFrames
+with the same index/columns.
+"""
+
+import functools
+from collections.abc import Callable
+from typing import Concatenate
+
+import numpy as np
+import pandas as pd
+
+type Panel = np.ndarray | pd.DataFrame
+
+
+def _panel[**P](
+    fn: Callable[Concatenate[np.ndarray, P], np.ndarray],
+) -> Callable[Concatenate[Panel, P], Panel]:
+    """
+    Let a kernel written for 2-D float arrays take a DataFrame (or 1-D array) too.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(values: Panel, *args: P.args, **kwargs: P.kwargs) -> Panel:
+        if isinstance(values, pd.DataFrame):
+            out = fn(values.to_numpy(dtype=float), *args, **kwargs)
+            return pd.DataFrame(out, index=values.index, columns=values.columns)
+
+        arr = np.asarray(values, dtype=float)
+        if arr.ndim == 1:
+            return fn(arr[:, None], *args, **kwargs)[:, 0]
+        return fn(arr, *args, **kwargs)
+
+    return wrapper
+
+
+def _check_window(window: int, min_periods: int | None) -> int:
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    minp = window if min_periods is None else min_periods
+    if not 0 <= minp <= window:
+        raise ValueError("min_periods must be between 0 and window")
+    return max(minp, 1)
+
+
+def _finite(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(values with non-finite -> NaN, mask of valid observations)"""
+    valid = np.isfinite(x)
+    if valid.all():
+        return x, valid
+    return np.where(valid, x, np.nan), valid
+
+
+def _window_diff(cs: np.ndarray, window: int) -> np.ndarray:
+    """
+    Given a cumulative sum with a leading zero row (n+1 rows), return the
+    trailing-window sums for rows 0..n-1 (partial windows at the start).
+    """
+    n = cs.shape[0] - 1
+    lo = np.maximum(np.arange(1, n + 1) - window, 0)
+    return cs[1:] - cs[lo]
+
+
+def _window_count(valid: np.ndarray, window: int) -> np.ndarray:
+    """Number of valid observations in each trailing window."""
+    if valid.all():
+        n = valid.shape[0]
+        return np.broadcast_to(np.minimum(np.arange(1, n + 1), window)[:, None], valid.shape)
+    zero = np.zeros((1, valid.shape[1]))
+    return _window_diff(np.concatenate([zero, np.cumsum(valid, axis=0, dtype=float)]), window)
+
+
+def _rolling_sum_count(x: np.ndarray, valid: np.ndarray, window: int):
+    """
+    Windowed sums of x (NaN treated as 0) and observation counts.
+    Values are shifted by a per-column offset before the cumsum to limit
+    floating-point drift on long histories; the offset is added back by callers.
+    """
+    offset = np.nan_to_num(np.nanmean(x, axis=0)) if valid.any() else np.zeros(x.shape[1])
+    centered = x - offset
+    if not valid.all():
+        centered[~valid] = 0.0
+
+    zero = np.zeros((1, x.shape[1]))
+    cs = np.concatenate([zero, np.cumsum(centered, axis=0)])
+    return _window_diff(cs, window), _window_count(valid, window), offset, centered
+
+
+def _flat_windows(x: np.ndarray, valid: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    True where every observation in the trailing window equals the previous
+    observation (i.e. the window is flat). pandas returns exact values there
+    (the value itself for means, 0 for std), and so do we.
+    Also returns the forward-filled values (the last observation per row).
+    """
+    prev = x if valid.all() else pd.DataFrame(x).ffill().to_numpy()
+    changed = np.zeros(x.shape)
+    changed[1:] = valid[1:] & (x[1:] != prev[:-1]) & ~np.isnan(prev[:-1])
+
+    zero = np.zeros((1, x.shape[1]))
+    cs = np.concatenate([zero, np.cumsum(changed, axis=0)])
+    # changes strictly after the first row of the window
+    n_changes = _window_diff(cs, window - 1) if window > 1 else np.zeros(x.shape)
+    return n_changes == 0, prev
+
+
+def _van_herk_max(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Running max over trailing windows with the van Herk/Gil-Werman block trick:
+    per-block prefix and suffix maxima, two passes, O(n) independent of window.
+    x must not contain NaN (callers map missing values to -inf).
+    """
+    n, m = x.shape
+    if window == 1 or n == 0:
+        return x.copy()
+
+    n_blocks = -(-n // window)
+    padded = np.full((n_blocks * window, m), -np.inf)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, window, m)
+
+    prefix = np.maximum.accumulate(blocks, axis=1).reshape(-1, m)[:n]
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, m)[:n]
+
+    out = prefix.copy()
+    out[window - 1 :] = np.maximum(suffix[: n - window + 1], prefix[window - 1 :])
+    return out
+
+
+# ==========================
+# Kernels
+# ==========================
+
+
+@_panel
+def windowed_return(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """
+    x[t] / x[t - periods] - 1 (same as DataFrame.pct_change(periods)).
+    """
+    if periods < 1:
+        raise ValueError("periods must be >= 1")
+    out = np.full_like(x, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[periods:] = x[periods:] / x[:-periods] - 1
+    return out
+
+
+@_panel
+def rolling_sum(x: np.ndarray, window: int, *, min_periods: int | None = None) -> np.ndarray:
+    minp = _check_window(window, min_periods)
+    x, valid = _finite(x)
+    s, cnt, offset, _ = _rolling_sum_count(x, valid, window)
+    return np.where(cnt >= minp, s + offset * cnt, np.nan)
+
+
+@_panel
+def rolling_max(x: np.ndarray, window: int, *, min_periods: int | None = None) -> np.ndarray:
+    minp = _check_window(window, min_periods)
+    x, valid = _finite(x)
+    cnt = _window_count(valid, window)
+    out = _van_herk_max(np.where(valid, x, -np.inf), window)
+    return np.where(cnt >= minp, out, np.nan)
+
+
+@_panel
+def rolling_min(x: np.ndarray, window: int, *, min_periods: int | None = None) -> np.ndarray:
+    return -rolling_max(-x, window, min_periods=min_periods)
+
+
+@_panel
+def sma(x: np.ndarray, window: int, *, min_periods: int | None = None) -> np.ndarray:
+    """
+    Simple moving average (DataFrame.rolling(window).mean()).
+
+    Like pandas, a window whose observations are all equal returns that value
+    exactly, so comparisons such as price > sma behave on flat stretches.
+    """
+    minp = _check_window(window, min_periods)
+    x, valid = _finite(x)
+    s, cnt, offset, _ = _rolling_sum_count(x, valid, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s / cnt + offset
+
+    flat, last = _flat_windows(x, valid, window)
+    mean = np.where(flat, last, mean)
+    return np.where(cnt >= minp, mean, np.nan)
+
+
+@_panel
+def rolling_std(
+    x: np.ndarray,
+    window: int,
+    *,
+    min_periods: int | None = None,
+    ddof: int = 1,
+) -> np.ndarray:
+    """
+    Rolling standard deviation (DataFrame.rolling(window).std(ddof)).
+    Flat windows return exactly 0, as in pandas.
+    """
+    minp = _check_window(window, min_periods)
+    x, valid = _finite(x)
+    s, cnt, _, centered = _rolling_sum_count(x, valid, window)
+
+    zero = np.zeros((1, x.shape[1]))
+    ss = _window_diff(np.concatenate([zero, np.cumsum(centered * centered, axis=0)]), window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = (ss - s * s / cnt) / (cnt - ddof)
+    var = np.maximum(var, 0.0)
+    var = np.where(_flat_windows(x, valid, window)[0], 0.0, var)
+
+    return np.where((cnt >= minp) & (cnt > ddof), np.sqrt(var), np.nan)
+
+
+@_panel
+def rolling_zscore(x: np.ndarray, window: int, *, min_periods: int | None = None) -> np.ndarray:
+    """
+    (x - rolling mean) / rolling std over the trailing window (including today).
+    """
+    mean = sma(x, window, min_periods=min_periods)
+    std = rolling_std(x, window, min_periods=min_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (x - mean) / std
+
+
+@_panel
+def rolling_volatility(
+    x: np.ndarray,
+    window: int,
+    *,
+    min_periods: int | None = None,
+    trading_days: int = 252,
+) -> np.ndarray:
+    """
+    Annualized rolling volatility of daily simple returns of a price panel.
+    """
+    rets = windowed_return(x, 1)
+    return rolling_std(rets, window, min_periods=min_periods) * np.sqrt(trading_days)
+
+
+@_panel
+def rolling_drawdown(x: np.ndarray, window: int, *, min_periods: int | None = None) -> np.ndarray:
+    """
+    x / (trailing-window max) - 1, i.e. distance below the recent high (<= 0).
+    """
+    peak = rolling_max(x, window, min_periods=min_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x / peak - 1
+
+
+@_panel
+def ema(
+    x: np.ndarray,
+    span: float | None = None,
+    *,
+    alpha: float | None = None,
+    adjust: bool = True,
+    min_periods: int = 0,
+) -> np.ndarray:
+    """
+    Exponential moving average, identical to DataFrame.ewm(span|alpha, adjust).mean()
+    (ignore_na=False). The recursion is run date by date for all assets at once.
+    """
+    if (span is None) == (alpha is None):
+        raise ValueError("Pass exactly one of span or alpha")
+    if alpha is None:
+        assert span is not None
+        com = (span - 1) / 2.0
+        alpha = 1.0 / (1.0 + com)
+
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    minp = max(min_periods, 1)
+
+    x, valid = _finite(x)
+    n, m = x.shape
+    out = np.full((n, m), np.nan)
+    if n == 0:
+        return out
+
+    weighted = x[0].copy()
+    old_wt = np.ones(m)
+    nobs = valid[0].astype(int)
+    out[0] = np.where(nobs >= minp, weighted, np.nan)
+
+    for i in range(1, n):
+        cur = x[i]
+        obs = valid[i]
+        nobs += obs
+
+        has_w = ~np.isnan(weighted)
+        old_wt = np.where(has_w, old_wt * old_wt_factor, old_wt)
+
+        mix = has_w & obs
+        blend = mix & (weighted != cur)
+        with np.errstate(invalid="ignore"):
+            mixed = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+        weighted = np.where(blend, mixed, weighted)
+        old_wt = np.where(mix, old_wt + new_wt if adjust else 1.0, old_wt)
+
+        weighted = np.where(~has_w & obs, cur, weighted)
+        out[i] = np.where(nobs >= minp, weighted, np.nan)
+
+    return out
@@ -0,0 +1,222 @@
+"""
+Opt-in timing/counter instrumentation (ALGO_PROFILE=1 / settings.profile).
+
+- @profiled on hot functions, span("name") around stages inside a function
+- count("name", n) for counters (rows fetched, cache misses, ...)
+- spans nest: they are aggregated per path ("data.prices.export_canonical_ohlcv/
+  data.prices.read_cache"), with calls, total/max seconds and the growth of the
+  process' peak RSS while the span ran
+- the profile of a run is written to artifacts/profiles/<timestamp>_<run>.json
+  at exit (or explicitly with write_profile())
+
+The setting is read once at import (enable() switches at runtime). When
+profiling is off, @profiled costs one global check per call and span() returns
+a shared no-op context manager. Spans in worker processes (process
+pools) are not collected.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from algo.config import settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+_NOOP = nullcontext()
+
+
+@dataclass
+class SpanStats:
+    calls: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    rss_growth_mb: float = 0.0
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.spans: dict[str, SpanStats] = {}
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> list[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        stack = self._stack()
+        stack.append(name)
+        path = "/".join(stack)
+        rss0 = peak_rss_mb()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            growth = peak_rss_mb() - rss0 if rss0 is not None else 0.0
+            stack.pop()
+            with self._lock:
+                s = self.spans.setdefault(path, SpanStats())
+                s.calls += 1
+                s.total_s += dt
+                s.max_s = max(s.max_s, dt)
+                s.rss_growth_mb = max(s.rss_growth_mb, growth or 0.0)
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self, run: str) -> dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans.items(), key=lambda kv: kv[1].total_s, reverse=True)
+            return {
+                "run": run,
+                "argv": sys.argv,
+                "pid": os.getpid(),
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "wall_s": time.time() - self.started,
+                "peak_rss_mb": peak_rss_mb(),
+                "spans": [
+                    {
+                        "path": path,
+                        "name": path.rsplit("/", 1)[-1],
+                        "depth": path.count("/"),
+                        "calls": s.calls,
+                        "total_s": s.total_s,
+                        "mean_s": s.total_s / s.calls,
+                        "max_s": s.max_s,
+                        "rss_growth_mb": s.rss_growth_mb,
+                    }
+                    for path, s in spans
+                ],
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+
+_ENABLED: bool = settings.profile
+_PROFILER: Profiler | None = None
+_PROFILER_LOCK = threading.Lock()
+
+
+def peak_rss_mb() -> float | None:
+    """
+    Peak resident memory of this process so far (None where unsupported).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def enable(on: bool = True) -> None:
+    """
+    Switch profiling on/off for the rest of the process.
+    """
+    global _ENABLED
+    _ENABLED = on
+
+
+def get_profiler() -> Profiler | None:
+    """
+    The process-wide profiler, or None when profiling is off. Created on first
+    use, with the profile written at interpreter exit.
+    """
+    global _PROFILER
+    if not _ENABLED:
+        return None
+    if _PROFILER is None:
+        with _PROFILER_LOCK:
+            if _PROFILER is None:
+                _PROFILER = Profiler()
+                atexit.register(_write_at_exit)
+    return _PROFILER
+
+
+# ==========================
+# Instrumentation API
+# ==========================
+
+
+def span(name: str):
+    """
+    Context manager timing a block (no-op when profiling is off).
+    """
+    if not _ENABLED:
+        return _NOOP
+    return get_profiler().span(name)  # type: ignore[union-attr]
+
+
+def count(name: str, n: float = 1) -> None:
+    prof = get_profiler()
+    if prof is not None:
+        prof.count(name, n)
+
+
+def profiled[**P, R](fn: Callable[P, R]) -> Callable[P, R]:
+    """
+    Decorator: time every call of fn as a span named <module>.<qualname>
+    (without the leading "algo.").
+    """
+    name = f"{fn.__module__.removeprefix('algo.')}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        if not _ENABLED:
+            return fn(*args, **kwargs)
+        with span(name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+# ==========================
+# Output
+# ==========================
+
+
+def profiles_dir() -> Path:
+    base = settings.artifacts_dir / "profiles"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def write_profile(run: str | None = None, *, path: Path | None = None) -> Path | None:
+    """
+    Write the current profile as JSON; run defaults to the script name.
+    Returns None when profiling is off or nothing was recorded.
+    """
+    prof = _PROFILER
+    if prof is None or not (prof.spans or prof.counters):
+        return None
+
+    run = run or Path(sys.argv[0]).stem.lstrip("-") or "python"
+    ts = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    path = path or profiles_dir() / f"{ts}_{run}.json"
+    path.write_text(json.dumps(prof.to_dict(run), indent=2), encoding="utf-8")
+    return path
+
+
+def _write_at_exit() -> None:
+    path = write_profile()
+    if path is not None:
+        print(f"Profile written to {path}", file=sys.stderr)
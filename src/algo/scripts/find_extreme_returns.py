@@ -8,7 +8,7 @@
 
 import pandas as pd
 
-from algo.data.prices import load_canonical_field
+from algo.data.returns import load_returns
 from algo.symbols.registry import list_asset_keys
 
 # ============================
@@ -38,101 +38,65 @@ CLEAN_START_SEARCH_FROM = "1990-01-01"
 # ============================
 
 
-def find_extreme_returns(prices: pd.Series, *, lower: float, upper: float) -> pd.Series:
-    r = prices.pct_change()
-    return r[(r < lower) | (r > upper)].dropna()
-
-
-def suggest_clean_start(
-    extreme_dates: pd.DatetimeIndex, *, search_from: str
-) -> pd.Timestamp | None:
+def find_extreme_returns(rets: pd.DataFrame, *, lower: float, upper: float) -> pd.DataFrame:
     """
-    Suggest the first date after which there are no extreme dates.
-    If there are no extremes, returns None.
+    All extreme returns across the panel as one long frame: (date, asset, ret).
     """
-    if len(extreme_dates) == 0:
-        return None
+    long = rets.stack().dropna().rename("ret")  # stack keeps NaN in pandas 3
+    long.index.names = ["date", "asset"]
+    return long[(long < lower) | (long > upper)].reset_index()
 
-    cutoff = pd.to_datetime(search_from)
-    extreme_dates = extreme_dates[extreme_dates >= cutoff]
-    if len(extreme_dates) == 0:
-        return None
 
-    # If you start after the last extreme, you're "clean"
-    return extreme_dates.max() + pd.Timedelta(days=1)
+def summarize_extremes(events: pd.DataFrame, assets: list[str]) -> pd.DataFrame:
+    """
+    One row per asset (assets without events included) from find_extreme_returns().
+    """
+    g = events.groupby("asset")
+    worst = events.loc[g["ret"].idxmin(), ["asset", "ret", "date"]].set_index("asset")
+    best = events.loc[g["ret"].idxmax(), ["asset", "ret", "date"]].set_index("asset")
+
+    summary = pd.DataFrame(
+        {
+            "extreme_days": g.size(),
+            "worst_ret": worst["ret"],
+            "worst_date": worst["date"],
+            "best_ret": best["ret"],
+            "best_date": best["date"],
+            "first_extreme": g["date"].min(),
+            "last_extreme": g["date"].max(),
+        }
+    ).reindex(assets)
+    summary["extreme_days"] = summary["extreme_days"].fillna(0).astype(int)
+    return summary.rename_axis("asset").reset_index()
 
 
 def main() -> None:
-    px = load_canonical_field(FIELD).sort_index()
-
-    if START is not None:
-        px = px.loc[pd.to_datetime(START) :]
-    if END is not None:
-        px = px.loc[: pd.to_datetime(END)]
-
     assets = ASSETS if ASSETS is not None else list_asset_keys()
 
-    summary_rows: list[dict] = []
-
-    per_asset_events: dict[str, pd.Series] = {}
-
-    for asset in assets:
-        if asset not in px.columns:
-            continue
-
-        s = px[asset].dropna().sort_index()
-        if s.empty:
-            continue
-
-        ext = find_extreme_returns(s, lower=LOWER, upper=UPPER)
-        per_asset_events[asset] = ext
-
-        if ext.empty:
-            summary_rows.append(
-                {
-                    "asset": asset,
-                    "extreme_days": 0,
-                    "worst_ret": None,
-                    "worst_date": None,
-                    "best_ret": None,
-                    "best_date": None,
-                    "first_extreme": None,
-                    "last_extreme": None,
-                    "suggest_clean_start": None,
-                }
-            )
-            continue
-
-        worst = ext.min()
-        worst_date = ext.idxmin()
-        best = ext.max()
-        best_date = ext.idxmax()
-
-        clean_start = None
-        if SUGGEST_CLEAN_START:
-            clean_start = suggest_clean_start(ext.index, search_from=CLEAN_START_SEARCH_FROM)
-
-        summary_rows.append(
-            {
-                "asset": asset,
-                "extreme_days": int(ext.shape[0]),
-                "worst_ret": float(worst),
-                "worst_date": worst_date.date().isoformat(),
-                "best_ret": float(best),
-                "best_date": best_date.date().isoformat(),
-                "first_extreme": ext.index.min().date().isoformat(),
-                "last_extreme": ext.index.max().date().isoformat(),
-                "suggest_clean_start": clean_start.date().isoformat()
-                if clean_start is not None
-                else None,
-            }
-        )
-
-    if not summary_rows:
+    # Returns from each asset's previous observation (NaN gaps bridged), shared
+    # with the rest of the pipeline; filtering happens in the parquet reader.
+    # Returns measured from a price before START are dropped
+    rets = load_returns(FIELD, dataset="canonical", start=START, end=END, bridge_start=False)
+    assets = [a for a in assets if a in rets.columns and rets[a].notna().any()]
+    if not assets:
         print("No assets found / no data.")
         return
 
-    summary = pd.DataFrame(summary_rows)
+    events = find_extreme_returns(rets[assets], lower=LOWER, upper=UPPER)
+    summary = summarize_extremes(events, assets)
+
+    if SUGGEST_CLEAN_START:
+        # Start the day after the last extreme (ignoring those before the cutoff)
+        cutoff = pd.to_datetime(CLEAN_START_SEARCH_FROM)
+        last_after_cutoff = events[events["date"] >= cutoff].groupby("asset")["date"].max()
+        summary["suggest_clean_start"] = summary["asset"].map(
+            last_after_cutoff + pd.Timedelta(days=1)
+        )
+    else:
+        summary["suggest_clean_start"] = None
+
+    for col in ["worst_date", "best_date", "first_extreme", "last_extreme", "suggest_clean_start"]:
+        summary[col] = pd.to_datetime(summary[col]).dt.strftime("%Y-%m-%d")
 
     # Sort: most extreme days first, then worst return
     summary = summary.sort_values(
@@ -146,15 +110,17 @@ def main() -> None:
     print(summary.to_string(index=False))
 
     if SHOW_TOP_EVENTS:
-        for asset, ext in per_asset_events.items():
-            if ext.empty:
+        by_asset = events.set_index("date").groupby("asset", sort=False)["ret"]
+        for asset in summary["asset"]:
+            if asset not in by_asset.groups:
                 continue
+            ext = by_asset.get_group(asset)
 
             print(f"\n=== {asset}: worst {TOP_N_WORST} ===")
-            print(ext.sort_values().head(TOP_N_WORST).to_string())
+            print(ext.nsmallest(TOP_N_WORST).to_string())
 
             print(f"\n=== {asset}: best {TOP_N_BEST} ===")
-            print(ext.sort_values(ascending=False).head(TOP_N_BEST).to_string())
+            print(ext.nlargest(TOP_N_BEST).to_string())
 
 
 if __name__ == "__main__":
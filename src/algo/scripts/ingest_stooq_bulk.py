@@ -0,0 +1,37 @@
+# Fyld stooq raw caches fra en lokal stooq bulk-database (fx d_us_txt.zip fra
+# stooq.com/db/h/) i stedet for én HTTP-request pr. symbol.
+#
+# Run:
+#   uv run python src/algo/scripts/ingest_stooq_bulk.py ~/Downloads/d_us_txt.zip
+#   uv run python src/algo/scripts/ingest_stooq_bulk.py d_us_txt.zip --assets spy qqq
+#
+# Bagefter bygges canonical/cleaned uden netværk:
+#   uv run python src/algo/scripts/rebuild_data.py --stage canonical --stage cleaned
+
+import argparse
+import time
+from pathlib import Path
+
+from algo.data.stooq_bulk import ingest_stooq_bulk
+from algo.symbols.registry import has_identifier, list_asset_keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill stooq raw caches from a bulk archive.")
+    parser.add_argument("archive", type=Path, help="Bulk zip (or its unpacked directory)")
+    parser.add_argument("--assets", nargs="+", help="Only these asset keys")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    written = ingest_stooq_bulk(args.archive, asset_keys=args.assets)
+
+    wanted = args.assets or [k for k in list_asset_keys() if has_identifier(k, "stooq")]
+    missing = [k for k in wanted if k not in written]
+    print(f"{len(written)} assets written, {sum(written.values())} rows")
+    if missing:
+        print(f"Not in archive ({len(missing)}): {', '.join(missing)}")
+    print(f"Done in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Synthetic data for scale testing (offline): canonical OHLCV + matching registry.
+#
+# Run:
+#   uv run python src/algo/scripts/make_synthetic.py --assets 10000 --years 20 --out data_synthetic
+#
+# Brug bagefter datasættet ved at pege settings på det:
+#   ALGO_DATA_DIR=data_synthetic ALGO_REGISTRY_PATH=data_synthetic/synthetic/assets.yaml \
+#     uv run python src/algo/scripts/run_batch.py batch.yaml
+#
+# --clean bygger også cleaned-datasættet (build_cleaned_ohlcv) med det samme.
+
+import argparse
+import time
+from pathlib import Path
+
+from algo.config import settings
+from algo.data.synthetic import MIXED_KIND_MIX, SyntheticSpec, write_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic canonical dataset.")
+    parser.add_argument("--assets", type=int, default=1000, help="Number of assets")
+    parser.add_argument("--years", type=int, default=20, help="Years of history")
+    parser.add_argument("--start", default="2000-01-03", help="First date")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=settings.project_root / "data_synthetic",
+        help="Data directory to write (used as ALGO_DATA_DIR)",
+    )
+    parser.add_argument(
+        "--mixed-calendars",
+        action="store_true",
+        help="Also generate FX (weekdays) and crypto (7/7) assets",
+    )
+    parser.add_argument("--clean", action="store_true", help="Also build the cleaned dataset")
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(n_assets=args.assets, years=args.years, start=args.start, seed=args.seed)
+    if args.mixed_calendars:
+        spec.kind_mix = MIXED_KIND_MIX
+
+    t0 = time.perf_counter()
+    registry_path = write_synthetic_dataset(spec, args.out)
+    print(f"Wrote {args.assets} assets x {args.years} years in {time.perf_counter() - t0:.1f}s")
+
+    if args.clean:
+        # samme proces: peg settings på det syntetiske datasæt
+        from algo.data.cleaning import build_cleaned_ohlcv
+
+        settings.data_dir = args.out
+        settings.registry_path = registry_path
+
+        t0 = time.perf_counter()
+        _, eligibility = build_cleaned_ohlcv()
+        print(f"Cleaned: {len(eligibility)} assets survived ({time.perf_counter() - t0:.1f}s)")
+
+    print(f"ALGO_DATA_DIR={args.out.resolve()} ALGO_REGISTRY_PATH={registry_path.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
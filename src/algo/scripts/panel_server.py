@@ -0,0 +1,45 @@
+# Lokal panel-server: holder cleaned/canonical i hukommelsen én gang og
+# serverer udsnit over en Unix socket (Arrow IPC) til alle research-processer.
+#
+# Run:
+#   uv run python src/algo/scripts/panel_server.py                      # data/panel.sock
+#   uv run python src/algo/scripts/panel_server.py --socket /tmp/algo-panel.sock
+#
+# Klienter: sæt ALGO_PANEL_SOCKET til samme sti, så bruger load_cleaned_field()
+# serveren automatisk (og læser selv parquet-filen, hvis serveren ikke kører).
+# Serveren genindlæser selv, når rebuild_data.py skriver en ny version.
+
+import argparse
+from pathlib import Path
+
+from algo.data.panel_server import PanelServer, default_socket_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve price panels over a Unix socket.")
+    parser.add_argument("--socket", type=Path, default=None, help="Socket path")
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between checks for a new dataset version",
+    )
+    parser.add_argument(
+        "--no-preload", action="store_true", help="Load panels on first request instead"
+    )
+    args = parser.parse_args()
+
+    server = PanelServer(args.socket or default_socket_path(), reload_interval=args.reload_interval)
+    if not args.no_preload:
+        server.preload()
+    print(f"Serving panels on {server.socket_path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 import argparse
+import shutil
+import time
+from typing import get_args
 
 from algo.config import settings
-from algo.data.cleaning import build_cleaned_ohlcv
-from algo.data.prices import export_canonical_ohlcv, update_all_prices
+from algo.data.intraday import Interval, export_intraday, update_all_intraday
+from algo.data.pipeline import STAGES, run_pipeline
+from algo.data.snapshots import ensure_snapshot
+from algo.data.streaming import stream_build_datasets
 
 
 def main() -> None:
@@ -12,6 +17,32 @@ def main() -> None:
         action="store_true",
         help="Delete all data (raw, canonical and cleaned) and get it from scratch",
     )
+    parser.add_argument(
+        "--stage",
+        action="append",
+        choices=STAGES,
+        help="Only run this stage (repeatable). Default: fetch, canonical, cleaned",
+    )
+    parser.add_argument(
+        "--assets",
+        nargs="+",
+        help="Only fetch these asset keys (canonical/cleaned still cover the registry)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Run the selected stages even if their inputs are unchanged",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Fetch, canonicalize and clean per asset in one streaming pass (no manifest skips)",
+    )
+    parser.add_argument(
+        "--intraday",
+        choices=get_args(Interval),
+        help="Fetch and export intraday bars of this interval instead of the daily pipeline",
+    )
     args = parser.parse_args()
 
     raw_dir = settings.data_dir / "raw_prices"
@@ -22,12 +53,8 @@ def main() -> None:
     if args.force:
         # Remove raw cache if it exists
         if raw_dir.exists():
-            for child in raw_dir.glob("*"):
-                if child.is_dir():
-                    for sub in child.glob("*"):
-                        sub.unlink(missing_ok=True)
-                    child.rmdir()
-            raw_dir.rmdir()
+            print(f"Removing raw cache: {raw_dir}")
+            shutil.rmtree(raw_dir)
 
         if canonical_file.exists():
             print(f"Removing canonical file: {canonical_file}")
@@ -39,21 +66,34 @@ def main() -> None:
             print(f"Removing cleaned_eligibility file: {cleaned_eligibility_file}")
             cleaned_eligibility_file.unlink()
 
-    print("Updating all prices...")
-    used = update_all_prices()
-
-    print("Providers used:")
-    for k, v in used.items():
-        print(f"  {k}: {v}")
+    if args.intraday:
+        t0 = time.perf_counter()
+        used = update_all_intraday(args.intraday, asset_keys=args.assets)
+        export_intraday(args.intraday, asset_keys=args.assets)
+        print(
+            f"{len(used)} assets with {args.intraday} bars. Done in {time.perf_counter() - t0:.2f}s"
+        )
+        return
 
-    print("Exporting canonical OHLCV...")
-    path = export_canonical_ohlcv()
+    if args.streaming:
+        t0 = time.perf_counter()
+        stream_build_datasets(args.assets)
+        print(f"Done in {time.perf_counter() - t0:.2f}s")
+    else:
+        results = run_pipeline(args.stage, assets=args.assets, rebuild=args.force or args.rebuild)
 
-    print(f"Done. Canonical written to: {path}")
+        total = 0.0
+        for r in results:
+            status = "ran" if r.ran else "skipped"
+            print(f"  {r.stage:10} {status:8} {r.seconds:8.2f}s  ({r.reason})")
+            total += r.seconds
+        print(f"Done in {total:.2f}s")
 
-    print("Building cleaned dataset...")
-    build_cleaned_ohlcv()
-    print("Cleaning complete.")
+    # gem den byggede version, så backtests kan genskabes (load_*(version=...))
+    if settings.snapshot_datasets:
+        for dataset, path in [("canonical", canonical_file), ("cleaned", cleaned_file)]:
+            if path.exists():
+                print(f"  snapshot {dataset:10} {ensure_snapshot(dataset)}")
 
 
 if __name__ == "__main__":
@@ -1,19 +1,20 @@
 import sys
 from pathlib import Path
-import pandas as pd
-import matplotlib.pyplot as plt
 
 from algo.data.universe import get_clean_universe
-from algo.data.cleaning import load_cleaned_field
-from algo.backtest.engine_fast import run_backtest_fast_daily
-from algo.backtest.engine_realistic import run_backtest_realistic
+from algo.data.cleaning import cleaned_dataset_version, load_cleaned_field
+from algo.data.returns import load_returns
+from algo.data.snapshots import current_snapshot
+from algo.backtest.cache import cache_entry_dir, cached_backtest
+from algo.backtest.catalog import find_run_by_cache_key, record_run
+from algo.backtest.montecarlo import Method, monte_carlo_stats, summarize_distribution
 from algo.backtest.runs import make_run_dir
 from algo.backtest.stats import compute_stats
 
 # ============================
 # CONFIG
 # ============================
-STRATEGY = "dip_buyer"  # Prøv at skifte mellem "sma_trend" og "dip_buyer"
+STRATEGY = "dip_buyer"  # "sma_trend", "dip_buyer", "momentum" eller "risk_parity"
 START_DATE = "2013-01-01"
 END_DATE = "2026-01-01"
 BENCHMARK_ASSET = "spy"
@@ -21,25 +22,25 @@ BENCHMARK_ASSET = "spy"
 KINDS = {"equity", "etf"}
 FIELD = "adj_close"
 RUN_NAME = f"{STRATEGY}_test"
+STRATEGY_PARAMS: dict = {}  # f.eks. {"window": 200} for sma_trend
 
+# Realistic Engine (Hele aktier + 5% Drift Tolerance)
+ENGINE_CONFIG = {
+    "initial_capital": 100_000.0,
+    "allow_fractional": False,
+    "drift_tolerance": 0.05,
+}
 
-def build_weights(strategy_name: str, px: pd.DataFrame) -> pd.DataFrame:
-    """
-    Dispatcher: Sender dataen til den rigtige strategi-funktion.
-    Dette forhindrer NameErrors, fordi vi importerer den rigtige strategi direkte her!
-    """
-    if strategy_name == "sma_trend":
-        from algo.strategies.sma_trend import sma_trend_weights_by_day
-        return sma_trend_weights_by_day(px, window=200)
+# Resultat-cache: False = kør altid alt forfra (bypass)
+USE_CACHE = True
 
-    elif strategy_name == "dip_buyer":
-        from algo.strategies.dip_buyer import dip_buyer_weights_by_day
-        return dip_buyer_weights_by_day(
-            px
-        )
+# Monte Carlo robusthed (0 = slået fra)
+MC_PATHS = 10_000
+MC_METHOD: Method = "stationary"  # "stationary", "block" eller "subsample"
+MC_BLOCK_SIZE = 20
 
-    else:
-        raise ValueError(f"Ukendt strategi: '{strategy_name}'")
+# Graf (False = headless, matplotlib bliver aldrig importeret)
+PLOT = True
 
 
 def print_stats(name: str, stats: dict, final_eq: float):
@@ -59,31 +60,36 @@ def main() -> None:
     print("2. Loader og slicer priser...")
     px = load_cleaned_field(FIELD)[assets].sort_index()
     px = px.loc[START_DATE:END_DATE]
+    dataset_version = cleaned_dataset_version()
+    snapshot_id = current_snapshot("cleaned")
+    rets = load_returns(FIELD, assets=assets, start=START_DATE, end=END_DATE)
 
-    print(f"3. Udregner Target Weights for strategi: {STRATEGY}...")
-    # HER BRUGER VI DISPATCHEREN I STEDET FOR DET DIREKTE FUNKTIONSKALD:
-    wmat = build_weights(STRATEGY, px)
-
-    print("4. Kører Fast Engine...")
-    fast_eq = run_backtest_fast_daily(px, wmat)
-
-    print("5. Kører Realistic Engine (Hele aktier + 5% Drift Tolerance)...")
-    real_results = run_backtest_realistic(
+    print(f"3-5. Udregner weights + Fast/Realistic Engine for strategi: {STRATEGY}...")
+    result, cache_key, hit = cached_backtest(
         px,
-        wmat,
-        initial_capital=100_000.0,
-        allow_fractional=False,
-        drift_tolerance=0.05
+        STRATEGY,
+        STRATEGY_PARAMS,
+        dataset_version=dataset_version,
+        field=FIELD,
+        engine_config=ENGINE_CONFIG,
+        use_cache=USE_CACHE,
+        returns=rets,
     )
-    real_eq = real_results["equity"]
+    if hit:
+        print(f"   Cache hit ({cache_key}) - genbruger gemte resultater")
+
+    fast_eq = result.fast_equity
+    real_eq = result.real_equity
+    assert fast_eq is not None and real_eq is not None
 
     print("6. Udregner Benchmark (Buy & Hold)...")
     bench_px = px[BENCHMARK_ASSET].dropna()
-    bench_eq = (1.0 + bench_px.pct_change().dropna()).cumprod()
+    # Afkast fra forrige observation; den første dag i perioden har intet afkast
+    bench_eq = (1.0 + rets[BENCHMARK_ASSET].reindex(bench_px.index[1:])).cumprod()
 
-    # Beregn stats
-    fast_stats = compute_stats(fast_eq)
-    real_stats = compute_stats(real_eq)
+    # Beregn stats (engine-stats kommer fra resultatet/cachen)
+    fast_stats = result.stats["fast"]
+    real_stats = result.stats["real"]
     bench_stats = compute_stats(bench_eq)
 
     print("\n" + "=" * 65)
@@ -97,28 +103,60 @@ def main() -> None:
     print_stats(f"Benchmark ({BENCHMARK_ASSET.upper()})", bench_stats, float(bench_eq.iloc[-1]))
     print("=" * 65)
 
-    print("\n7. Gemmer data og genererer graf...")
-    run_dir = make_run_dir(RUN_NAME)
-    fast_eq.to_frame().to_parquet(run_dir / "fast_equity.parquet")
-    real_eq.to_frame().to_parquet(run_dir / "real_equity.parquet")
-
-    plt.style.use('dark_background')
-    plt.figure(figsize=(12, 6))
-
-    plt.plot(fast_eq, label=f"Fast Engine ({fast_stats.get('CAGR', 0) * 100:.1f}%)", alpha=0.5, linestyle="--")
-    plt.plot(real_eq, label=f"Real Engine ({real_stats.get('CAGR', 0) * 100:.1f}%)", color="cyan", linewidth=2)
-    plt.plot(bench_eq, label=f"SPY Benchmark ({bench_stats.get('CAGR', 0) * 100:.1f}%)", color="gray", alpha=0.7)
+    if MC_PATHS > 0:
+        print(f"\nMonte Carlo ({MC_PATHS} stier, {MC_METHOD}) for Real Engine:")
+        dist = monte_carlo_stats(
+            real_eq, n_paths=MC_PATHS, method=MC_METHOD, block_size=MC_BLOCK_SIZE, seed=0
+        )
+        print(summarize_distribution(dist).to_string(float_format=lambda x: f"{x:8.3f}"))
+
+    print("\n7. Gemmer run i katalog og genererer graf...")
+    run_id = find_run_by_cache_key(cache_key) if hit else None
+    if run_id is None:
+        run_id = record_run(
+            name=RUN_NAME,
+            strategy=STRATEGY,
+            params=STRATEGY_PARAMS,
+            config={
+                "start": START_DATE,
+                "end": END_DATE,
+                "field": FIELD,
+                "kinds": sorted(KINDS),
+                "assets": list(px.columns),
+                "benchmark": BENCHMARK_ASSET,
+                "engine_config": ENGINE_CONFIG,
+            },
+            stats={"fast": fast_stats, "real": real_stats, "benchmark": bench_stats},
+            curves={"fast": fast_eq, "real": real_eq, "benchmark": bench_eq},
+            dataset_version=dataset_version,
+            cache_key=cache_key,
+            snapshot_id=snapshot_id,
+        )
+    print(f"Run id: {run_id}")
 
-    plt.title(f"{STRATEGY.replace('_', ' ').title()} vs Benchmark", fontsize=14)
-    plt.ylabel("Equity Multiple (Log Scale)")
-    plt.yscale("log")
-    plt.grid(True, alpha=0.2)
-    plt.legend()
+    if not PLOT:
+        return
 
-    plot_path = run_dir / "equity_curve.png"
-    plt.savefig(plot_path)
+    if hit:
+        # Samme input -> samme resultat: ingen ny run-mappe, grafen lægges i cache-entry
+        run_dir = cache_entry_dir(cache_key)
+    else:
+        run_dir = make_run_dir(RUN_NAME)
+
+    from algo.backtest.plotting import plot_equity_curves
+
+    plot_path = plot_equity_curves(
+        {"fast": fast_eq, "real": real_eq, "benchmark": bench_eq},
+        title=f"{STRATEGY.replace('_', ' ').title()} vs Benchmark",
+        path=run_dir / "equity_curve.png",
+        labels={
+            "fast": f"Fast Engine ({fast_stats.get('CAGR', 0) * 100:.1f}%)",
+            "real": f"Real Engine ({real_stats.get('CAGR', 0) * 100:.1f}%)",
+            "benchmark": f"SPY Benchmark ({bench_stats.get('CAGR', 0) * 100:.1f}%)",
+        },
+        show=True,
+    )
     print(f"Graf gemt som: {plot_path}")
-    plt.show()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+# Headless batch runner: many backtests from one YAML/JSON file.
+#
+# Run:
+#   uv run python src/algo/scripts/run_batch.py batch.yaml [--workers 4] [--plot] [--no-cache]
+#
+# Example batch.yaml:
+#
+#   name: sweep
+#   field: adj_close
+#   jobs:
+#     - name: sma_200
+#       strategy: sma_trend
+#       params: {window: 200}
+#       universe: {kinds: [equity, etf]}
+#       start: "2013-01-01"
+#       end: "2026-01-01"
+#     - name: momentum_top10
+#       strategy: momentum
+#       params: {top_k: 10}
+#       engines: [fast]
+#       plot: true
+#
+# Results land in the run catalog (artifacts/catalog.duckdb) and in
+# artifacts/batches/<timestamp>_<name>/summary.csv (+ plots for jobs with plot: true).
+# matplotlib is only imported when a plot is actually drawn.
+
+import argparse
+import sys
+from pathlib import Path
+
+from algo.backtest.batch import load_batch_file, run_batch
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run a batch of backtests from a YAML/JSON file.")
+    parser.add_argument("config", type=Path, help="Batch file (.yaml, .yml or .json)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 = inline)")
+    parser.add_argument(
+        "--plot",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Force plots on/off for all jobs (default: per-job 'plot' setting)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the result cache")
+    args = parser.parse_args()
+
+    batch = load_batch_file(args.config)
+    if args.no_cache:
+        batch.use_cache = False
+
+    summary, batch_dir = run_batch(batch, max_workers=args.workers, plot=args.plot)
+
+    failed = summary[summary["error"].notna()] if "error" in summary.columns else summary.iloc[:0]
+    ok = summary.drop(index=failed.index)
+
+    print(f"Batch '{batch.name}': {len(batch.jobs)} jobs, {len(failed)} failed")
+    if not ok.empty:
+        cols = [c for c in ["job", "curve", "CAGR", "Sharpe", "MaxDD", "cache_hit"] if c in ok]
+        print(ok[cols].to_string(index=False))
+    for _, row in failed.iterrows():
+        print(f"\n--- {row['job']} failed ---\n{row['error']}")
+
+    print(f"\nSummary written to: {batch_dir / 'summary.csv'}")
+    return 1 if len(failed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
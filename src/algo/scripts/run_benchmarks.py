@@ -0,0 +1,92 @@
+# Benchmarks for data/strategy/engine hot paths on synthetic panels.
+#
+# Run:
+#   uv run python src/algo/scripts/run_benchmarks.py                     # default sizes
+#   uv run python src/algo/scripts/run_benchmarks.py --quick --case engine_fast
+#   uv run python src/algo/scripts/run_benchmarks.py --size 1000x20 --save-baseline
+#   uv run python src/algo/scripts/run_benchmarks.py --compare            # mod baseline.json
+#   uv run python src/algo/scripts/run_benchmarks.py --compare-only new.json --baseline old.json
+#
+# Resultater skrives som JSON i artifacts/benchmarks/. --compare returnerer exit code 1
+# hvis en case er blevet mere end --threshold langsommere (eller bruger mere hukommelse).
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+from algo.benchmarks import (
+    CASES_BY_NAME,
+    DEFAULT_SIZES,
+    QUICK_SIZES,
+    baseline_path,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    write_results,
+)
+
+
+def _parse_size(text: str) -> tuple[int, int]:
+    assets, _, years = text.lower().partition("x")
+    try:
+        return int(assets), int(years)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected ASSETSxYEARS, got '{text}'") from None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument(
+        "--size",
+        action="append",
+        type=_parse_size,
+        help="Panel size ASSETSxYEARS (repeatable). Default: "
+        + ", ".join(f"{a}x{y}" for a, y in DEFAULT_SIZES),
+    )
+    parser.add_argument("--quick", action="store_true", help="Small panels only (smoke run)")
+    parser.add_argument(
+        "--case", action="append", choices=sorted(CASES_BY_NAME), help="Only this case"
+    )
+    parser.add_argument("--repeats", type=int, default=None, help="Timed runs per case")
+    parser.add_argument("--out", type=Path, default=None, help="Results JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline")
+    parser.add_argument("--compare-only", type=Path, help="Compare a stored results file; no run")
+    parser.add_argument("--baseline", type=Path, default=None, help="Baseline JSON path")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Relative regression limit")
+    args = parser.parse_args()
+
+    baseline = args.baseline or baseline_path()
+
+    if args.compare_only is not None:
+        results = load_results(args.compare_only)
+    else:
+        sizes = args.size or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+        results = run_benchmarks(sizes=sizes, cases=args.case, repeats=args.repeats)
+        path = write_results(results, args.out)
+        print(f"Results: {path}")
+
+        if args.save_baseline:
+            shutil.copyfile(path, baseline)
+            print(f"Baseline: {baseline}")
+
+    if not (args.compare or args.compare_only):
+        return 0
+
+    if not baseline.exists():
+        print(f"No baseline at {baseline} (run with --save-baseline first)")
+        return 2
+
+    table = compare_results(results, load_results(baseline), threshold=args.threshold)
+    print(table.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    regressions = table[table["status"] == "regression"]
+    if not regressions.empty:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
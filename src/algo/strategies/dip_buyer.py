@@ -1,11 +1,62 @@
+import numpy as np
 import pandas as pd
 
+from algo.indicators import IndicatorCache, indicator
+
+
+def _dip_buyer_active(
+    px: np.ndarray,
+    drops: np.ndarray,
+    *,
+    drop_pct: float,
+    take_profit: float,
+    stop_loss: float,
+) -> np.ndarray:
+    """
+    State-maskinen bag dip_buyer på rå NumPy-arrays (date × asset).
+    Returnerer en bool-matrix: True hvor vi holder asset ved dagens slutning.
+
+    Vi løber dag for dag (rækkerne er contiguous), men alle assets opdateres vektoriseret.
+    """
+    n_dates, n_assets = px.shape
+    active = np.zeros((n_dates, n_assets), dtype=bool)
+
+    # Vores "Hukommelse" (State tracking)
+    in_position = np.zeros(n_assets, dtype=bool)
+    entry_prices = np.zeros(n_assets)
+
+    has_price = ~np.isnan(px)
+    # Hvis drop er f.eks. -0.22, og grænsen er -0.20 -> KØB (NaN giver False)
+    buy_signal = drops <= -drop_pct
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(n_dates):
+            p = px[i]
+            valid = has_price[i]
+
+            # A: HAR VI ALLEREDE AKTIEN? Tjek Take Profit / Stop Loss
+            held = in_position & valid
+            ret_since_entry = (p - entry_prices) / entry_prices
+            exit_ = held & ((ret_since_entry >= take_profit) | (ret_since_entry <= -stop_loss))
+
+            # B: HAR VI IKKE AKTIEN? (Tjek om vi skal købe)
+            enter = ~in_position & valid & buy_signal[i]
+
+            in_position = (in_position & ~exit_) | enter
+            entry_prices = np.where(enter, p, np.where(exit_, 0.0, entry_prices))
+
+            active[i] = (held & ~exit_) | enter
+
+    return active
+
+
 def dip_buyer_weights_by_day(
     prices: pd.DataFrame,
     drop_pct: float = 0.20,
-    window: int = 100,           # 63 handelsdage er ca. 3 måneder
+    window: int = 100,  # 63 handelsdage er ca. 3 måneder
     take_profit: float = 1.00,  # Sælg ved +15%
-    stop_loss: float = 0.15     # Sælg ved -10%
+    stop_loss: float = 0.15,  # Sælg ved -10%
+    cache: IndicatorCache | None = None,
 ) -> pd.DataFrame:
     """
     Køber assets der er faldet X% over Y dage.
@@ -15,54 +66,23 @@ def dip_buyer_weights_by_day(
         raise ValueError("prices is empty")
 
     prices = prices.sort_index()
-    weights = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
 
-    # 1. Udregn afkast over de seneste 63 dage (Vektoriseret for hastighed)
-    # Giver f.eks. -0.21 hvis aktien er faldet 21% de sidste 3 mdr.
-    rolling_drop = prices.pct_change(periods=window)
+    # 1. Udregn afkast over de seneste `window` dage (Vektoriseret for hastighed)
+    # Giver f.eks. -0.21 hvis aktien er faldet 21% i perioden.
+    rolling_drop = indicator(prices, "windowed_return", periods=window, cache=cache)
 
-    # 2. Vores "Hukommelse" (State tracking)
-    in_position = {asset: False for asset in prices.columns}
-    entry_prices = {asset: 0.0 for asset in prices.columns}
+    # 2-3. Kør state-maskinen på NumPy-arrays
+    active = _dip_buyer_active(
+        prices.to_numpy(dtype=float),
+        rolling_drop.to_numpy(dtype=float),
+        drop_pct=drop_pct,
+        take_profit=take_profit,
+        stop_loss=stop_loss,
+    )
 
-    # 3. Gennemgå historien dag for dag
-    for i in range(len(prices)):
-        dt = prices.index[i]
-        current_prices = prices.iloc[i]
-        current_drops = rolling_drop.iloc[i]
+    # 4. Fordel vægten ligeligt mellem de aktier vi holder i dag (hele matrixen på én gang)
+    n_active = active.sum(axis=1)
+    with np.errstate(divide="ignore"):
+        w = np.where(n_active > 0, 1.0 / n_active, 0.0)
 
-        daily_active = []
-
-        for asset in prices.columns:
-            p = current_prices[asset]
-            if pd.isna(p):
-                continue
-
-            # A: HAR VI ALLEREDE AKTIEN?
-            if in_position[asset]:
-                # Udregn afkast siden vi købte
-                ret_since_entry = (p - entry_prices[asset]) / entry_prices[asset]
-
-                # Tjek om vi rammer Take Profit eller Stop Loss
-                if ret_since_entry >= take_profit or ret_since_entry <= -stop_loss:
-                    in_position[asset] = False
-                    entry_prices[asset] = 0.0
-                else:
-                    daily_active.append(asset) # Behold den!
-
-            # B: HAR VI IKKE AKTIEN? (Tjek om vi skal købe)
-            else:
-                drop = current_drops[asset]
-                # Hvis drop er f.eks. -0.22, og grænsen er -0.20 -> KØB
-                if not pd.isna(drop) and drop <= -drop_pct:
-                    in_position[asset] = True
-                    entry_prices[asset] = p
-                    daily_active.append(asset)
-
-        # 4. Fordel vægten ligeligt mellem de aktier vi holder i dag
-        if daily_active:
-            w = 1.0 / len(daily_active)
-            for asset in daily_active:
-                weights.loc[dt, asset] = w
-
-    return weights
\ No newline at end of file
+    return pd.DataFrame(active * w[:, None], index=prices.index, columns=prices.columns)
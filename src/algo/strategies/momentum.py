@@ -0,0 +1,39 @@
+import pandas as pd
+
+from algo.core.types import Frequency
+from algo.indicators import IndicatorCache, indicator
+from algo.strategies.ranking import Weighting, ranking_weights_by_day
+
+
+def momentum_weights_by_day(
+    prices: pd.DataFrame,
+    *,
+    lookback: int = 252,  # ca. 12 måneder
+    skip: int = 21,  # spring den seneste måned over (kortsigtet reversal)
+    top_k: int = 20,
+    rebalance: Frequency = "M",
+    weighting: Weighting = "equal",
+    cache: IndicatorCache | None = None,
+) -> pd.DataFrame:
+    """
+    Cross-sectional momentum: hold de top_k assets med højest afkast fra
+    t-lookback til t-skip, rebalanceret ved hver periodes slutning.
+    """
+    if not 0 <= skip < lookback:
+        raise ValueError("skip must be >= 0 and < lookback")
+
+    prices = prices.sort_index()
+
+    # 1. Afkast over (lookback - skip) dage, forskudt skip dage tilbage
+    scores = indicator(prices, "windowed_return", periods=lookback - skip, cache=cache)
+    if skip:
+        scores = scores.shift(skip)
+
+    # 2-3. Ranger hele universet og fordel vægten
+    return ranking_weights_by_day(
+        prices,
+        scores,
+        top_k=top_k,
+        rebalance=rebalance,
+        weighting=weighting,
+    )
@@ -0,0 +1,146 @@
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from algo.core.types import Frequency
+
+Weighting = Literal["equal", "rank"]
+
+
+def rebalance_mask(index: pd.DatetimeIndex, freq: Frequency) -> np.ndarray:
+    """
+    True på den sidste handelsdag i hver periode (D = hver dag, W = uge, M = måned).
+    """
+    if freq == "D":
+        return np.ones(len(index), dtype=bool)
+    if freq not in ("W", "M"):
+        raise ValueError(f"Ukendt rebalance-frekvens: '{freq}'")
+
+    periods = pd.DatetimeIndex(index).to_period(freq).asi8
+    mask = np.ones(len(index), dtype=bool)
+    mask[:-1] = periods[:-1] != periods[1:]
+    return mask
+
+
+def hold_between_rebalances(w_rebal: np.ndarray, rebal: np.ndarray) -> np.ndarray:
+    """
+    Udvid vægte beregnet på rebalance-datoerne (én række per True i rebal) til alle
+    datoer: hver dato får vægtene fra seneste rebalance, 0 før den første.
+    """
+    last = np.maximum.accumulate(np.where(rebal, np.cumsum(rebal) - 1, -1))
+    return np.where((last >= 0)[:, None], w_rebal[np.maximum(last, 0)], 0.0)
+
+
+def top_k_mask(scores: np.ndarray, k: int, *, higher_is_better: bool = True) -> np.ndarray:
+    """
+    Bool-matrix (date × asset): True for de K bedste scores på hver dato.
+
+    Hele matrixen klares med én argpartition langs asset-aksen (O(assets) per række
+    i stedet for en fuld sortering). NaN/inf-scores er aldrig med; har en dato færre
+    end K gyldige scores, vælges kun de gyldige.
+    """
+    return _select_top_k(scores, k, higher_is_better=higher_is_better)[0]
+
+
+def _select_top_k(
+    scores: np.ndarray, k: int, *, higher_is_better: bool
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (selected-mask, rank) hvor rank er 0 for den bedste asset og -1 for ikke-valgte.
+    """
+    if k < 1:
+        raise ValueError("k must be >= 1")
+
+    n_dates, n_assets = scores.shape
+    selected = np.zeros((n_dates, n_assets), dtype=bool)
+    rank = np.full((n_dates, n_assets), -1, dtype=np.int64)
+    if n_dates == 0 or n_assets == 0:
+        return selected, rank
+
+    k = min(k, n_assets)
+    # Størst er bedst internt; ugyldige scores sendes til -inf
+    key = scores if higher_is_better else -scores
+    key = np.where(np.isfinite(key), key, -np.inf)
+
+    # 1. Partiel udvælgelse: de K største per række (uordnede)
+    top = np.argpartition(-key, k - 1, axis=1)[:, :k]
+    top_vals = np.take_along_axis(key, top, axis=1)
+
+    # 2. Sortér kun de K udvalgte (K log K per række) for at få rang
+    order = np.argsort(-top_vals, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    top_vals = np.take_along_axis(top_vals, order, axis=1)
+
+    keep = np.isfinite(top_vals)
+    rows = np.broadcast_to(np.arange(n_dates)[:, None], top.shape)
+    selected[rows[keep], top[keep]] = True
+    rank[rows[keep], top[keep]] = np.broadcast_to(np.arange(k), top.shape)[keep]
+    return selected, rank
+
+
+def rank_weights(
+    scores: np.ndarray,
+    k: int,
+    *,
+    weighting: Weighting = "equal",
+    higher_is_better: bool = True,
+) -> np.ndarray:
+    """
+    Vægte (date × asset) for top-K porteføljen; hver række summer til 1 (eller 0).
+
+    weighting:
+      "equal" -> 1/K til hver valgt asset
+      "rank"  -> lineært efter rang: bedste får K, næstbedste K-1, ... (normaliseret)
+    """
+    selected, rank = _select_top_k(scores, k, higher_is_better=higher_is_better)
+
+    if weighting == "equal":
+        raw = selected.astype(float)
+    elif weighting == "rank":
+        raw = np.where(selected, min(k, scores.shape[1]) - rank, 0).astype(float)
+    else:
+        raise ValueError(f"Ukendt weighting: '{weighting}'")
+
+    total = raw.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, raw / total, 0.0)
+
+
+def ranking_weights_by_day(
+    prices: pd.DataFrame,
+    scores: pd.DataFrame,
+    *,
+    top_k: int,
+    rebalance: Frequency = "M",
+    weighting: Weighting = "equal",
+    higher_is_better: bool = True,
+) -> pd.DataFrame:
+    """
+    Generisk cross-sectional strategi: ranger hele universet på hver rebalance-dato,
+    hold top K indtil næste rebalance.
+
+    Assets uden pris på rebalance-datoen er ikke kandidater (ikke handlet endnu,
+    afnoteret, hul i data).
+    """
+    if prices.empty:
+        raise ValueError("prices is empty")
+
+    prices = prices.sort_index()
+    s = scores.reindex(index=prices.index, columns=prices.columns).to_numpy(dtype=float)
+    px = prices.to_numpy(dtype=float)
+
+    # 1. Find rebalance-datoer og kør udvælgelsen kun på dem (én vektoriseret operation)
+    rebal = rebalance_mask(prices.index, rebalance)
+    rebal_rows = np.flatnonzero(rebal)
+    eligible = np.isfinite(px[rebal_rows])
+    w_rebal = rank_weights(
+        np.where(eligible, s[rebal_rows], np.nan),
+        top_k,
+        weighting=weighting,
+        higher_is_better=higher_is_better,
+    )
+
+    # 2. Hold vægtene frem til næste rebalance (0 før den første)
+    w = hold_between_rebalances(w_rebal, rebal)
+    return pd.DataFrame(w, index=prices.index, columns=prices.columns)
@@ -0,0 +1,272 @@
+from collections.abc import Iterator
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from algo.core.types import Frequency
+from algo.indicators import IndicatorCache, indicator
+from algo.strategies.ranking import hold_between_rebalances, rebalance_mask
+
+RiskMethod = Literal["inverse_vol", "risk_parity", "min_variance"]
+CovMethod = Literal["rolling", "ewma"]
+
+
+# ==========================
+# Kovarians (inkrementel)
+# ==========================
+
+
+def _rolling_cov(
+    rets: np.ndarray,
+    rows: np.ndarray,
+    *,
+    window: int,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Rullende kovarians over de seneste `window` rækker, kun evalueret i `rows`.
+
+    Vi holder tre summer over vinduet (pairwise NaN-håndtering som DataFrame.cov):
+        S = Σ r rᵀ,  P = Σ r vᵀ,  N = Σ v vᵀ   (r = afkast med NaN -> 0, v = gyldig)
+    Mellem to evalueringer lægges nye rækker til og gamle trækkes fra som én blok
+    (en sum af rank-one opdateringer = én matrix-multiplikation), så hver række
+    lægges til og trækkes fra præcis én gang. Er der ingen overlap, regnes vinduet forfra.
+
+    Yield: (row, cov, n_obs) hvor n_obs er antal afkast per asset i vinduet.
+    """
+    valid = np.isfinite(rets)
+    r = np.where(valid, rets, 0.0)
+    v = valid.astype(float)
+
+    n_assets = rets.shape[1]
+    S = np.zeros((n_assets, n_assets))
+    P = np.zeros((n_assets, n_assets))
+    N = np.zeros((n_assets, n_assets))
+    lo = hi = 0  # vinduet der er i summerne: rækker [lo, hi)
+
+    for t in rows:
+        new_lo, new_hi = max(t + 1 - window, 0), t + 1
+
+        if new_lo >= hi:
+            # Intet overlap: start forfra på det nye vindue
+            rb, vb = r[new_lo:new_hi], v[new_lo:new_hi]
+            S, P, N = rb.T @ rb, rb.T @ vb, vb.T @ vb
+        else:
+            add_r, add_v = r[hi:new_hi], v[hi:new_hi]
+            rem_r, rem_v = r[lo:new_lo], v[lo:new_lo]
+            S += add_r.T @ add_r - rem_r.T @ rem_r
+            P += add_r.T @ add_v - rem_r.T @ rem_v
+            N += add_v.T @ add_v - rem_v.T @ rem_v
+        lo, hi = new_lo, new_hi
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = (S - P * P.T / N) / (N - 1)
+        yield t, cov, np.diag(N).copy()
+
+
+def _ewma_cov(
+    rets: np.ndarray,
+    rows: np.ndarray,
+    *,
+    halflife: float,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Eksponentielt vægtet kovarians (bias=True), evalueret i `rows`.
+
+    Samme summer som _rolling_cov, men vægtet med λ^(alder): mellem evalueringer
+    skaleres summerne med λ^k og de k nye rækker lægges til som én blok.
+    """
+    lam = 0.5 ** (1.0 / halflife)
+    valid = np.isfinite(rets)
+    r = np.where(valid, rets, 0.0)
+    v = valid.astype(float)
+
+    n_assets = rets.shape[1]
+    S = np.zeros((n_assets, n_assets))
+    P = np.zeros((n_assets, n_assets))
+    N = np.zeros((n_assets, n_assets))
+    count = np.zeros(n_assets)
+    hi = 0
+
+    for t in rows:
+        rb, vb = r[hi : t + 1], v[hi : t + 1]
+        k = len(rb)
+        wts = lam ** np.arange(k - 1, -1, -1)[:, None]  # nyeste række vægter 1
+
+        decay = lam**k
+        S = decay * S + (rb * wts).T @ rb
+        P = decay * P + (rb * wts).T @ vb
+        N = decay * N + (vb * wts).T @ vb
+        count += vb.sum(axis=0)
+        hi = t + 1
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = P / N
+            cov = S / N - mean * mean.T
+        yield t, cov, count.copy()
+
+
+# ==========================
+# Vægt-løsere
+# ==========================
+
+
+def _inverse_vol(cov: np.ndarray, x0: np.ndarray | None = None) -> np.ndarray:
+    w = 1.0 / np.sqrt(np.diag(cov))
+    return w / w.sum()
+
+
+def _risk_parity(
+    cov: np.ndarray,
+    x0: np.ndarray | None = None,
+    *,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """
+    Equal risk contribution: w_i (Σw)_i ens for alle i.
+
+    Løses som det konvekse problem min ½ yᵀΣy - Σ log y_i med dæmpet Newton
+    (Spinu 2013); w = y / Σy. x0 (forrige rebalances vægte) bruges som startpunkt;
+    nye assets starter på inverse-vol.
+    """
+    n = len(cov)
+    b = np.full(n, 1.0 / n)
+    y = _inverse_vol(cov)
+    if x0 is not None:
+        y = np.where(x0 > 0, x0, y)
+    y /= np.sqrt(y @ cov @ y)
+
+    for _ in range(max_iter):
+        grad = cov @ y - b / y
+        hess = cov + np.diag(b / (y * y))
+        step = np.linalg.solve(hess, grad)
+        decrement = np.sqrt(max(grad @ step, 0.0))
+        # Dæmpet skridt holder y > 0 (self-concordance)
+        y = y - (step / (1.0 + decrement) if decrement > 0.25 else step)
+        if decrement < tol:
+            break
+
+    return y / y.sum()
+
+
+def _min_variance(
+    cov: np.ndarray,
+    x0: np.ndarray | None = None,
+    *,
+    max_iter: int = 200,
+) -> np.ndarray:
+    """
+    Long-only minimum variance: min wᵀΣw, Σw = 1, w >= 0 (active-set).
+
+    Løs det lukkede udtryk w ∝ Σ⁻¹1 på de frie assets og fjern dem med negativ vægt;
+    tag derefter den fjernede asset der bryder KKT-betingelsen (Σw)_i >= wᵀΣw mest
+    tilbage, indtil ingen gør. x0 (forrige rebalance) giver start-mængden af frie assets.
+    """
+    n = len(cov)
+    free = np.ones(n, dtype=bool) if x0 is None or not (x0 > 0).any() else x0 > 0
+    best = np.full(n, 1.0 / n)
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(free)
+        x = np.linalg.solve(cov[np.ix_(idx, idx)], np.ones(len(idx)))
+        x /= x.sum()
+
+        if (x < 0).any():
+            free[idx[x < 0]] = False
+            continue
+
+        best = np.zeros(n)
+        best[idx] = x
+        marginal = cov @ best
+        violation = np.where(free, np.inf, marginal - best @ marginal)
+        worst = int(np.argmin(violation))
+        if violation[worst] >= -1e-12 * abs(best @ marginal):
+            break
+        free[worst] = True
+
+    return best
+
+
+_SOLVERS = {
+    "inverse_vol": _inverse_vol,
+    "risk_parity": _risk_parity,
+    "min_variance": _min_variance,
+}
+
+
+def _clean_cov(cov: np.ndarray, ridge: float) -> np.ndarray:
+    """
+    Symmetrisér, sæt manglende par (for få fælles observationer) til 0 og læg en lille
+    ridge på diagonalen, så pairwise-kovariansen altid er positiv definit nok til solve().
+    """
+    cov = np.nan_to_num((cov + cov.T) / 2, nan=0.0, posinf=0.0, neginf=0.0)
+    return cov + ridge * np.mean(np.diag(cov)) * np.eye(len(cov))
+
+
+# ==========================
+# Strategi
+# ==========================
+
+
+def risk_parity_weights_by_day(
+    prices: pd.DataFrame,
+    *,
+    method: RiskMethod = "risk_parity",
+    cov_method: CovMethod = "rolling",
+    window: int = 252,
+    halflife: float = 63.0,
+    min_periods: int | None = None,
+    rebalance: Frequency = "M",
+    ridge: float = 1e-6,
+    cache: IndicatorCache | None = None,
+) -> pd.DataFrame:
+    """
+    Risikobaseret allokering (inverse_vol, risk_parity eller min_variance) på hele universet.
+
+    Kovariansen af daglige afkast opdateres inkrementelt (rullende vindue eller EWMA),
+    og vægtene løses kun på rebalance-datoer og holdes til næste rebalance.
+    Kandidater på en rebalance-dato: assets med pris den dag og mindst `min_periods`
+    afkast i historikken (default = window), så nye assets kommer med når de har
+    nok data, og afnoterede falder ud.
+    """
+    if prices.empty:
+        raise ValueError("prices is empty")
+    if method not in _SOLVERS:
+        raise ValueError(f"Ukendt method: '{method}'")
+    if window < 2:
+        raise ValueError("window must be >= 2")
+
+    prices = prices.sort_index()
+    minp = window if min_periods is None else min_periods
+
+    # 1. Daglige afkast fra den delte indikator-cache
+    rets = indicator(prices, "windowed_return", periods=1, cache=cache).to_numpy(dtype=float)
+    px = prices.to_numpy(dtype=float)
+
+    # 2. Kovarians på rebalance-datoerne
+    rebal = rebalance_mask(prices.index, rebalance)
+    rows = np.flatnonzero(rebal)
+    if cov_method == "rolling":
+        covs = _rolling_cov(rets, rows, window=window)
+    elif cov_method == "ewma":
+        covs = _ewma_cov(rets, rows, halflife=halflife)
+    else:
+        raise ValueError(f"Ukendt cov_method: '{cov_method}'")
+
+    # 3. Løs vægtene for de assets der er med på hver rebalance-dato
+    #    (forrige løsning bruges som startpunkt; vægtene ændrer sig sjældent meget)
+    solve = _SOLVERS[method]
+    w_rebal = np.zeros((len(rows), prices.shape[1]))
+    prev = np.zeros(prices.shape[1])
+    for i, (t, cov, n_obs) in enumerate(covs):
+        eligible = np.isfinite(px[t]) & (n_obs >= minp) & (np.diag(cov) > 0)
+        idx = np.flatnonzero(eligible)
+        if len(idx) == 0:
+            continue
+        w_rebal[i, idx] = solve(_clean_cov(cov[np.ix_(idx, idx)], ridge), prev[idx])
+        prev = w_rebal[i]
+
+    # 4. Hold vægtene frem til næste rebalance
+    w = hold_between_rebalances(w_rebal, rebal)
+    return pd.DataFrame(w, index=prices.index, columns=prices.columns)
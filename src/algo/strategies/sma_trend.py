@@ -1,14 +1,22 @@
 import pandas as pd
 
-def sma_trend_weights_by_day(prices: pd.DataFrame, *, window: int = 200) -> pd.DataFrame:
+from algo.indicators import IndicatorCache, indicator
+
+
+def sma_trend_weights_by_day(
+    prices: pd.DataFrame,
+    *,
+    window: int = 200,
+    cache: IndicatorCache | None = None,
+) -> pd.DataFrame:
     """
     Compute target weights each day (simple loop; fine for research).
     Returns a DataFrame aligned to prices: date × asset.
     """
     prices = prices.sort_index()
 
-    # 1. Udregn 200 dages snit for HELE dataframen på én gang
-    sma = prices.rolling(window=window, min_periods=window).mean()
+    # 1. Udregn 200 dages snit for HELE dataframen på én gang (delt indikator-cache)
+    sma = indicator(prices, "sma", window=window, cache=cache)
 
     # 2. Skab en Sand/Falsk matrix: Hvilke aktier er over deres snit?
     # Bliver til 1.0 (Sand) og 0.0 (Falsk)
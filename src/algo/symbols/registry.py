@@ -3,6 +3,8 @@ from pathlib import Path
 import yaml
 from pydantic import BaseModel, Field, PrivateAttr
 
+from algo.config import settings
+
 
 # an asset itself
 class Asset(BaseModel):
@@ -10,6 +12,8 @@ class Asset(BaseModel):
     kind: str
     name: str
     identifiers: dict[str, str] = Field(default_factory=dict)
+    # trading calendar (e.g. "us", "fx", "dk"); None: derived, see algo.data.calendars
+    calendar: str | None = None
 
 
 # a collection of assets
@@ -17,6 +21,7 @@ class AssetFile(BaseModel):
     assets: list[Asset]
 
     _by_key: dict[str, Asset] = PrivateAttr(default_factory=dict)
+    _by_identifier: dict[str, dict[str, list[str]]] = PrivateAttr(default_factory=dict)
 
     # after yaml is loaded we build index
     def model_post_init(self, __context) -> None:
@@ -27,24 +32,45 @@ class AssetFile(BaseModel):
             raise KeyError(f"Unknown asset key: {key}")
         return self._by_key[key]
 
+    def reverse_index(self, identifier: str) -> dict[str, list[str]]:
+        """
+        Provider symbol (lowercased) -> asset keys using it, built on first use.
+        """
+        if identifier not in self._by_identifier:
+            index: dict[str, list[str]] = {}
+            for a in self.assets:
+                if identifier in a.identifiers:
+                    index.setdefault(a.identifiers[identifier].lower(), []).append(a.key)
+            self._by_identifier[identifier] = index
+        return self._by_identifier[identifier]
+
 
 _REGISTRY: AssetFile | None = None
+_REGISTRY_PATH: Path | None = None
 
 
 def _assets_yaml_path() -> Path:
-    return Path(__file__).with_name("assets.yaml")
+    # settings.registry_path (ALGO_REGISTRY_PATH) points at another universe, e.g. a synthetic one
+    return settings.registry_path or Path(__file__).with_name("assets.yaml")
 
 
-def load_registry() -> AssetFile:
-    path = _assets_yaml_path()
+def load_registry(path: Path | None = None) -> AssetFile:
+    path = path or _assets_yaml_path()
     data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
     return AssetFile.model_validate(data)
 
 
+def write_registry(registry: AssetFile, path: Path) -> Path:
+    data = registry.model_dump(mode="json", exclude_none=True)
+    path.write_text(yaml.safe_dump(data, sort_keys=False), encoding="utf-8")
+    return path
+
+
 def get_registry() -> AssetFile:
-    global _REGISTRY
-    if _REGISTRY is None:
-        _REGISTRY = load_registry()
+    global _REGISTRY, _REGISTRY_PATH
+    path = _assets_yaml_path()
+    if _REGISTRY is None or _REGISTRY_PATH != path:
+        _REGISTRY, _REGISTRY_PATH = load_registry(path), path
     return _REGISTRY
 
 
@@ -65,6 +91,13 @@ def has_identifier(key: str, identifier: str) -> bool:
     return identifier in asset.identifiers
 
 
+def keys_for_identifier(identifier: str, symbol: str) -> list[str]:
+    """
+    Asset keys whose `identifier` is `symbol` (case-insensitive); empty if none.
+    """
+    return get_registry().reverse_index(identifier).get(symbol.lower(), [])
+
+
 def list_asset_keys() -> list[str]:
     reg = get_registry()
     return [a.key for a in reg.assets]
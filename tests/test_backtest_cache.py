@@ -0,0 +1,106 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.backtest import cache as C
+from algo.backtest.runs import BacktestResult
+from algo.config import settings
+
+
+@pytest.fixture
+def px(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2020-01-01", periods=200, name="date")
+    return pd.DataFrame(
+        100 * np.cumprod(1 + rng.normal(0, 0.01, size=(200, 3)), axis=0),
+        index=idx,
+        columns=["x", "y", "z"],
+    )
+
+
+def test_hit_returns_stored_result_and_inputs_miss(px, monkeypatch):
+    runs = {"n": 0}
+    execute = C.execute_backtest
+
+    def counting(*args, **kwargs):
+        runs["n"] += 1
+        return execute(*args, **kwargs)
+
+    monkeypatch.setattr(C, "execute_backtest", counting)
+
+    def run(**overrides):
+        kwargs = {
+            "params": {"window": 20},
+            "dataset_version": "v1",
+            "field": "adj_close",
+            "engines": ["fast"],
+            **overrides,
+        }
+        return C.cached_backtest(px, "sma_trend", **kwargs)
+
+    first, key, hit = run()
+    assert not hit and runs["n"] == 1
+
+    again, same_key, hit = run()
+    assert hit and same_key == key and runs["n"] == 1
+    pd.testing.assert_series_equal(again.fast_equity, first.fast_equity, check_freq=False)
+    assert again.stats == first.stats
+
+    # each input that determines the output gives a new key
+    keys = {key}
+    for overrides in [
+        {"dataset_version": "v2"},
+        {"params": {"window": 30}},
+        {"engine_config": {"commission_pct": 0.0}},
+    ]:
+        _, other, hit = run(**overrides)
+        assert not hit
+        keys.add(other)
+    assert len(keys) == 4 and runs["n"] == 4
+
+    # engine_config equal to the defaults is the same backtest
+    _, default_key, hit = run(engine_config={"commission_pct": 0.0015})
+    assert hit and default_key == key
+
+    # a different slice of the data misses too
+    _, sliced, hit = C.cached_backtest(
+        px.iloc[10:],
+        "sma_trend",
+        {"window": 20},
+        dataset_version="v1",
+        field="adj_close",
+        engines=["fast"],
+    )
+    assert not hit and sliced not in keys
+
+    _, _, hit = run(use_cache=False)
+    assert not hit and runs["n"] == 6
+
+
+def _store(key: str, last_access: float, n_rows: int = 100) -> None:
+    equity = pd.Series(np.ones(n_rows), index=pd.bdate_range("2020-01-01", periods=n_rows))
+    entry = C.store_result(key, BacktestResult(fast_equity=equity, stats={"fast": {}}))
+    meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+    meta["last_access"] = last_access
+    (entry / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+def test_lru_eviction_by_entries_and_size(px):
+    for i, key in enumerate(["a", "b", "c", "d"]):
+        _store(key, last_access=100.0 + i)
+
+    # a hit refreshes "a": it becomes the most recently used entry
+    assert C.load_cached_result("a") is not None
+    assert C.evict_cache(max_entries=2, max_bytes=10**9) == ["b", "c"]
+    assert C.load_cached_result("b") is None
+    assert C.load_cached_result("d") is not None
+
+    # a half-written entry (no meta.json) is always dropped
+    (C.cache_dir() / "partial").mkdir()
+    # room for one entry (meta.json sizes vary by a few bytes with last_access)
+    size = max(C._entry_size(C.cache_entry_dir(k)) for k in ["a", "d"])
+    assert sorted(C.evict_cache(max_entries=10, max_bytes=size)) == ["a", "partial"]
+    assert [p.name for p in C.cache_dir().iterdir()] == ["d"]
@@ -0,0 +1,92 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.backtest import batch as B
+from algo.config import settings
+from algo.data.cleaning import cleaned_path
+
+
+def test_batch_file_parsing(tmp_path):
+    path = tmp_path / "batch.yaml"
+    path.write_text(
+        "jobs:\n"
+        "  - {name: a, strategy: sma_trend, params: {window: 50}}\n"
+        "  - {name: b, strategy: momentum, engines: [fast], universe: {assets: [x, y]}}\n",
+        encoding="utf-8",
+    )
+    batch = B.load_batch_file(path)
+    assert [j.engines for j in batch.jobs] == [["fast", "real"], ["fast"]]
+    assert batch.jobs[1].universe.assets == ["x", "y"]
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        B.BatchFile.model_validate({"jobs": [{"name": "a", "strategy": "s"}] * 2})
+
+
+def _write_panel(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+    monkeypatch.setattr(B, "_PANEL", {})
+
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2020-01-01", periods=300, name="date")
+    px = pd.DataFrame(
+        100 * np.cumprod(1 + rng.normal(0, 0.01, size=(300, 3)), axis=0),
+        index=idx,
+        columns=["spy", "x", "y"],
+    )
+    cleaned = pd.concat({"adj_close": px}, axis=1).swaplevel(axis=1)
+    cleaned.columns.names = ["asset", "field"]
+    cleaned.to_parquet(cleaned_path())
+
+
+def test_run_batch_headless(tmp_path, monkeypatch):
+    _write_panel(tmp_path, monkeypatch)
+
+    batch = B.BatchFile.model_validate(
+        {
+            "jobs": [
+                {
+                    "name": "sma",
+                    "strategy": "sma_trend",
+                    "params": {"window": 20},
+                    "universe": {"assets": ["x", "y"]},
+                    "engines": ["fast"],
+                },
+                {"name": "bad", "strategy": "nope", "universe": {"assets": ["x"]}},
+            ]
+        }
+    )
+    summary, batch_dir = B.run_batch(batch, max_workers=1)
+
+    assert set(summary.loc[summary["job"] == "sma", "curve"]) == {"fast", "benchmark"}
+    assert summary.loc[summary["job"] == "bad", "error"].str.contains("nope").all()
+    assert (batch_dir / "summary.csv").exists()
+    assert "matplotlib.pyplot" not in sys.modules  # headless: aldrig importeret
+
+
+def test_run_batch_in_process_pool(tmp_path, monkeypatch):
+    _write_panel(tmp_path, monkeypatch)
+
+    jobs = [
+        {
+            "name": f"sma{w}",
+            "strategy": "sma_trend",
+            "params": {"window": w},
+            "universe": {"assets": ["x", "y"]},
+            "engines": ["fast"],
+        }
+        for w in (10, 20, 40)
+    ]
+    batch = B.BatchFile.model_validate({"jobs": jobs, "use_cache": False})
+
+    pooled, _ = B.run_batch(batch, max_workers=2)
+    inline, _ = B.run_batch(batch.model_copy(update={"name": "inline"}), max_workers=1)
+
+    assert "error" not in pooled.columns or pooled["error"].isna().all()
+    assert list(pooled["job"].unique()) == ["sma10", "sma20", "sma40"]
+    cols = ["job", "curve", "Sharpe", "CAGR"]
+    pd.testing.assert_frame_equal(pooled[cols], inline[cols])
+    assert pooled["run_id"].nunique() == 3
@@ -0,0 +1,50 @@
+from algo.benchmarks import (
+    BenchResult,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    write_results,
+)
+
+
+def _result(case: str, seconds: float, peak_mb: float = 10.0) -> BenchResult:
+    return BenchResult(case, 100, 10, 2500, 3, seconds, seconds, peak_mb)
+
+
+def test_compare_flags_regressions():
+    baseline = [
+        _result("a", 1.0),
+        _result("b", 1.0),
+        _result("c", 0.001),
+        _result("d", 1.0),
+        _result("f", 1.0, peak_mb=0.2),
+    ]
+    current = [
+        _result("a", 1.5),  # slower
+        _result("b", 0.5),  # faster
+        _result("c", 0.003),  # 3x slower, but below the noise floor
+        _result("d", 1.0, peak_mb=20.0),  # more memory
+        _result("e", 1.0),  # not in baseline
+        _result("f", 1.0, peak_mb=0.5),  # 2.5x the memory, but below the noise floor
+    ]
+    table = compare_results(current, baseline, threshold=0.2).set_index("case")
+
+    assert table["status"].to_dict() == {
+        "a": "regression",
+        "b": "improvement",
+        "c": "ok",
+        "d": "regression",
+        "e": "new",
+        "f": "ok",
+    }
+
+
+def test_run_and_roundtrip(tmp_path):
+    results = run_benchmarks(
+        sizes=[(20, 6)], cases=["engine_fast", "compute_stats"], repeats=1, verbose=False
+    )
+    assert [r.case for r in results] == ["engine_fast", "compute_stats"]
+    assert all(r.seconds_min > 0 and r.rows > 1000 for r in results)
+
+    path = write_results(results, tmp_path / "bench.json")
+    assert load_results(path) == results
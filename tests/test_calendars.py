@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+from algo.config import settings
+from algo.data.calendars import (
+    align_calendars,
+    asset_calendar,
+    infer_calendar,
+    list_calendars,
+    load_calendar_fields,
+)
+from algo.data.cleaning import build_cleaned_ohlcv, load_cleaned_field
+from algo.data.prices import load_canonical_field
+from algo.data.synthetic import MIXED_KIND_MIX, SyntheticSpec, write_synthetic_dataset
+from algo.symbols.registry import Asset, AssetFile, write_registry
+
+
+def test_calendar_from_registry_or_data(tmp_path, monkeypatch):
+    registry = AssetFile(
+        assets=[
+            Asset(key="eurusd", kind="fx", name="EUR/USD", identifiers={"yahoo": "EURUSD=X"}),
+            Asset(key="novo-b-co", kind="equity", name="Novo", identifiers={"yahoo": "NOVO-B.CO"}),
+            Asset(key="spy", kind="etf", name="SPY", identifiers={"yahoo": "SPY"}),
+            Asset(key="odd", kind="equity", name="Odd", calendar="xjpx"),
+        ]
+    )
+    monkeypatch.setattr(settings, "registry_path", write_registry(registry, tmp_path / "a.yaml"))
+
+    assert [asset_calendar(k) for k in ["eurusd", "novo-b-co", "spy", "odd"]] == [
+        "fx",
+        "dk",
+        "us",
+        "xjpx",
+    ]
+    # unregistered assets: inferred from the dates they have data on
+    assert asset_calendar("btc", pd.date_range("2020-01-01", periods=400)) == "crypto"
+    assert infer_calendar(pd.bdate_range("2020-01-01", periods=400)) == "fx"
+
+
+def test_mixed_calendars_cleaned_per_calendar(tmp_path, monkeypatch):
+    spec = SyntheticSpec(n_assets=40, years=6, start="2010-01-04", seed=2, kind_mix=MIXED_KIND_MIX)
+    registry_path = write_synthetic_dataset(spec, tmp_path)
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "registry_path", registry_path)
+    truth = pd.read_parquet(tmp_path / "synthetic" / "truth.parquet")
+
+    _, eligibility = build_cleaned_ohlcv()
+    assert set(eligibility["calendar"]) == {"us", "fx", "crypto"}
+    assert list_calendars() == list_calendars(dataset="canonical") == ["crypto", "fx", "us"]
+
+    # every calendar panel lives on its own days: no weekend rows outside crypto,
+    # and its assets are exactly that calendar's survivors
+    panels = load_calendar_fields("adj_close")
+    for calendar, panel in panels.items():
+        assert set(panel.columns) == set(eligibility.index[eligibility["calendar"] == calendar])
+        assert set(truth.loc[panel.columns, "calendar"]) == {calendar}
+        assert panel.notna().any(axis=1).all()
+    assert (panels["us"].index.dayofweek < 5).all()
+    assert (panels["fx"].index.dayofweek < 5).all()
+
+    canonical_fx = load_canonical_field("close", calendar="fx")
+    assert canonical_fx.attrs["calendar"] == "fx" and (canonical_fx.index.dayofweek < 5).all()
+
+    # aligning on request: the union reproduces the single-file panel
+    union = load_cleaned_field("adj_close")
+    aligned = align_calendars(panels)
+    pd.testing.assert_frame_equal(
+        aligned[union.columns], union, check_freq=False, check_names=False
+    )
+
+    # FX and crypto seen on US trading days, carrying the last quote over
+    on_us = align_calendars(panels, to="us", ffill_limit=3)
+    assert on_us.index.equals(panels["us"].index)
+    fx_asset = panels["fx"].columns[0]
+    fx = panels["fx"][fx_asset].dropna()
+    day = fx.index.intersection(on_us.index)[-1]
+    assert on_us.loc[day, fx_asset] == fx[day]
+    # 2016-01-01 is an FX day but a US holiday: not a row of the US-aligned frame
+    assert pd.Timestamp("2016-01-01") in panels["fx"].index
+    assert pd.Timestamp("2016-01-01") not in on_us.index
+
+    # ... and FX carried into the crypto weekend, at most ffill_limit rows
+    on_crypto = align_calendars(panels, to="crypto", ffill_limit=1)
+    last_friday = fx.index[fx.index.dayofweek == 4][-1]
+    saturday, sunday = last_friday + pd.Timedelta(days=1), last_friday + pd.Timedelta(days=2)
+    assert on_crypto.loc[saturday, fx_asset] == fx[last_friday]
+    assert pd.isna(on_crypto.loc[sunday, fx_asset])
+
+    monthly = align_calendars(panels, freq="ME")
+    assert monthly.index.is_month_end.all()
+    assert set(monthly.columns) == set(union.columns)
+
+    with pytest.raises(ValueError, match="Unknown alignment target"):
+        align_calendars(panels, to="nope")
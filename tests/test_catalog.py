@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.backtest import catalog as K
+
+
+def _curve(seed: int, n: int = 50) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2020-01-01", periods=n)
+    return pd.Series(np.cumprod(1 + rng.normal(0, 0.01, n)), index=idx)
+
+
+def _record(path, name: str, sharpe: float, **kwargs) -> str:
+    return K.record_run(
+        name=name,
+        strategy=kwargs.pop("strategy", "sma_trend"),
+        params={"window": 20},
+        config={"engines": ["fast", "real"]},
+        stats={"real": {"Sharpe": sharpe}, "fast": {"Sharpe": sharpe + 0.1}},
+        curves={"real": _curve(len(name)), "fast": _curve(len(name) + 1)},
+        path=path,
+        **kwargs,
+    )
+
+
+def test_record_list_and_find(tmp_path):
+    path = tmp_path / "catalog.duckdb"
+    a = _record(path, "a", 0.5, cache_key="k1", dataset_version="v1")
+    b = _record(path, "bb", 1.2, cache_key="k1", strategy="momentum")
+
+    runs = K.list_runs(path=path)
+    assert list(runs.index) == [b, a]  # newest first
+    assert runs.loc[a, "dataset_version"] == "v1"
+    assert runs.loc[a, "params"] == '{"window": 20}'
+    assert list(K.list_runs(strategy="momentum", path=path).index) == [b]
+
+    assert K.find_run_by_cache_key("k1", path=path) == b
+    assert K.find_run_by_cache_key("nope", path=path) is None
+
+    # metrics seen for the first time become columns
+    c = K.record_run(
+        name="c",
+        strategy="sma_trend",
+        params={},
+        config={},
+        stats={"real": {"Sharpe": 0.9, "Calmar": 2.0}},
+        curves={},
+        path=path,
+    )
+    board = K.leaderboard("Sharpe", path=path)
+    assert list(board.index) == [b, c, a]
+    assert board.loc[c, "Calmar"] == 2.0 and pd.isna(board.loc[a, "Calmar"])
+    with pytest.raises(KeyError):
+        K.leaderboard("nope", path=path)
+
+
+def test_load_curves_and_delete(tmp_path):
+    path = tmp_path / "catalog.duckdb"
+    a = _record(path, "a", 0.5)
+    b = _record(path, "bb", 1.2)
+
+    wide = K.load_curves([b, a], path=path)
+    assert list(wide.columns) == [b, a]
+    np.testing.assert_allclose(wide[a].to_numpy(), _curve(1).to_numpy())
+    np.testing.assert_allclose(K.load_curves([a], curve="fast", path=path)[a], _curve(2))
+    assert wide.index.equals(_curve(1).index.rename("date"))
+
+    K.delete_runs([a], path=path)
+    assert list(K.list_runs(path=path).index) == [b]
+    assert list(K.load_curves([a, b], path=path).columns) == [b]
+    assert K.query("SELECT count(*) AS n FROM run_stats", path=path)["n"].iloc[0] == 2
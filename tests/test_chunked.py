@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.backtest.chunked import (
+    iter_field_blocks,
+    iter_frame_blocks,
+    run_backtest_chunked,
+)
+from algo.backtest.engine_fast import run_backtest_fast_daily
+from algo.backtest.engine_realistic import run_backtest_realistic
+from algo.config import settings
+from algo.data.cleaning import build_cleaned_ohlcv, load_cleaned_field
+from algo.data.synthetic import SyntheticSpec, write_synthetic_dataset
+
+
+@pytest.fixture
+def panel(tmp_path, monkeypatch):
+    registry_path = write_synthetic_dataset(
+        SyntheticSpec(n_assets=12, years=5, start="2010-01-04", seed=4), tmp_path
+    )
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "registry_path", registry_path)
+    build_cleaned_ohlcv()
+
+    prices = load_cleaned_field("adj_close")
+    rng = np.random.default_rng(0)
+    raw = pd.DataFrame(rng.random(prices.shape), index=prices.index, columns=prices.columns)
+    weights = raw.where(prices.notna(), 0.0)
+    weights = weights.div(weights.sum(axis=1).replace(0.0, np.nan), axis=0).fillna(0.0)
+    return prices, weights
+
+
+def test_chunked_fast_identical(panel):
+    prices, weights = panel
+    expected = run_backtest_fast_daily(prices, weights)
+
+    # lazy blocks from the cleaned parquet file, chunk not aligned to anything
+    got = run_backtest_chunked("fast", iter_field_blocks("adj_close", chunk_rows=97), weights)
+    pd.testing.assert_series_equal(got, expected, check_exact=True, check_freq=False)
+
+    clipped = run_backtest_fast_daily(prices, weights, start_date="2012-03-01")
+    got = run_backtest_chunked(
+        "fast", iter_frame_blocks(prices, 50), weights, start_date="2012-03-01"
+    )
+    pd.testing.assert_series_equal(got, clipped, check_exact=True, check_freq=False)
+
+
+def test_chunked_realistic_identical_and_streamed(panel, tmp_path):
+    prices, weights = panel
+    prices, weights = prices.iloc[:300], weights.iloc[:300]
+    expected = run_backtest_realistic(prices, weights)
+
+    w_blocks = iter_frame_blocks(weights, 64)
+    got = run_backtest_chunked("realistic", iter_frame_blocks(prices, 64), w_blocks)
+    pd.testing.assert_frame_equal(got, expected, check_exact=True)
+
+    path = run_backtest_chunked(
+        "realistic", iter_frame_blocks(prices, 64), weights, out_path=tmp_path / "eq.parquet"
+    )
+    streamed = pd.read_parquet(path)
+    np.testing.assert_array_equal(streamed["equity"].to_numpy(), expected["equity"].to_numpy())
+
+
+def test_chunked_rejects_unordered_blocks(panel):
+    prices, weights = panel
+    blocks = [prices.iloc[100:200], prices.iloc[:100]]
+    with pytest.raises(ValueError, match="out of order"):
+        run_backtest_chunked("fast", blocks, weights)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.config import settings
+from algo.data.cleaning import build_cleaned_ohlcv, load_cleaned_field
+from algo.data.compact import (
+    EQUITY_RTOL,
+    equity_precision,
+    from_long_compact,
+    to_long_compact,
+)
+from algo.data.prices import load_canonical_field
+from algo.data.synthetic import SyntheticSpec, generate_synthetic_ohlcv, write_synthetic_dataset
+
+
+def test_compact_roundtrip_dtypes_and_memory():
+    canonical, _, _ = generate_synthetic_ohlcv(SyntheticSpec(n_assets=40, years=6, seed=2))
+
+    long = to_long_compact(canonical)
+    assert isinstance(long["asset"].dtype, pd.CategoricalDtype)
+    assert long["close"].dtype == np.float32
+    assert long["volume"].dtype.kind == "u"
+
+    wide = from_long_compact(long)
+    assert wide.memory_usage().sum() < 0.6 * canonical.memory_usage().sum()
+
+    wide = wide.reindex(canonical.index)
+    assert list(wide.columns) == list(canonical.columns)
+    np.testing.assert_allclose(
+        wide.xs("adj_close", axis=1, level="field").to_numpy(dtype=float),
+        canonical.xs("adj_close", axis=1, level="field").to_numpy(),
+        rtol=1e-6,
+    )
+
+
+def test_compact_loaders_and_equity_precision(tmp_path, monkeypatch):
+    registry_path = write_synthetic_dataset(
+        SyntheticSpec(n_assets=20, years=6, start="2010-01-04", seed=1), tmp_path
+    )
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "registry_path", registry_path)
+
+    with pytest.raises(FileNotFoundError):
+        load_cleaned_field("adj_close", compact=True)
+
+    monkeypatch.setattr(settings, "compact_datasets", True)
+    build_cleaned_ohlcv()
+
+    full = load_cleaned_field("adj_close")
+    small = load_cleaned_field("adj_close", compact=True)
+    assert small.dtypes.eq(np.float32).all()
+    assert list(small.columns) == list(full.columns)
+    assert small.attrs["dataset_version"] != full.attrs["dataset_version"]
+
+    active = full.notna().astype(float)
+    weights = active.div(active.sum(axis=1).replace(0.0, np.nan), axis=0).fillna(0.0)
+    assert equity_precision(full, weights) < EQUITY_RTOL
+
+    # canonical compact copy is not written by build_cleaned_ohlcv
+    with pytest.raises(FileNotFoundError):
+        load_canonical_field("close", compact=True)
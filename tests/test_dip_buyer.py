@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from algo.strategies.dip_buyer import dip_buyer_weights_by_day
+
+
+def _reference_weights(prices, drop_pct, window, take_profit, stop_loss):
+    """Den oprindelige celle-for-celle implementering."""
+    prices = prices.sort_index()
+    weights = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
+    rolling_drop = prices.pct_change(periods=window)
+    in_position = {asset: False for asset in prices.columns}
+    entry_prices = {asset: 0.0 for asset in prices.columns}
+
+    for i in range(len(prices)):
+        dt = prices.index[i]
+        daily_active = []
+        for asset in prices.columns:
+            p = prices.iloc[i][asset]
+            if pd.isna(p):
+                continue
+            if in_position[asset]:
+                ret = (p - entry_prices[asset]) / entry_prices[asset]
+                if ret >= take_profit or ret <= -stop_loss:
+                    in_position[asset] = False
+                    entry_prices[asset] = 0.0
+                else:
+                    daily_active.append(asset)
+            else:
+                drop = rolling_drop.iloc[i][asset]
+                if not pd.isna(drop) and drop <= -drop_pct:
+                    in_position[asset] = True
+                    entry_prices[asset] = p
+                    daily_active.append(asset)
+        if daily_active:
+            w = 1.0 / len(daily_active)
+            for asset in daily_active:
+                weights.loc[dt, asset] = w
+    return weights
+
+
+def test_dip_buyer_matches_reference():
+    rng = np.random.default_rng(7)
+    rets = rng.normal(0.0, 0.03, size=(400, 8))
+    px = pd.DataFrame(
+        100 * np.cumprod(1 + rets, axis=0),
+        index=pd.bdate_range("2020-01-01", periods=400),
+        columns=[f"a{i}" for i in range(8)],
+    )
+    px.iloc[:50, 2] = np.nan  # sen notering
+    px.iloc[200:210, 5] = np.nan  # hul i data
+
+    params = {"drop_pct": 0.10, "window": 20, "take_profit": 0.15, "stop_loss": 0.10}
+    expected = _reference_weights(px, **params)
+    actual = dip_buyer_weights_by_day(px, **params)
+
+    assert (expected.to_numpy() > 0).any()
+    pd.testing.assert_frame_equal(actual, expected)
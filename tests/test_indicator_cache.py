@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.indicators.cache import IndicatorCache
+from algo.indicators.rolling import sma
+
+
+@pytest.fixture
+def px():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2020-01-01", periods=200)
+    df = pd.DataFrame(100 + rng.normal(0, 1, (200, 4)).cumsum(axis=0), index=idx)
+    df.columns = ["a", "b", "c", "d"]
+    df.iloc[:5, 1] = np.nan
+    df.attrs.update(dataset_version="v1", field="adj_close")
+    return df
+
+
+def test_hit_and_param_miss(px):
+    cache = IndicatorCache()
+    first = cache.get(px, "sma", window=3)
+    assert cache.get(px, "sma", window=3) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get(px, "sma", window=5)
+    cache.get(px[["a", "b"]], "sma", window=3)
+    cache.get(px.iloc[10:], "sma", window=3)
+    assert cache.misses == 4
+
+    with pytest.raises(KeyError):
+        cache.get(px, "nope")
+
+
+def test_derived_panels_are_not_served_from_cache(px):
+    cache = IndicatorCache()
+    cache.get(px, "sma", window=3)
+
+    # arithmetic / ffill keep attrs (same version + field), but not the values
+    for derived in [px * 10, px.ffill(), px.shift(1)]:
+        assert derived.attrs == px.attrs
+        pd.testing.assert_frame_equal(cache.get(derived, "sma", window=3), sma(derived, window=3))
+    assert cache.hits == 0
+
+
+def test_new_version_drops_old_entries_and_adhoc_uses_content(px, tmp_path):
+    cache = IndicatorCache(disk_dir=tmp_path)
+    cache.get(px, "sma", window=3)
+    assert (tmp_path / "v1").exists()
+
+    newer = px.copy()
+    newer.attrs.update(dataset_version="v2")
+    cache.get(newer, "sma", window=3)
+    assert not (tmp_path / "v1").exists() and cache.misses == 2
+
+    adhoc = pd.DataFrame(px.to_numpy(), index=px.index, columns=px.columns)
+    cache.get(adhoc, "sma", window=3)
+    cache.get(adhoc.copy(), "sma", window=3)
+    assert cache.hits == 1
+    cache.get(adhoc + 1, "sma", window=3)
+    assert cache.misses == 4
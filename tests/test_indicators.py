@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.indicators import rolling
+
+
+@pytest.fixture
+def panel() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    px = pd.DataFrame(
+        100 * np.cumprod(1 + rng.normal(0.0003, 0.02, size=(600, 6)), axis=0),
+        index=pd.bdate_range("2015-01-01", periods=600),
+        columns=[f"a{i}" for i in range(6)],
+    )
+    px.iloc[:40, 1] = np.nan  # sen start
+    px.iloc[300:303, 2] = np.nan  # kort hul
+    px.iloc[100:180, 3] = np.nan  # langt hul
+    px.iloc[400:460, 4] = 50.0  # flad periode
+    px.iloc[-30:, 5] = np.nan  # afnoteret
+    return px
+
+
+@pytest.mark.parametrize("window", [1, 5, 63])
+@pytest.mark.parametrize("min_periods", [None, 1])
+def test_sma_sum_std_match_pandas(panel, window, min_periods):
+    roll = panel.rolling(window, min_periods=min_periods)
+    kw = {"min_periods": min_periods}
+
+    pd.testing.assert_frame_equal(rolling.sma(panel, window, **kw), roll.mean(), rtol=1e-10)
+    pd.testing.assert_frame_equal(rolling.rolling_sum(panel, window, **kw), roll.sum(), rtol=1e-10)
+    pd.testing.assert_frame_equal(
+        rolling.rolling_std(panel, window, **kw), roll.std(), rtol=1e-7, atol=1e-9
+    )
+
+
+@pytest.mark.parametrize("window", [1, 7, 50])
+def test_rolling_max_min_match_pandas(panel, window):
+    pd.testing.assert_frame_equal(rolling.rolling_max(panel, window), panel.rolling(window).max())
+    pd.testing.assert_frame_equal(rolling.rolling_min(panel, window), panel.rolling(window).min())
+    pd.testing.assert_frame_equal(
+        rolling.rolling_drawdown(panel, window), panel / panel.rolling(window).max() - 1
+    )
+
+
+def test_flat_window_is_exact(panel):
+    sma = rolling.sma(panel, 20)
+    assert (sma.iloc[430:460, 4] == 50.0).all()
+    assert (rolling.rolling_std(panel, 20).iloc[430:460, 4] == 0.0).all()
+
+
+@pytest.mark.parametrize("adjust", [True, False])
+def test_ema_matches_pandas(panel, adjust):
+    expected = panel.ewm(span=20, adjust=adjust).mean()
+    pd.testing.assert_frame_equal(rolling.ema(panel, 20, adjust=adjust), expected)
+
+
+def test_returns_zscore_volatility_match_pandas(panel):
+    pd.testing.assert_frame_equal(rolling.windowed_return(panel, 10), panel.pct_change(10))
+
+    roll = panel.rolling(30)
+    expected_z = (panel - roll.mean()) / roll.std()
+    pd.testing.assert_frame_equal(rolling.rolling_zscore(panel, 30), expected_z, rtol=1e-6)
+
+    expected_vol = panel.pct_change().rolling(30).std() * np.sqrt(252)
+    pd.testing.assert_frame_equal(rolling.rolling_volatility(panel, 30), expected_vol, rtol=1e-7)
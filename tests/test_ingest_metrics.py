@@ -0,0 +1,97 @@
+import time
+
+import pandas as pd
+import requests
+
+from algo.config import settings
+from algo.data import prices
+from algo.data.ingest_metrics import (
+    load_ingest_metrics,
+    summarize_ingest,
+    write_prometheus_textfile,
+)
+
+REGISTRY = """
+assets:
+  - {key: aaa, name: A, kind: equity, identifiers: {yahoo: AAA, stooq: aaa.us}}
+  - {key: bbb, name: B, kind: equity, identifiers: {yahoo: BBB, stooq: bbb.us}}
+"""
+
+
+def _frame(n: int) -> pd.DataFrame:
+    idx = pd.bdate_range("2020-01-01", periods=n)
+    df = pd.DataFrame({c: 1.0 for c in ["open", "high", "low", "close", "volume"]}, index=idx)
+    df.attrs["payload_bytes"] = 100 * n
+    return df
+
+
+def test_ingest_metrics_fallback_and_retries(tmp_path, monkeypatch):
+    (tmp_path / "assets.yaml").write_text(REGISTRY, encoding="utf-8")
+    monkeypatch.setattr(settings, "registry_path", tmp_path / "assets.yaml")
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+    monkeypatch.setattr(settings, "prometheus_textfile_dir", tmp_path / "prom")
+    monkeypatch.setattr(settings, "fetch_retry_backoff", 0.0)
+
+    flaky = {"n": 0}
+
+    def yahoo(key: str) -> pd.DataFrame:
+        if key == "aaa":
+            raise ValueError("No Yahoo data")
+        flaky["n"] += 1
+        if flaky["n"] == 1:
+            raise requests.ConnectionError("reset")
+        return _frame(10)
+
+    monkeypatch.setattr(prices, "fetch_yahoo_daily", yahoo)
+    monkeypatch.setattr(prices, "fetch_stooq_daily", lambda key: _frame(5))
+
+    assert prices.update_all_prices() == {"aaa": "stooq", "bbb": "yahoo"}
+
+    log = load_ingest_metrics().set_index(["asset", "provider"])
+    assert log.loc[("aaa", "yahoo"), "status"] == "error"
+    assert log.loc[("aaa", "stooq"), "fallback_reason"] == "ValueError: No Yahoo data"
+    assert log.loc[("bbb", "yahoo"), "retries"] == 1
+    assert log.loc[("bbb", "yahoo"), "rows_added"] == 10
+    assert log.loc[("bbb", "yahoo"), "payload_bytes"] == 1000
+    assert not log.loc[("bbb", "yahoo"), "cache_hit"]
+
+    # second run: cache hit, nothing new
+    prices.update_all_prices(asset_keys=["bbb"])
+    last = load_ingest_metrics().iloc[-1]
+    assert last["cache_hit"] and last["rows_added"] == 0
+
+    summary = summarize_ingest(load_ingest_metrics())
+    assert summary.loc["yahoo", "errors"] == 1
+    assert summary.loc["stooq", "fallbacks"] == 1
+
+    prom = (tmp_path / "prom" / "algo_ingest.prom").read_text(encoding="utf-8")
+    assert 'algo_ingest_asset_fetch_seconds{asset="bbb",provider="yahoo"}' in prom
+
+
+def test_prometheus_textfile_precision_and_fallbacks(tmp_path):
+    df = pd.DataFrame(
+        {
+            "asset": ["aaa", "aaa", "bbb"],
+            "provider": ["stooq", "yahoo", "yahoo"],
+            "status": ["error", "error", "ok"],
+            "fallback_reason": [None, "ValueError: No stooq data", None],
+            "fetch_s": [None, None, 0.25],
+            "payload_bytes": [None, None, 123_456_789.0],
+            "rows_added": [0, 0, 10],
+            "retries": [0, 0, 0],
+        }
+    )
+    path = write_prometheus_textfile(df, tmp_path)
+    samples = dict(
+        line.rsplit(" ", 1)
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if not line.startswith("#")
+    )
+
+    # a failed attempt after a fallback served nothing
+    assert float(samples['algo_ingest_fallbacks{provider="yahoo"}']) == 0
+    assert summarize_ingest(df)["fallbacks"].sum() == 0
+    assert float(samples['algo_ingest_payload_bytes{provider="yahoo"}']) == 123_456_789
+    # seconds resolution, not 6 significant digits
+    assert abs(float(samples["algo_ingest_last_run_timestamp_seconds"]) - time.time()) < 60
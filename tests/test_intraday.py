@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from algo.config import settings
+from algo.data import intraday
+from algo.data.provider_health import ProviderHealth, provider_health_path
+
+REGISTRY = """
+assets:
+  - {key: aaa, name: A, kind: equity, identifiers: {yahoo: AAA, stooq: aaa.us}}
+  - {key: bbb, name: B, kind: equity, identifiers: {yahoo: BBB, stooq: bbb.us}}
+"""
+
+
+def _minute_bars(days: list[str]) -> pd.DataFrame:
+    idx = pd.DatetimeIndex(
+        [t for d in days for t in pd.date_range(f"{d} 09:30", f"{d} 15:59", freq="1min")]
+    )
+    close = 100 + np.arange(len(idx)) * 0.01
+    return pd.DataFrame(
+        {"open": close, "high": close + 0.05, "low": close - 0.05, "close": close, "volume": 10.0},
+        index=idx,
+    )
+
+
+def test_intraday_partitions_and_daily_resample(tmp_path, monkeypatch):
+    (tmp_path / "assets.yaml").write_text(REGISTRY, encoding="utf-8")
+    monkeypatch.setattr(settings, "registry_path", tmp_path / "assets.yaml")
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+
+    served = {"days": ["2024-01-30", "2024-01-31"]}
+
+    def yahoo(key: str, interval: str) -> pd.DataFrame:
+        if key == "bbb":
+            raise ValueError("No Yahoo data")
+        return _minute_bars(served["days"])
+
+    monkeypatch.setattr(intraday, "fetch_yahoo_intraday", yahoo)
+
+    # bbb: no yahoo data and stooq has no 1m bars -> left out
+    assert intraday.update_all_intraday("1m") == {"aaa": "yahoo"}
+
+    # overlapping window: only the new day is added, in a new month partition
+    served["days"] = ["2024-01-31", "2024-02-01"]
+    stats: dict = {}
+    intraday.update_intraday_cache("yahoo", "aaa", "1m", stats=stats)
+    assert stats["cache_hit"] and stats["rows_added"] == 390
+
+    raw = intraday.raw_intraday_dir("yahoo", "1m", "aaa")
+    assert [p.name for p in intraday.list_partitions(raw)] == [
+        "month=2024-01.parquet",
+        "month=2024-02.parquet",
+    ]
+
+    assert intraday.export_intraday("1m") == {"aaa": "yahoo"}
+    bars = intraday.load_intraday_bars("aaa", "1m", start="2024-02-01")
+    assert len(bars) == 390 and (bars["adj_close"] == bars["close"]).all()
+
+    daily = intraday.load_intraday_bars("aaa", "1m", resample="1D")
+    assert list(daily.index) == list(pd.to_datetime(["2024-01-30", "2024-01-31", "2024-02-01"]))
+    first = _minute_bars(["2024-01-30"])
+    assert daily.iloc[0]["open"] == first["open"].iloc[0]
+    assert daily.iloc[0]["close"] == first["close"].iloc[-1]
+    assert daily.iloc[0]["high"] == first["high"].max()
+    assert daily.iloc[0]["volume"] == 3900
+
+    panel = intraday.load_intraday_field("adj_close", "1m", resample="1D")
+    assert list(panel.columns) == ["aaa"] and len(panel) == 3
+    assert panel.attrs["field"] == "adj_close" and panel.attrs["dataset_version"]
+
+
+def test_missing_bars_do_not_trip_daily_or_later_assets(tmp_path, monkeypatch):
+    registry = "assets:\n" + "".join(
+        f"  - {{key: a{i}, name: A, kind: equity, identifiers: {{yahoo: A{i}, stooq: a{i}.us}}}}\n"
+        for i in range(10)
+    )
+    (tmp_path / "assets.yaml").write_text(registry, encoding="utf-8")
+    monkeypatch.setattr(settings, "registry_path", tmp_path / "assets.yaml")
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+    monkeypatch.setattr(settings, "provider_failure_threshold", 2)
+    monkeypatch.setattr(settings, "provider_health_persist", True)
+
+    # the first 5 assets have no yahoo 1m bars (and stooq has no 1m at all)
+    def yahoo(key: str, interval: str) -> pd.DataFrame:
+        if int(key[1:]) < 5:
+            raise ValueError(f"No Yahoo data for {key}")
+        return _minute_bars(["2024-01-30"])
+
+    monkeypatch.setattr(intraday, "fetch_yahoo_intraday", yahoo)
+
+    used = intraday.update_all_intraday("1m")
+    assert used == {f"a{i}": "yahoo" for i in range(5, 10)}
+
+    # the intraday breaker state is kept apart from the daily one
+    assert ProviderHealth.load(provider_health_path("1m")).states
+    assert not provider_health_path("1d").exists()
+
+
+def test_provider_outage_is_reported(tmp_path, monkeypatch):
+    (tmp_path / "assets.yaml").write_text(REGISTRY, encoding="utf-8")
+    monkeypatch.setattr(settings, "registry_path", tmp_path / "assets.yaml")
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+    monkeypatch.setattr(settings, "fetch_retries", 0)
+
+    def yahoo(key: str, interval: str) -> pd.DataFrame:
+        if key == "bbb":
+            raise requests.ConnectionError("connection reset")
+        return _minute_bars(["2024-01-30"])
+
+    monkeypatch.setattr(intraday, "fetch_yahoo_intraday", yahoo)
+
+    with pytest.raises(RuntimeError, match="provider errors for 1 assets"):
+        intraday.update_all_intraday("1m")
+    # the other assets were still updated
+    assert intraday.list_partitions(intraday.raw_intraday_dir("yahoo", "1m", "aaa"))
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.backtest.montecarlo import (
+    block_bootstrap_indices,
+    monte_carlo_stats,
+    simulate_return_paths,
+    stationary_bootstrap_indices,
+    subsample_indices,
+    summarize_distribution,
+)
+from algo.backtest.stats import STAT_COLUMNS, compute_stats
+
+
+def _curve(n_dates: int = 500) -> pd.Series:
+    rng = np.random.default_rng(3)
+    rets = rng.normal(0.0004, 0.01, size=n_dates)
+    idx = pd.bdate_range("2015-01-01", periods=n_dates + 1)
+    return pd.Series(np.concatenate([[1.0], np.cumprod(1.0 + rets)]), index=idx)
+
+
+def _run_lengths(idx: np.ndarray, n_obs: int) -> np.ndarray:
+    # a block continues while the next row is the following position (mod n_obs)
+    cont = idx[1:] == (idx[:-1] + 1) % n_obs
+    lengths = []
+    for col in range(idx.shape[1]):
+        breaks = np.flatnonzero(~cont[:, col]) + 1
+        lengths.extend(np.diff(np.concatenate([[0], breaks, [idx.shape[0]]])))
+    return np.asarray(lengths)
+
+
+def test_index_shapes_and_bounds():
+    rng = np.random.default_rng(0)
+    n_obs, horizon, n_paths = 300, 450, 40
+
+    stationary = stationary_bootstrap_indices(n_obs, horizon, n_paths, mean_block=10, rng=rng)
+    block = block_bootstrap_indices(n_obs, horizon, n_paths, block_size=20, rng=rng)
+    sub = subsample_indices(n_obs, 250, n_paths, rng=rng)
+
+    assert stationary.shape == block.shape == (horizon, n_paths)
+    assert sub.shape == (250, n_paths)
+    for idx in (stationary, block, sub):
+        assert idx.min() >= 0 and idx.max() < n_obs
+
+    # fixed blocks: contiguous (no wrap-around) inside each block of 20 rows
+    steps = np.diff(block, axis=0)
+    assert (steps[np.arange(horizon - 1) % 20 != 19] == 1).all()
+    # subsampling: one contiguous slice per path
+    assert (np.diff(sub, axis=0) == 1).all()
+
+    with pytest.raises(ValueError):
+        stationary_bootstrap_indices(n_obs, horizon, n_paths, mean_block=0.5, rng=rng)
+    with pytest.raises(ValueError):
+        subsample_indices(n_obs, n_obs + 1, n_paths, rng=rng)
+
+
+def test_stationary_mean_block_length():
+    n_obs = 1000
+    idx = stationary_bootstrap_indices(
+        n_obs, 5000, 200, mean_block=10, rng=np.random.default_rng(1)
+    )
+    # runs cut by the end of the path are shorter; a new block that happens to
+    # start right after the last one merges with it (probability 1/n_obs)
+    assert _run_lengths(idx, n_obs).mean() == pytest.approx(10, rel=0.05)
+
+
+@pytest.mark.parametrize("method", ["stationary", "block", "subsample"])
+def test_paths_reproducible_with_seed(method):
+    rets = _curve().pct_change().dropna().to_numpy()
+
+    a = simulate_return_paths(rets, 30, method=method, horizon=200, seed=7)
+    b = simulate_return_paths(rets, 30, method=method, horizon=200, seed=7)
+    c = simulate_return_paths(rets, 30, method=method, horizon=200, seed=8)
+
+    assert a.shape == (200, 30)
+    np.testing.assert_array_equal(a, b)
+    assert not np.array_equal(a, c)
+    assert np.isin(a, rets).all()
+
+
+def test_chunked_stats_match_full_history():
+    curve = _curve()
+
+    # subsampling the whole history gives the original curve on every path, so
+    # every row (across ragged chunks of 7) equals the stats of the curve itself
+    dist = monte_carlo_stats(curve, n_paths=25, method="subsample", chunk_size=7, seed=0)
+    assert dist.shape == (25, len(STAT_COLUMNS))
+    expected = pd.Series(compute_stats(curve))[STAT_COLUMNS].to_numpy()
+    np.testing.assert_allclose(dist.to_numpy(), np.tile(expected, (25, 1)), rtol=1e-12)
+
+    # same seed and chunking -> same distribution
+    first = monte_carlo_stats(curve, n_paths=50, chunk_size=16, seed=3)
+    pd.testing.assert_frame_equal(
+        first, monte_carlo_stats(curve, n_paths=50, chunk_size=16, seed=3)
+    )
+    assert first.notna().all().all()
+
+    table = summarize_distribution(first)
+    assert list(table.index) == STAT_COLUMNS
+    assert list(table.columns) == ["p5", "p25", "p50", "p75", "p95"]
+    assert (table.diff(axis=1).iloc[:, 1:] >= 0).all().all()
+
+    with pytest.raises(ValueError):
+        monte_carlo_stats(curve, n_paths=5, method="nope", seed=0)  # type: ignore[arg-type]
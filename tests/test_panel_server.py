@@ -0,0 +1,65 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from algo.config import settings
+from algo.data.cleaning import build_cleaned_ohlcv, cleaned_path, load_cleaned_field
+from algo.data.panel_server import PanelServer, request_panel, served_field, server_available
+from algo.data.synthetic import SyntheticSpec, write_synthetic_dataset
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    registry_path = write_synthetic_dataset(
+        SyntheticSpec(n_assets=8, years=5, start="2010-01-04", seed=5), tmp_path
+    )
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "registry_path", registry_path)
+    build_cleaned_ohlcv()
+
+    srv = PanelServer(tmp_path / "panel.sock", reload_interval=0.1)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_served_field_matches_local(server, monkeypatch):
+    local = load_cleaned_field("adj_close")
+    assert server_available(server.socket_path)
+
+    got = served_field("adj_close", socket_path=server.socket_path)
+    pd.testing.assert_frame_equal(got, local, check_freq=False)
+    assert got.attrs == local.attrs
+
+    part = served_field(
+        "close",
+        assets=["spy"],
+        start="2012-01-01",
+        end="2012-12-31",
+        socket_path=server.socket_path,
+    )
+    assert list(part.columns) == ["spy"] and part.index.min().year == 2012
+
+    with pytest.raises(KeyError):
+        served_field("nope", socket_path=server.socket_path)
+
+    # drop-in: load_cleaned_field goes through the server once the socket is configured
+    monkeypatch.setattr(settings, "panel_socket", server.socket_path)
+    assert load_cleaned_field("adj_close").attrs == local.attrs
+    # ... and reads the file itself when nothing is listening
+    monkeypatch.setattr(settings, "panel_socket", server.socket_path.with_name("none.sock"))
+    assert load_cleaned_field("adj_close").attrs == local.attrs
+
+
+def test_server_hot_reloads_new_version(server):
+    before, _ = request_panel({"op": "version"}, socket_path=server.socket_path)
+
+    cleaned = pd.read_parquet(cleaned_path())
+    cleaned.iloc[:10].to_parquet(cleaned_path())
+
+    after = served_field("adj_close", socket_path=server.socket_path)
+    assert after.attrs["dataset_version"] != before["version"]
+    assert len(after) == 10
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from algo.config import settings
+from algo.data import pipeline
+from algo.data.prices import write_cache
+from algo.symbols.registry import list_asset_keys
+
+
+def test_pipeline_skips_unchanged_stages(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2005-01-03", periods=1200)
+    for key in list_asset_keys():
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(idx)))
+        df = pd.DataFrame(
+            {"open": close, "high": close, "low": close, "close": close, "volume": 1.0},
+            index=idx,
+        )
+        write_cache("yahoo", key, df)
+
+    def run():
+        results = pipeline.run_pipeline(["canonical", "cleaned"])
+        return {r.stage: r.ran for r in results}
+
+    assert run() == {"canonical": True, "cleaned": True}
+    assert run() == {"canonical": False, "cleaned": False}
+
+    # raw file rewritten with identical content: canonical reruns, cleaned sees same hash
+    key = list_asset_keys()[0]
+    write_cache("yahoo", key, pd.read_parquet(tmp_path / "raw_prices" / "yahoo" / f"{key}.parquet"))
+    assert run() == {"canonical": True, "cleaned": False}
+
+    # a deleted output forces its stage again
+    (tmp_path / "cleaned" / "ohlcv.parquet").unlink()
+    assert run() == {"canonical": False, "cleaned": True}
+
+    # ... including the per-calendar panels and the returns panels
+    next((tmp_path / "cleaned" / "calendars").glob("*.parquet")).unlink()
+    assert run() == {"canonical": False, "cleaned": True}
+    (tmp_path / "cleaned" / "returns" / "adj_close_simple.parquet").unlink()
+    assert run() == {"canonical": False, "cleaned": True}
+    assert run() == {"canonical": False, "cleaned": False}
@@ -0,0 +1,40 @@
+import json
+
+from algo import profiling
+from algo.config import settings
+
+
+@profiling.profiled
+def _work(n: int) -> int:
+    with profiling.span("inner"):
+        profiling.count("items", n)
+        return sum(range(n))
+
+
+def test_profiling_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(profiling, "_ENABLED", False)
+    monkeypatch.setattr(profiling, "_PROFILER", None)
+
+    assert _work(10) == 45
+    assert profiling.get_profiler() is None
+    assert profiling.write_profile("test") is None
+
+
+def test_profiling_spans_and_counters(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "_ENABLED", True)
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path)
+    monkeypatch.setattr(profiling, "_PROFILER", profiling.Profiler())
+
+    for _ in range(3):
+        _work(100)
+
+    path = profiling.write_profile("test")
+    assert path is not None and path.parent == tmp_path / "profiles"
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    spans = {s["path"]: s for s in data["spans"]}
+    outer = f"{_work.__module__}._work"
+    assert spans[outer]["calls"] == 3
+    assert spans[f"{outer}/inner"]["depth"] == 1
+    assert spans[f"{outer}/inner"]["total_s"] <= spans[outer]["total_s"]
+    assert data["counters"] == {"items": 300}
@@ -0,0 +1,140 @@
+import pandas as pd
+import requests
+
+from algo.config import settings
+from algo.data import prices
+from algo.data.provider_health import ProviderHealth
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_probes_and_closes():
+    clock = _Clock()
+    health = ProviderHealth(failure_threshold=3, window_s=60, cooldown_s=100, clock=clock)
+
+    for _ in range(3):
+        assert health.order(["yahoo", "stooq"])[0][0] == "yahoo"
+        health.record_failure("yahoo")
+
+    assert health.order(["yahoo", "stooq"]) == (["stooq"], ["yahoo"])
+
+    # after the cooldown one caller gets a probe; a failed probe re-opens at once
+    clock.now += 101
+    assert health.order(["yahoo", "stooq"])[0] == ["yahoo", "stooq"]
+    assert health.order(["yahoo", "stooq"])[1] == ["yahoo"]
+    health.record_failure("yahoo")
+    assert health.is_open("yahoo")
+
+    clock.now += 101
+    health.order(["yahoo"])
+    health.record_success("yahoo", 0.1)
+    assert not health.is_open("yahoo")
+
+
+def test_probe_is_tried_first_and_expires():
+    clock = _Clock()
+    health = ProviderHealth(failure_threshold=3, window_s=60, cooldown_s=100, clock=clock)
+    for _ in range(3):
+        health.record_failure("yahoo")
+    health.record_success("stooq", 0.1)
+
+    # yahoo's score is degraded, but the probe has to be sent to close the circuit
+    clock.now += 101
+    assert health.order(["yahoo", "stooq"])[0] == ["yahoo", "stooq"]
+    assert health.order(["yahoo", "stooq"]) == (["stooq"], ["yahoo"])
+
+    # a probe that never reports back does not keep the circuit open for good
+    clock.now += 101
+    assert health.order(["yahoo", "stooq"])[0][0] == "yahoo"
+    health.record_success("yahoo", 0.1)
+    assert not health.is_open("yahoo")
+
+
+def test_failures_outside_window_do_not_trip():
+    clock = _Clock()
+    health = ProviderHealth(failure_threshold=2, window_s=10, cooldown_s=100, clock=clock)
+    health.record_failure("yahoo")
+    clock.now += 11
+    health.record_failure("yahoo")
+    assert not health.is_open("yahoo")
+
+
+def test_order_prefers_healthy_provider():
+    health = ProviderHealth(failure_threshold=100)
+    for _ in range(5):
+        health.record_failure("yahoo")
+        health.record_success("stooq", 0.2)
+    assert health.order(["yahoo", "stooq"])[0] == ["stooq", "yahoo"]
+
+
+REGISTRY = "assets:\n" + "".join(
+    f"  - {{key: a{i}, name: A, kind: equity, identifiers: {{yahoo: A{i}, stooq: a{i}.us}}}}\n"
+    for i in range(6)
+)
+
+
+def test_update_all_prices_skips_open_provider(tmp_path, monkeypatch):
+    (tmp_path / "assets.yaml").write_text(REGISTRY, encoding="utf-8")
+    monkeypatch.setattr(settings, "registry_path", tmp_path / "assets.yaml")
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+    monkeypatch.setattr(settings, "provider_failure_threshold", 2)
+    monkeypatch.setattr(settings, "provider_health_persist", True)
+    monkeypatch.setattr(settings, "fetch_retries", 0)
+
+    calls = {"yahoo": 0}
+
+    def yahoo(key: str) -> pd.DataFrame:
+        calls["yahoo"] += 1
+        response = requests.Response()
+        response.status_code = 429
+        raise requests.HTTPError("throttled", response=response)
+
+    def stooq(key: str) -> pd.DataFrame:
+        idx = pd.bdate_range("2020-01-01", periods=3)
+        return pd.DataFrame({c: 1.0 for c in ["open", "high", "low", "close", "volume"]}, idx)
+
+    monkeypatch.setattr(prices, "fetch_yahoo_daily", yahoo)
+    monkeypatch.setattr(prices, "fetch_stooq_daily", stooq)
+
+    used = prices.update_all_prices()
+    assert set(used.values()) == {"stooq"}
+    # yahoo's circuit opened after 2 failures; stooq also ranks first from then on
+    assert calls["yahoo"] == 2
+
+    # persisted: the next run skips yahoo from the start
+    prices.update_all_prices()
+    assert calls["yahoo"] == 2
+
+
+def test_missing_asset_does_not_trip_provider(tmp_path, monkeypatch):
+    (tmp_path / "assets.yaml").write_text(REGISTRY, encoding="utf-8")
+    monkeypatch.setattr(settings, "registry_path", tmp_path / "assets.yaml")
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+    monkeypatch.setattr(settings, "provider_failure_threshold", 2)
+
+    calls = {"yahoo": 0}
+
+    def yahoo(key: str) -> pd.DataFrame:
+        calls["yahoo"] += 1
+        raise ValueError(f"No data returned for {key}")
+
+    monkeypatch.setattr(prices, "fetch_yahoo_daily", yahoo)
+    monkeypatch.setattr(prices, "fetch_stooq_daily", lambda key: pd.DataFrame())
+
+    health = ProviderHealth()
+    for key in [f"a{i}" for i in range(6)]:
+        try:
+            prices._choose_provider_and_update(key, ["yahoo", "stooq"], health=health)
+        except RuntimeError:
+            pass
+    # every asset still went to yahoo first: "no data" is not a provider outage
+    assert calls["yahoo"] == 6
+    assert not health.is_open("yahoo")
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from algo.strategies.ranking import rank_weights, ranking_weights_by_day, top_k_mask
+
+
+def test_top_k_matches_full_sort_and_skips_nan():
+    rng = np.random.default_rng(0)
+    scores = rng.normal(size=(50, 30))
+    scores[rng.random(scores.shape) < 0.2] = np.nan
+    scores[0, :] = np.nan
+    scores[1, 3:] = np.nan  # kun 3 gyldige
+
+    mask = top_k_mask(scores, 5)
+
+    for i, row in enumerate(scores):
+        finite = np.flatnonzero(np.isfinite(row))
+        expected = finite[np.argsort(-row[finite])[:5]]
+        assert set(np.flatnonzero(mask[i])) == set(expected)
+
+
+def test_rank_weighting():
+    scores = np.array([[3.0, 1.0, np.nan, 2.0]])
+    w = rank_weights(scores, 2, weighting="rank")
+    np.testing.assert_allclose(w, [[2 / 3, 0.0, 0.0, 1 / 3]])
+
+    w_low = rank_weights(scores, 2, weighting="equal", higher_is_better=False)
+    np.testing.assert_allclose(w_low, [[0.0, 0.5, 0.0, 0.5]])
+
+
+def test_monthly_rebalance_holds_weights():
+    idx = pd.bdate_range("2020-01-01", periods=70)
+    prices = pd.DataFrame(1.0, index=idx, columns=["a", "b", "c"])
+    prices.loc[idx[40] :, "c"] = np.nan  # ikke handlet på februar-rebalancen
+    scores = pd.DataFrame(
+        np.tile([1.0, 2.0, 3.0], (len(idx), 1)), index=idx, columns=prices.columns
+    )
+
+    w = ranking_weights_by_day(prices, scores, top_k=1, rebalance="M")
+
+    jan_end = idx[idx.month == 1][-1]
+    feb_end = idx[idx.month == 2][-1]
+    assert (w.loc[:jan_end].iloc[:-1] == 0).all().all()
+    assert (w.loc[jan_end:feb_end].iloc[:-1, 2] == 1.0).all()
+    assert (w.loc[feb_end:, "b"] == 1.0).all()
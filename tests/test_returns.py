@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from algo.config import settings
+from algo.data import returns as R
+
+
+def _prices() -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    px = pd.DataFrame(
+        100 * np.cumprod(1 + rng.normal(0, 0.02, size=(300, 4)), axis=0),
+        index=pd.bdate_range("2020-01-01", periods=300, name="date"),
+        columns=["a", "b", "c", "d"],
+    )
+    px.iloc[:50, 1] = np.nan
+    px.iloc[100:110, 2] = np.nan
+    px.iloc[200:, 3] = np.nan
+    return px
+
+
+def test_returns_match_pct_change():
+    px = _prices()
+    rets = R.compute_returns(px)
+
+    for col in px.columns:
+        expected = px[col].dropna().pct_change()
+        pd.testing.assert_series_equal(rets[col].dropna(), expected.dropna())
+
+    pd.testing.assert_frame_equal(R.adjacent_returns(rets, px), px.pct_change())
+    sl = px.iloc[120:250]
+    pd.testing.assert_frame_equal(R.adjacent_returns(rets, sl), sl.pct_change())
+
+    log = R.compute_returns(px, kind="log")
+    np.testing.assert_allclose(log.to_numpy(), np.log1p(rets.to_numpy()), equal_nan=True)
+
+
+def test_load_returns_builds_and_filters(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    px = _prices()
+    canon = pd.concat({"adj_close": px}, axis=1).swaplevel(axis=1)
+    canon.columns.names = ["asset", "field"]
+    canon.to_parquet(R.canonical_ohlcv_path())
+
+    out = R.load_returns(
+        dataset="canonical", assets=["a", "c"], start="2020-03-02", end="2020-06-30"
+    )
+    expected = R.compute_returns(px).loc["2020-03-02":"2020-06-30", ["a", "c"]]
+    pd.testing.assert_frame_equal(out, expected, check_names=False, check_freq=False)
+    assert R.returns_path("adj_close", "log", dataset="canonical").exists()
+
+
+def test_load_returns_without_bridging_start(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    px = _prices()
+    canon = pd.concat({"adj_close": px}, axis=1).swaplevel(axis=1)
+    canon.columns.names = ["asset", "field"]
+    canon.to_parquet(R.canonical_ohlcv_path())
+
+    # b lists inside the first window; the others start in / next to c's gap
+    for start in ["2020-01-20", "2020-05-19", "2020-05-22"]:
+        out = R.load_returns(dataset="canonical", start=start, bridge_start=False)
+        expected = R.compute_returns(px.loc[start:])
+        pd.testing.assert_frame_equal(out, expected, check_names=False, check_freq=False)
+
+    bridged = R.load_returns(dataset="canonical", start="2020-01-20")
+    assert bridged["a"].notna().all()
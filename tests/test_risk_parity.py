@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from algo.strategies import risk_parity as rp
+
+
+def _returns(n=400, m=8, seed=1):
+    rng = np.random.default_rng(seed)
+    mix = rng.normal(size=(m, m)) * 0.3 + np.eye(m)
+    rets = rng.normal(0, 0.01, size=(n, m)) @ mix
+    rets[:120, 2] = np.nan  # kommer sent ind
+    rets[300:, 5] = np.nan  # forsvinder
+    rets[rng.random(rets.shape) < 0.03] = np.nan
+    return rets
+
+
+def test_incremental_rolling_cov_matches_pandas():
+    rets = _returns()
+    rows = np.array([60, 61, 80, 150, 399])  # overlap, enkeltrækker og spring
+
+    for t, cov, n_obs in rp._rolling_cov(rets, rows, window=50):
+        window = pd.DataFrame(rets[t - 49 : t + 1])
+        expected = window.cov().to_numpy()
+        np.testing.assert_allclose(cov, expected, rtol=1e-8, atol=1e-14, equal_nan=True)
+        np.testing.assert_array_equal(n_obs, window.notna().sum().to_numpy())
+
+
+def test_solvers():
+    cov = pd.DataFrame(_returns()[300:]).dropna(axis=1).cov().to_numpy()
+
+    w = rp._risk_parity(cov)
+    contrib = w * (cov @ w)
+    np.testing.assert_allclose(contrib, contrib.mean(), rtol=1e-8)
+
+    w = rp._min_variance(cov)
+    assert (w >= 0).all() and np.isclose(w.sum(), 1.0)
+    rng = np.random.default_rng(0)
+    for _ in range(200):  # ingen tilfældig long-only portefølje er bedre
+        other = rng.dirichlet(np.ones(len(w)))
+        assert w @ cov @ w <= other @ cov @ other + 1e-15
+
+
+def test_weights_by_day_handles_entry_and_exit():
+    rets = np.nan_to_num(_returns(), nan=0.0)
+    idx = pd.bdate_range("2020-01-01", periods=len(rets))
+    prices = pd.DataFrame(100 * np.cumprod(1 + rets, axis=0), index=idx)
+    prices.iloc[:120, 2] = np.nan
+    prices.iloc[300:, 5] = np.nan
+
+    for method in ["inverse_vol", "risk_parity", "min_variance"]:
+        w = rp.risk_parity_weights_by_day(prices, method=method, window=60)
+        sums = w.sum(axis=1)
+        assert np.allclose(sums[sums > 0], 1.0)
+        assert (w.iloc[:179, 2] == 0).all()  # for få afkast endnu
+        assert (w.iloc[-50:, 5] == 0).all()
@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+
+from algo.backtest.catalog import list_runs, record_run
+from algo.config import settings
+from algo.data.cleaning import build_cleaned_ohlcv, cleaned_path, load_cleaned_field
+from algo.data.prices import load_canonical_field
+from algo.data.snapshots import (
+    collect_garbage,
+    create_snapshot,
+    current_snapshot,
+    delete_snapshot,
+    ensure_snapshot,
+    list_snapshots,
+    load_snapshot,
+    pack_path,
+)
+from algo.data.synthetic import SyntheticSpec, write_synthetic_dataset
+from algo.data.universe import get_clean_universe
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    registry_path = write_synthetic_dataset(
+        SyntheticSpec(n_assets=10, years=5, start="2010-01-04", seed=6), tmp_path
+    )
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "registry_path", registry_path)
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+    cleaned, _ = build_cleaned_ohlcv()
+    return pd.read_parquet(cleaned_path())
+
+
+def test_snapshot_roundtrip_and_dedup(dataset):
+    canonical_id = create_snapshot("canonical")
+    first = create_snapshot("cleaned")
+    assert create_snapshot("cleaned") == first  # unchanged -> same id, nothing written
+    assert current_snapshot("cleaned") == first
+
+    # cleaned chunks equal to canonical ones are not stored twice
+    snapshots = list_snapshots()
+    assert snapshots.loc[first, "new_chunks"] < snapshots.loc[first, "n_chunks"]
+
+    pd.testing.assert_frame_equal(load_snapshot(first), dataset, check_freq=False)
+    canonical_close = load_canonical_field("close", version=canonical_id)
+    assert canonical_close.attrs["dataset_version"] == canonical_id
+    pd.testing.assert_frame_equal(canonical_close, load_canonical_field("close"), check_freq=False)
+
+    # the file is rebuilt in place with one price corrected: one chunk changes
+    corrected = dataset.copy()
+    corrected.iloc[-1, corrected.columns.get_loc(("spy", "adj_close"))] *= 1.01
+    corrected.to_parquet(cleaned_path())
+    assert current_snapshot("cleaned") is None
+    latest = ensure_snapshot("cleaned")
+    assert latest != first
+    new = list_snapshots().loc[latest]
+    assert new["new_chunks"] == 1
+    assert new["new_bytes"] < pack_path(canonical_id).stat().st_size / 10
+
+    # old versions stay loadable, with the snapshot id as dataset version
+    old = load_cleaned_field("adj_close", version=first)
+    assert old.attrs["dataset_version"] == first
+    pd.testing.assert_frame_equal(
+        old, dataset.xs("adj_close", axis=1, level="field"), check_freq=False
+    )
+    latest_px = load_cleaned_field("adj_close", version="latest")
+    assert latest_px["spy"].iloc[-1] == corrected[("spy", "adj_close")].iloc[-1]
+    assert get_clean_universe(min_coverage=0.0, max_extreme=100, version=first)
+
+    delete_snapshot(latest)
+    assert pack_path(latest) in collect_garbage()
+    pd.testing.assert_frame_equal(load_snapshot(first), dataset, check_freq=False)
+
+    with pytest.raises(KeyError):
+        load_snapshot("nope")
+    with pytest.raises(ValueError):
+        load_snapshot(canonical_id, dataset="cleaned")
+    with pytest.raises(ValueError, match="version="):
+        load_canonical_field("close", version=canonical_id, compact=True)
+    with pytest.raises(ValueError, match="version="):
+        load_cleaned_field("adj_close", version=first, calendar="us")
+
+
+def test_run_records_snapshot(dataset):
+    snapshot_id = ensure_snapshot("cleaned")
+    curve = pd.Series([1.0, 1.1], index=pd.date_range("2020-01-01", periods=2))
+    run_id = record_run(
+        name="t",
+        strategy="s",
+        params={},
+        config={},
+        stats={"real": {"Sharpe": 1.0}},
+        curves={"real": curve},
+        snapshot_id=snapshot_id,
+    )
+    assert list_runs().loc[run_id, "snapshot_id"] == snapshot_id
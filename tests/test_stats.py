@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from algo.backtest.stats import compute_stats, compute_stats_batch
+
+
+def _legacy_stats(equity_curve: pd.Series, trading_days: int = 252) -> dict[str, float]:
+    rets = equity_curve.pct_change().dropna()
+    years = len(rets) / trading_days
+    cagr = (equity_curve.iloc[-1] ** (1 / years)) - 1 if years > 0 else 0.0
+    vol = rets.std() * np.sqrt(trading_days)
+    sharpe = cagr / vol if vol > 0 else 0.0
+    roll_max = equity_curve.cummax()
+    max_dd = ((equity_curve - roll_max) / roll_max).min()
+    return {"CAGR": cagr, "Vol": vol, "Sharpe": sharpe, "MaxDD": max_dd}
+
+
+def _curves(n_dates: int = 800, n_curves: int = 6) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    rets = rng.normal(0.0003, 0.012, size=(n_dates, n_curves))
+    idx = pd.bdate_range("2015-01-01", periods=n_dates)
+    return pd.DataFrame(np.cumprod(1.0 + rets, axis=0), index=idx)
+
+
+def test_compute_stats_matches_legacy():
+    curves = _curves()
+    for col in curves.columns:
+        new = compute_stats(curves[col])
+        old = _legacy_stats(curves[col])
+        for k, v in old.items():
+            assert new[k] == v
+
+
+def test_batch_matches_single_and_handles_ragged_curves():
+    curves = _curves()
+    curves.iloc[:100, 1] = np.nan  # kurve 1 starter senere
+
+    batch = compute_stats_batch(curves)
+    for col in curves.columns:
+        single = _legacy_stats(curves[col].dropna())
+        for k, v in single.items():
+            np.testing.assert_allclose(batch.loc[col, k], v, rtol=1e-12)
+
+
+def test_batch_turnover_columns():
+    curves = _curves(n_curves=2)
+    turnover = pd.DataFrame(0.1, index=curves.index, columns=curves.columns)
+
+    out = compute_stats_batch(curves, turnover=turnover, cost_per_turnover=0.001)
+    np.testing.assert_allclose(out["Turnover"], 0.1 * 252)
+    assert (out["CAGR_net"] < out["CAGR"]).all()
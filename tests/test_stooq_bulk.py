@@ -0,0 +1,60 @@
+import zipfile
+
+from algo.config import settings
+from algo.data.ingest_metrics import load_ingest_metrics
+from algo.data.prices import read_cache
+from algo.data.stooq_bulk import ingest_stooq_bulk, member_symbol
+from algo.symbols.registry import keys_for_identifier
+
+REGISTRY = """
+assets:
+  - {key: ibm, name: IBM, kind: equity, identifiers: {stooq: ibm.us, yahoo: IBM}}
+  - {key: ibm_copy, name: IBM again, kind: equity, identifiers: {stooq: IBM.US}}
+  - {key: spy, name: SPY, kind: etf, identifiers: {stooq: spy.us}}
+  - {key: qqq, name: QQQ, kind: etf, identifiers: {stooq: qqq.us}}
+  - {key: btc, name: BTC, kind: crypto, identifiers: {yahoo: BTC-USD}}
+"""
+
+HEADER = "<TICKER>,<PER>,<DATE>,<TIME>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<VOL>,<OPENINT>\n"
+
+
+def _csv(ticker: str, dates: list[str]) -> str:
+    rows = [f"{ticker},D,{d},000000,1.0,2.0,0.5,1.5,1000,0\n" for d in dates]
+    return HEADER + "".join(rows)
+
+
+def test_stooq_bulk_ingest(tmp_path, monkeypatch):
+    (tmp_path / "assets.yaml").write_text(REGISTRY, encoding="utf-8")
+    monkeypatch.setattr(settings, "registry_path", tmp_path / "assets.yaml")
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(settings, "artifacts_dir", tmp_path / "artifacts")
+
+    assert member_symbol("data/daily/us/nyse stocks/1/ibm.us.txt") == "ibm.us"
+    assert keys_for_identifier("stooq", "IBM.us") == ["ibm", "ibm_copy"]
+
+    archive = tmp_path / "d_us_txt.zip"
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            "data/daily/us/nyse stocks/1/ibm.us.txt", _csv("IBM.US", ["20200102", "20200103"])
+        )
+        zf.writestr("data/daily/us/nyse stocks/1/xom.us.txt", _csv("XOM.US", ["20200102"]))
+        zf.writestr("data/daily/us/nyse etfs/spy.us.txt", _csv("SPY.US", ["20200102"]))
+        zf.writestr("data/daily/us/nyse etfs/qqq.us.txt", "")
+
+    # the empty qqq member is logged as an error, the rest is still ingested
+    written = ingest_stooq_bulk(archive)
+    assert written == {"ibm": 2, "ibm_copy": 2, "spy": 1}
+    log = load_ingest_metrics().set_index("asset")
+    assert log.loc["qqq", "status"] == "error" and log.loc["spy", "payload_bytes"] > 0
+
+    ibm = read_cache("stooq", "ibm")
+    assert list(ibm.columns) == ["open", "high", "low", "close", "volume"]
+    assert ibm.index[0].strftime("%Y-%m-%d") == "2020-01-02"
+    assert ibm["close"].iloc[-1] == 1.5
+
+    # a newer archive merges into the existing cache
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr(
+            "data/daily/us/nyse stocks/1/ibm.us.txt", _csv("IBM.US", ["20200103", "20200106"])
+        )
+    assert ingest_stooq_bulk(archive, asset_keys=["ibm"]) == {"ibm": 3}
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo.config import settings
+from algo.data.cleaning import build_cleaned_ohlcv, cleaned_path, eligibility_path
+from algo.data.prices import canonical_ohlcv_path, export_canonical_ohlcv, write_cache
+from algo.data.streaming import stream_build_datasets
+from algo.symbols.registry import list_asset_keys
+
+
+def test_streaming_matches_sequential_build(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+
+    rng = np.random.default_rng(1)
+    keys = list_asset_keys()[:6]
+    for i, key in enumerate(keys):
+        # different start dates so the union index matters
+        idx = pd.bdate_range("2005-01-03", periods=1200)[i * 40 :]
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(idx)))
+        df = pd.DataFrame(
+            {"open": close, "high": close, "low": close, "close": close, "volume": 1.0},
+            index=idx,
+        )
+        write_cache("yahoo", key, df)
+
+    export_canonical_ohlcv(asset_keys=keys, refresh=False)
+    build_cleaned_ohlcv()
+    expected = {
+        p: pd.read_parquet(p) for p in [canonical_ohlcv_path(), cleaned_path(), eligibility_path()]
+    }
+
+    stream_build_datasets(keys, refresh=False, clean_workers=2, queue_size=2)
+
+    for path, df in expected.items():
+        pd.testing.assert_frame_equal(pd.read_parquet(path), df)
+
+
+def test_streaming_fails_fast_on_missing_asset(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+
+    keys = list_asset_keys()[:8]
+    idx = pd.bdate_range("2005-01-03", periods=300)
+    df = pd.DataFrame(
+        {"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0}, index=idx
+    )
+    for key in keys[1:]:
+        write_cache("yahoo", key, df)
+
+    # first asset has no raw cache: the build must raise, not hang on the full queue
+    with pytest.raises(FileNotFoundError):
+        stream_build_datasets(keys, refresh=False, fetch_workers=2, queue_size=1)
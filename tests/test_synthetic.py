@@ -0,0 +1,66 @@
+import pandas as pd
+
+from algo.config import settings
+from algo.data.calendars import calendar_days
+from algo.data.cleaning import build_cleaned_ohlcv
+from algo.data.synthetic import (
+    MIXED_KIND_MIX,
+    SyntheticSpec,
+    generate_synthetic_ohlcv,
+    write_synthetic_dataset,
+)
+from algo.data.universe import get_clean_universe
+from algo.symbols.registry import list_asset_keys
+
+
+def test_synthetic_defects_and_calendars():
+    spec = SyntheticSpec(n_assets=60, years=6, seed=3, kind_mix=MIXED_KIND_MIX, extreme_frac=0.2)
+    canonical, registry, truth = generate_synthetic_ohlcv(spec)
+
+    assert canonical.shape[1] == 60 * 6
+    assert [a.key for a in registry.assets] == list(truth.index)
+    assert truth["extreme"].any() and (truth["gap_rows"] > 0).any()
+
+    close = canonical.xs("close", axis=1, level="field")
+    # crypto trades on weekends, US equities never do
+    weekend = close.index.dayofweek >= 5
+    crypto = truth.index[truth["kind"] == "crypto"]
+    equity = truth.index[truth["kind"] == "equity"]
+    assert close.loc[weekend, crypto].notna().any().any()
+    assert close.loc[weekend, equity].isna().all().all()
+
+    # OHLC consistency where observed
+    ohlc = canonical["spy"].dropna()
+    assert (ohlc["high"] >= ohlc[["open", "close"]].max(axis=1)).all()
+    assert (ohlc["low"] <= ohlc[["open", "close"]].min(axis=1)).all()
+
+
+def test_synthetic_dataset_feeds_cleaning(tmp_path, monkeypatch):
+    registry_path = write_synthetic_dataset(
+        SyntheticSpec(n_assets=25, years=6, start="2010-01-04", seed=1), tmp_path
+    )
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "registry_path", registry_path)
+
+    assert len(list_asset_keys()) == 25
+    cleaned, eligibility = build_cleaned_ohlcv()
+
+    assert "spy" in eligibility.index
+    assert 0 < len(eligibility) <= 25
+    assert set(get_clean_universe(min_coverage=0.5, max_extreme=10)) <= set(eligibility.index)
+    assert isinstance(cleaned.index, pd.DatetimeIndex)
+
+
+def test_truth_gap_rows_match_missing_days():
+    spec = SyntheticSpec(n_assets=50, years=5, seed=4, kind_mix=MIXED_KIND_MIX)
+    canonical, _, truth = generate_synthetic_ohlcv(spec)
+    close = canonical.xs("close", axis=1, level="field")
+    idx = close.index
+
+    for asset, row in truth.iterrows():
+        # missing rows on the asset's own trading days inside its listing window
+        end = row["delisted"] if pd.notna(row["delisted"]) else idx[-1] + pd.Timedelta(days=1)
+        days = calendar_days(row["calendar"], idx[0], idx[-1])
+        window = idx[idx.isin(days) & (idx >= row["listed"]) & (idx < end)]
+        assert close.loc[window, asset].isna().sum() == row["gap_rows"], asset
+    assert truth.loc["spy", "gap_rows"] == 0